@@ -0,0 +1,82 @@
+# Copyright Planetmint GmbH and Planetmint contributors
+# SPDX-License-Identifier: (Apache-2.0 AND CC-BY-4.0)
+# Code is Apache-2.0 and docs are CC-BY-4.0
+
+"""Compares fulfilling large transactions with :meth:`Transaction.sign`,
+which builds and serializes the payload again for the signatures, the id
+and the result, itself serialized once more as the request body, with the
+canonical serialization computed once per member and reused for the id,
+the signatures and the body, by :func:`fulfill_transaction` given a
+:class:`~planetmint_driver.crypto.Keyring` and by a
+:class:`~planetmint_driver.offchain.PreparedTransaction`.
+
+Metadata is a CID in version ``3.0`` transactions, so the payloads are made
+large with many outputs instead.
+
+Run from the root of the repository with::
+
+    PYTHONPATH=. python benchmarks/bench_canonical.py
+
+"""
+import timeit
+
+from ipld import marshal, multihash
+from transactions.common import memoize
+
+from planetmint_driver.codec import JSONCodec, RawJSON
+from planetmint_driver.crypto import Keyring, generate_keypair
+from planetmint_driver.offchain import PreparedTransaction, fulfill_transaction, prepare_create_transaction
+
+
+def clear_caches():
+    # NOTE: Transaction.from_dict() and to_dict() are memoized, start each
+    # run cold
+    memoize.from_dict.cache_clear()
+    memoize.to_dict.cache_clear()
+
+
+def encode_body(codec, body):
+    # NOTE: what the connection does with the body of a request
+    return bytes(body) if isinstance(body, RawJSON) else codec.dumps(body)
+
+
+def send_dicts(transactions, private_keys, codec):
+    clear_caches()
+    for transaction in transactions:
+        encode_body(codec, fulfill_transaction(transaction, private_keys=private_keys))
+
+
+def send_prepared(transactions, keyring, codec):
+    clear_caches()
+    for transaction in transactions:
+        encode_body(codec, PreparedTransaction.from_dict(transaction, trusted=True).sign(keyring).serialize())
+
+
+def main(n_transactions=200):
+    keypair = generate_keypair()
+    keyring = Keyring([keypair.private_key])
+    codec = JSONCodec()
+    for n_outputs in (1, 16, 128):
+        recipients = [([generate_keypair().public_key], 1) for _ in range(n_outputs)]
+        transactions = [
+            prepare_create_transaction(
+                signers=keypair.public_key,
+                recipients=recipients,
+                metadata=multihash(marshal({"index": index})),
+            )
+            for index in range(n_transactions)
+        ]
+        size = len(codec.dumps(fulfill_transaction(transactions[0], private_keys=keyring)))
+        print("{} CREATE transactions, {} outputs, {:.1f} kB each".format(n_transactions, n_outputs, size / 1024))
+        candidates = (
+            ("Transaction.sign", lambda: send_dicts(transactions, keypair.private_key, codec)),
+            ("fulfill with Keyring", lambda: send_dicts(transactions, keyring, codec)),
+            ("PreparedTransaction", lambda: send_prepared(transactions, keyring, codec)),
+        )
+        for label, func in candidates:
+            elapsed = min(timeit.repeat(func, number=1, repeat=3)) / n_transactions
+            print("    {:<24} {:8.1f} us/tx".format(label, elapsed * 1e6))
+
+
+if __name__ == "__main__":
+    main()
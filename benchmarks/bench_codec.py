@@ -0,0 +1,99 @@
+# Copyright Planetmint GmbH and Planetmint contributors
+# SPDX-License-Identifier: (Apache-2.0 AND CC-BY-4.0)
+# Code is Apache-2.0 and docs are CC-BY-4.0
+
+"""Compares decoding large block and outputs responses the way the driver
+used to (``response.text`` followed by ``response.json()``) with a single
+decode of the raw bytes by the codecs of :mod:`planetmint_driver.codec`.
+
+Run from the root of the repository with::
+
+    PYTHONPATH=. python benchmarks/bench_codec.py
+
+"""
+import json
+import timeit
+
+from requests.models import Response
+
+from planetmint_driver.codec import JSONCodec, RapidJSONCodec, StdlibJSONCodec
+
+
+def make_transaction(i):
+    return {
+        "id": "%064x" % i,
+        "inputs": [
+            {
+                "fulfillment": "pGSAIDE5i63cn4X8T8N1sZ2mGkJD5lNRnBM4PZgI_zvzbr-cgUA" * 2,
+                "fulfills": {"output_index": 0, "transaction_id": "%064x" % (i * 7)},
+                "owners_before": ["3Cxh1eKZk3Wp9KGBWFS7iVde465UvqUKnEqTg2MW4wNf"],
+            }
+        ],
+        "outputs": [
+            {
+                "amount": "1",
+                "condition": {
+                    "details": {
+                        "public_key": "EcRawy3Y22eAUSS94vLF8BVJi62wbqbD9iSUSUNU9wAA",
+                        "type": "ed25519-sha-256",
+                    },
+                    "uri": "ni:///sha-256;7ApQLsLLQgj5WOUipJg1txojmge68pctwFxvc3iOl54?fpt=ed25519-sha-256&cost=131072",
+                },
+                "public_keys": ["EcRawy3Y22eAUSS94vLF8BVJi62wbqbD9iSUSUNU9wAA"],
+            }
+        ],
+        "operation": "TRANSFER",
+        "metadata": "QmX8Vqb3Ctv6A6nZ3ZRUPzGQvNEvTbCDQHrh8Dbq7sUf2m",
+        "assets": [{"id": "%064x" % (i * 13)}],
+        "version": "3.0",
+    }
+
+
+def make_block(n_transactions=2000):
+    return {"height": 1, "transactions": [make_transaction(i) for i in range(n_transactions)]}
+
+
+def make_outputs(n_outputs=100000):
+    return [{"transaction_id": "%064x" % i, "output_index": i % 4} for i in range(n_outputs)]
+
+
+def make_response(payload):
+    response = Response()
+    response.status_code = 200
+    response.encoding = "utf-8"
+    response._content = json.dumps(payload).encode()
+    return response
+
+
+def decode_twice(response):
+    response.text
+    return response.json()
+
+
+def main(number=20):
+    for name, payload in (("block", make_block()), ("outputs", make_outputs())):
+        response = make_response(payload)
+        content = response.content
+        print("{} response: {:.1f} MB".format(name, len(content) / 2**20))
+        candidates = (
+            ("text + response.json()", lambda: decode_twice(response)),
+            ("StdlibJSONCodec.loads", lambda: StdlibJSONCodec().loads(content)),
+            ("RapidJSONCodec.loads", lambda: RapidJSONCodec().loads(content)),
+            ("JSONCodec.loads", lambda: JSONCodec().loads(content)),
+        )
+        for label, func in candidates:
+            elapsed = min(timeit.repeat(func, number=number, repeat=3)) / number
+            print("    {:<24} {:8.2f} ms".format(label, elapsed * 1000))
+
+        candidates = (
+            ("StdlibJSONCodec.dumps", lambda: StdlibJSONCodec().dumps(payload)),
+            ("RapidJSONCodec.dumps", lambda: RapidJSONCodec().dumps(payload)),
+            ("JSONCodec.dumps", lambda: JSONCodec().dumps(payload)),
+        )
+        for label, func in candidates:
+            elapsed = min(timeit.repeat(func, number=number, repeat=3)) / number
+            print("    {:<24} {:8.2f} ms".format(label, elapsed * 1000))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+# Copyright Planetmint GmbH and Planetmint contributors
+# SPDX-License-Identifier: (Apache-2.0 AND CC-BY-4.0)
+# Code is Apache-2.0 and docs are CC-BY-4.0
+
+"""Compares the coin selection strategies of
+:mod:`planetmint_driver.coinselect` on a wallet of 100k small outputs,
+against sorting the whole wallet by amount.
+
+Run from the root of the repository with::
+
+    PYTHONPATH=. python benchmarks/bench_coinselect.py
+
+"""
+import random
+import timeit
+
+from collections import namedtuple
+
+from planetmint_driver.coinselect import BRANCH_AND_BOUND, LARGEST_FIRST, OLDEST_FIRST, Selection, select_coins
+
+Coin = namedtuple("Coin", ("amount", "input"))
+
+
+def make_wallet(n_outputs=100000, seed=0):
+    rng = random.Random(seed)
+    return [Coin(rng.randint(1, 1000), None) for _ in range(n_outputs)]
+
+
+def sort_all(utxos, amount):
+    selected = []
+    total = 0
+    for utxo in sorted(utxos, key=lambda utxo: utxo.amount, reverse=True):
+        if total >= amount:
+            break
+        selected.append(utxo)
+        total += utxo.amount
+    return Selection(selected, total, total - amount)
+
+
+def main(number=5):
+    wallet = make_wallet()
+    print("wallet: {} outputs, {} units".format(len(wallet), sum(coin.amount for coin in wallet)))
+    for amount in (500, 25000, 5000000):
+        print("amount {}:".format(amount))
+        for label, strategy in (
+            ("sort the whole wallet", sort_all),
+            (LARGEST_FIRST, LARGEST_FIRST),
+            (OLDEST_FIRST, OLDEST_FIRST),
+            (BRANCH_AND_BOUND, BRANCH_AND_BOUND),
+        ):
+            selection = select_coins(wallet, amount, strategy)
+            elapsed = min(timeit.repeat(lambda: select_coins(wallet, amount, strategy), number=number, repeat=3))
+            print(
+                "    {:<22} {:8.2f} ms  {:6} inputs  change {}".format(
+                    label, elapsed / number * 1000, len(selection.utxos), selection.change
+                )
+            )
+
+
+if __name__ == "__main__":
+    main()
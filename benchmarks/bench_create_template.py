@@ -0,0 +1,53 @@
+# Copyright Planetmint GmbH and Planetmint contributors
+# SPDX-License-Identifier: (Apache-2.0 AND CC-BY-4.0)
+# Code is Apache-2.0 and docs are CC-BY-4.0
+
+"""Compares preparing ``"CREATE"`` transactions that differ only by their
+metadata with :func:`~planetmint_driver.offchain.prepare_create_transaction`
+and with a :class:`~planetmint_driver.offchain.CreateTemplate`.
+
+Run from the root of the repository with::
+
+    PYTHONPATH=. python benchmarks/bench_create_template.py
+
+"""
+import timeit
+
+from ipld import marshal, multihash
+
+from planetmint_driver.crypto import generate_keypairs
+from planetmint_driver.offchain import CreateTemplate, prepare_create_transaction
+
+
+def main(n_transactions=2000):
+    metadata = [multihash(marshal({"index": index})) for index in range(n_transactions)]
+    assets = [{"data": multihash(marshal({"collection": "bench"}))}]
+    for n_recipients in (1, 4, 16):
+        keypairs = generate_keypairs(n_recipients)
+        signers = keypairs[0].public_key
+        recipients = [([keypair.public_key], 1) for keypair in keypairs]
+        print("{} CREATE transactions, {} recipients".format(n_transactions, n_recipients))
+        candidates = (
+            (
+                "prepare_create_transaction",
+                lambda: [
+                    prepare_create_transaction(signers=signers, recipients=recipients, assets=assets, metadata=cid)
+                    for cid in metadata
+                ],
+            ),
+            (
+                "CreateTemplate.prepare",
+                lambda: [
+                    template.prepare(metadata=cid)
+                    for template in [CreateTemplate(signers=signers, recipients=recipients, assets=assets)]
+                    for cid in metadata
+                ],
+            ),
+        )
+        for label, func in candidates:
+            elapsed = min(timeit.repeat(func, number=1, repeat=3)) / n_transactions
+            print("    {:<28} {:8.1f} us/tx".format(label, elapsed * 1e6))
+
+
+if __name__ == "__main__":
+    main()
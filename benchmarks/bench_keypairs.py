@@ -0,0 +1,40 @@
+# Copyright Planetmint GmbH and Planetmint contributors
+# SPDX-License-Identifier: (Apache-2.0 AND CC-BY-4.0)
+# Code is Apache-2.0 and docs are CC-BY-4.0
+
+"""Measures the key pairs generated or derived per second by
+:func:`~planetmint_driver.crypto.generate_keypair`,
+:func:`~planetmint_driver.crypto.generate_keypairs`,
+:func:`~planetmint_driver.crypto.derive_keypair` and a
+:class:`~planetmint_driver.crypto.KeyChain`, cold and cached.
+
+Run from the root of the repository with::
+
+    PYTHONPATH=. python benchmarks/bench_keypairs.py
+
+"""
+import os
+import timeit
+
+from planetmint_driver.crypto import KeyChain, derive_keypair, generate_keypair, generate_keypairs
+
+
+def main(n_keys=20000):
+    master_seed = os.urandom(32)
+    chain = KeyChain(master_seed, cache_size=n_keys)
+    chain.keypairs(range(n_keys))
+    print("{} key pairs".format(n_keys))
+    candidates = (
+        ("generate_keypair", lambda: [generate_keypair() for _ in range(n_keys)]),
+        ("generate_keypairs", lambda: generate_keypairs(n_keys)),
+        ("derive_keypair", lambda: [derive_keypair(master_seed, index) for index in range(n_keys)]),
+        ("KeyChain, cold", lambda: KeyChain(master_seed, cache_size=n_keys).keypairs(range(n_keys))),
+        ("KeyChain, cached", lambda: chain.keypairs(range(n_keys))),
+    )
+    for label, func in candidates:
+        elapsed = min(timeit.repeat(func, number=1, repeat=3))
+        print("    {:<24} {:10.0f} keys/s".format(label, n_keys / elapsed))
+
+
+if __name__ == "__main__":
+    main()
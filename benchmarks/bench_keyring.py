@@ -0,0 +1,51 @@
+# Copyright Planetmint GmbH and Planetmint contributors
+# SPDX-License-Identifier: (Apache-2.0 AND CC-BY-4.0)
+# Code is Apache-2.0 and docs are CC-BY-4.0
+
+"""Compares fulfilling transactions with private keys given as strings,
+which are decoded on every call, with a
+:class:`~planetmint_driver.crypto.Keyring` holding the parsed keys.
+
+Run from the root of the repository with::
+
+    PYTHONPATH=. python benchmarks/bench_keyring.py
+
+"""
+import timeit
+
+from ipld import marshal, multihash
+from transactions.common import memoize
+
+from planetmint_driver.crypto import Keyring, generate_keypair
+from planetmint_driver.offchain import fulfill_transaction, prepare_create_transaction
+
+
+def fulfill_all(transactions, private_keys):
+    # NOTE: Transaction.from_dict() is memoized, start each run cold
+    memoize.from_dict.cache_clear()
+    memoize.to_dict.cache_clear()
+    for transaction in transactions:
+        fulfill_transaction(transaction, private_keys=private_keys)
+
+
+def main(n_transactions=1000, n_keys=4):
+    keypairs = [generate_keypair() for _ in range(n_keys)]
+    signers = [keypair.public_key for keypair in keypairs[:2]]
+    transactions = [
+        prepare_create_transaction(signers=signers, metadata=multihash(marshal({"index": index})))
+        for index in range(n_transactions)
+    ]
+    private_keys = [keypair.private_key for keypair in keypairs]
+    keyring = Keyring(private_keys)
+    print("{} CREATE transactions, 2 signers, {} keys".format(n_transactions, n_keys))
+    candidates = (
+        ("private keys as strings", lambda: fulfill_all(transactions, private_keys)),
+        ("Keyring", lambda: fulfill_all(transactions, keyring)),
+    )
+    for label, func in candidates:
+        elapsed = min(timeit.repeat(func, number=1, repeat=3)) / n_transactions
+        print("    {:<24} {:8.1f} us/tx".format(label, elapsed * 1e6))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+# Copyright Planetmint GmbH and Planetmint contributors
+# SPDX-License-Identifier: (Apache-2.0 AND CC-BY-4.0)
+# Code is Apache-2.0 and docs are CC-BY-4.0
+
+"""Compares delegating the signatures to a remote signer one input at a
+time, with :func:`~planetmint_driver.offchain.fulfill_with_signing_delegation`,
+and for a whole batch at once, with
+:func:`~planetmint_driver.offchain.fulfill_batch_with_signing_delegation`.
+
+The remote signer is simulated by a :class:`~planetmint_driver.crypto.Keyring`
+and a fixed round trip time.
+
+Run from the root of the repository with::
+
+    PYTHONPATH=. python benchmarks/bench_signing_delegation.py
+
+"""
+import time
+
+from ipld import marshal, multihash
+
+from planetmint_driver.crypto import Keyring, generate_keypair
+from planetmint_driver.offchain import (
+    fulfill_batch_with_signing_delegation,
+    fulfill_with_signing_delegation,
+    prepare_create_transaction,
+)
+
+
+class RemoteSigner:
+    def __init__(self, keyring, round_trip):
+        self.keyring = keyring
+        self.round_trip = round_trip
+        self.round_trips = 0
+
+    def sign(self, input_, message):
+        self.round_trips += 1
+        time.sleep(self.round_trip)
+        return self.keyring.sign(input_["owners_before"][0], message)
+
+    def sign_many(self, requests):
+        self.round_trips += 1
+        time.sleep(self.round_trip)
+        return [self.keyring.sign(request.public_key, request.message) for request in requests]
+
+
+def main(n_transactions=1000, round_trip=0.002):
+    keypair = generate_keypair()
+    transactions = [
+        prepare_create_transaction(signers=keypair.public_key, metadata=multihash(marshal({"index": index})))
+        for index in range(n_transactions)
+    ]
+    print("{} CREATE transactions, {:.0f} ms round trip".format(n_transactions, round_trip * 1000))
+    candidates = (
+        (
+            "one call per input",
+            lambda signer: [fulfill_with_signing_delegation(transaction, signer.sign) for transaction in transactions],
+        ),
+        ("one call per batch", lambda signer: fulfill_batch_with_signing_delegation(transactions, signer.sign_many)),
+    )
+    for label, func in candidates:
+        signer = RemoteSigner(Keyring(keypair.private_key), round_trip)
+        start = time.perf_counter()
+        func(signer)
+        elapsed = time.perf_counter() - start
+        print("    {:<24} {:8.2f} s {:6d} round trips".format(label, elapsed, signer.round_trips))
+
+
+if __name__ == "__main__":
+    main()
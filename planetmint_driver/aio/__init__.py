@@ -0,0 +1,10 @@
+# Copyright Planetmint GmbH and Planetmint contributors
+# SPDX-License-Identifier: (Apache-2.0 AND CC-BY-4.0)
+# Code is Apache-2.0 and docs are CC-BY-4.0
+
+"""Asyncio flavour of the driver. Requires the optional ``aiohttp``
+dependency (``pip install planetmint-driver[aio]``).
+
+"""
+
+from .driver import AsyncPlanetmint  # noqa
@@ -0,0 +1,195 @@
+# Copyright Planetmint GmbH and Planetmint contributors
+# SPDX-License-Identifier: (Apache-2.0 AND CC-BY-4.0)
+# Code is Apache-2.0 and docs are CC-BY-4.0
+
+import asyncio
+import time
+
+from functools import partial
+
+from aiohttp import ClientConnectionError, ClientSession, ClientTimeout
+
+from ..connection import STREAM_CHUNK_SIZE, BaseConnection, HttpResponse
+from ..streaming import JSONArrayParser
+
+
+def _encode_params(params):
+    """Encodes URL (query) parameters the way :mod:`requests` does:
+    ``None`` values are dropped, lists are sent as repeated keys and
+    every other value is converted to :obj:`str`.
+
+    """
+    if not params:
+        return None
+
+    encoded = []
+    for key, value in params.items():
+        if value is None:
+            continue
+        values = value if isinstance(value, (list, tuple)) else (value,)
+        encoded.extend((key, str(item)) for item in values)
+    return encoded
+
+
+def _set_done(future):
+    if not future.done():
+        future.set_result(None)
+
+
+class AsyncConnection(BaseConnection):
+    """An asyncio Connection object to make HTTP requests to a particular
+    node.
+
+    The underlying :class:`aiohttp.ClientSession` is created lazily on the
+    first request, so that it is bound to the running event loop.
+
+    """
+
+    def __init__(self, *, node_url, headers=None, codec=None):
+        """Initializes a
+        :class:`~planetmint_driver.aio.connection.AsyncConnection` instance.
+
+        Args:
+            node_url (str):  Url of the node to connect to.
+            headers (dict): Optional headers to send with each request.
+            codec (:class:`~planetmint_driver.codec.AbstractCodec`): Optional
+                JSON codec for request and response bodies.
+
+        """
+        super().__init__(node_url=node_url, codec=codec)
+        self.headers = dict(headers) if headers else {}
+        self._session = None
+
+    @property
+    def session(self):
+        """:class:`aiohttp.ClientSession`: The session used to talk to the
+        node.
+        """
+        if self._session is None or self._session.closed:
+            self._session = ClientSession(headers=self.headers)
+        return self._session
+
+    async def request(
+        self, method, *, path=None, json=None, params=None, headers=None, timeout=None, backoff_cap=None, **kwargs
+    ):
+        """Performs an HTTP request with the given parameters.
+
+           Implements the same exponential backoff as
+           :meth:`Connection.request() <.connection.Connection.request>`,
+           but waits for the backoff without blocking the event loop.
+
+        Args:
+            method (str): HTTP method (e.g.: ``'GET'``).
+            path (str): API endpoint path (e.g.: ``'/transactions'``).
+            json (dict): JSON data to send along with the request.
+            params (dict): Dictionary of URL (query) parameters.
+            headers (dict): Optional headers to pass to the request.
+            timeout (int): Optional timeout in seconds.
+            backoff_cap (int): The maximal allowed backoff delay in seconds
+                               to be assigned to a node.
+            kwargs: Optional keyword arguments, e.g. ``stream`` and
+                ``stream_key``, in which case the :attr:`data` of a
+                successful response is an asynchronous iterator over the
+                items of the JSON array in the body.
+
+        """
+        with self._track_in_flight():
+            probe, timeout = await self._wait_admission(timeout)
+            try:
+                conn_exc = None
+                start = time.perf_counter()
+                try:
+                    response = await self._request(
+                        method=method,
+                        timeout=timeout,
+                        url=self._get_url(path),
+                        json=json,
+                        params=params,
+                        headers=headers,
+                        **kwargs,
+                    )
+                except ClientConnectionError as err:
+                    conn_exc = err
+                    raise err
+                finally:
+                    self.update_backoff_time(success=conn_exc is None, backoff_cap=backoff_cap)
+                    self.record_request(time.perf_counter() - start, success=conn_exc is None)
+                return response
+            finally:
+                if probe:
+                    self._release_probe()
+
+    async def _wait_admission(self, timeout):
+        """Asyncio counterpart of
+        :meth:`Connection._wait_admission() <.connection.Connection._wait_admission>`.
+        """
+        loop = asyncio.get_running_loop()
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            probe_done = loop.create_future()
+            admitted, probe, delay = self._admit(partial(loop.call_soon_threadsafe, _set_done, probe_done))
+            if admitted:
+                return probe, timeout
+            remaining = None if deadline is None else deadline - time.monotonic()
+            if delay is not None:
+                if remaining is not None and remaining < delay:
+                    raise TimeoutError
+                await asyncio.sleep(max(delay, 0))
+            else:
+                done, _ = await asyncio.wait({probe_done}, timeout=remaining)
+                if not done:
+                    raise TimeoutError
+            timeout = None if deadline is None else deadline - time.monotonic()
+
+    async def _request(
+        self,
+        *,
+        method,
+        url,
+        timeout=None,
+        params=None,
+        json=None,
+        headers=None,
+        stream=False,
+        stream_key=None,
+        **kwargs
+    ):
+        data, headers = self._encode_body(json, headers)
+        if stream:
+            # NOTE: a streamed body may take long to read, so the timeout
+            # applies to each read instead of to the whole response
+            client_timeout = ClientTimeout(sock_connect=timeout, sock_read=timeout)
+        else:
+            client_timeout = ClientTimeout(total=timeout)
+        response = await self.session.request(
+            method,
+            url,
+            params=_encode_params(params),
+            data=data,
+            headers=headers,
+            timeout=client_timeout,
+            **kwargs,
+        )
+        if stream and 200 <= response.status < 300:
+            return HttpResponse(response.status, response.headers, self._stream_items(response, stream_key))
+        try:
+            content = await response.read()
+        finally:
+            response.release()
+        return self._make_response(response.status, response.headers, content, url, response.charset)
+
+    async def _stream_items(self, response, key):
+        parser = JSONArrayParser(self.codec.loads, key=key)
+        try:
+            async for chunk in response.content.iter_chunked(STREAM_CHUNK_SIZE):
+                for item in parser.feed(chunk):
+                    yield item
+            parser.close()
+        finally:
+            response.release()
+
+    async def close(self):
+        """Closes the underlying session, if any."""
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
@@ -0,0 +1,156 @@
+# Copyright Planetmint GmbH and Planetmint contributors
+# SPDX-License-Identifier: (Apache-2.0 AND CC-BY-4.0)
+# Code is Apache-2.0 and docs are CC-BY-4.0
+
+from ..bulk import async_send_many
+from ..cache import MUTABLE
+from ..confirm import AsyncConfirmer
+from ..driver import BlocksEndpoint, Planetmint, TransactionsEndpoint
+from ..follow import AsyncBlockFollower
+from .transport import AsyncTransport
+
+
+class AsyncPlanetmint(Planetmint):
+    """An asyncio flavour of the :class:`~planetmint_driver.Planetmint`
+    driver.
+
+    It exposes the same namespaced endpoints (``transactions``,
+    ``outputs``, ``blocks``, ``assets`` and ``metadata``), but every method
+    that talks to a node is a coroutine. Offchain helpers such as
+    :meth:`~.TransactionsEndpoint.prepare` and
+    :meth:`~.TransactionsEndpoint.fulfill` stay synchronous.
+
+    Example:
+
+        >>> async with AsyncPlanetmint('http://localhost:9984') as bdb:
+        ...     tx = await bdb.transactions.retrieve(txid)
+
+    """
+
+    confirmer_class = AsyncConfirmer
+
+    def __init__(self, *nodes, transport_class=AsyncTransport, headers=None, timeout=20, **kwargs):
+        """Initialize a :class:`~planetmint_driver.aio.AsyncPlanetmint`
+        driver instance.
+
+        Args:
+            *nodes (list of (str or dict)): Planetmint nodes to connect to.
+            transport_class: Optional transport class to use.
+                Defaults to
+                :class:`~planetmint_driver.aio.transport.AsyncTransport`.
+            headers (dict): Optional headers that will be passed with
+                each request.
+            timeout (int): Optional timeout in seconds that will be passed
+                to each request.
+            kwargs: Optional keyword arguments passed on to
+                :class:`~planetmint_driver.Planetmint`, e.g.
+                ``validate_transactions``, or to ``transport_class``, e.g.
+                ``picker_class``.
+        """
+        super().__init__(*nodes, transport_class=transport_class, headers=headers, timeout=timeout, **kwargs)
+        self._transactions = AsyncTransactionsEndpoint(self)
+        self._blocks = AsyncBlocksEndpoint(self)
+
+    async def close(self):
+        """Cancels the pending confirmations, if any, and closes the HTTP
+        sessions held by the transport.
+        """
+        if self._confirmer is not None:
+            await self._confirmer.close()
+        await self.transport.close()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+
+class AsyncTransactionsEndpoint(TransactionsEndpoint):
+    """Asyncio flavour of
+    :class:`~planetmint_driver.driver.TransactionsEndpoint`.
+    """
+
+    async def submit(self, transaction, mode="async", timeout=None, headers=None):
+        """Submit a transaction and return a future that resolves once the
+        transaction is committed.
+
+        Behaves like
+        :meth:`TransactionsEndpoint.submit()
+        <planetmint_driver.driver.TransactionsEndpoint.submit>`.
+
+        Args:
+            transaction (:obj:`dict` | :class:`~planetmint_driver.offchain.PreparedTransaction`):
+                the transaction to be sent to the Federation node(s).
+            mode (str): Either ``'async'`` or ``'sync'``. Defaults to
+                ``'async'``.
+            timeout (float): Optional number of seconds to wait for the
+                commit. Defaults to the timeout of the confirmer.
+            headers (dict): Optional headers to pass to the request.
+
+        Returns:
+            :class:`asyncio.Future`: Resolves to the committed transaction.
+
+        """
+        await self._get_sender(mode, headers, ("async", "sync"))(transaction)
+        return self.driver.confirmer.track(self._get_id(transaction), timeout=timeout)
+
+    async def send_many(self, transactions, mode="async", concurrency=8, headers=None):
+        """Submit many transactions, keeping up to ``concurrency`` requests
+        in flight.
+
+        Behaves like
+        :meth:`TransactionsEndpoint.send_many()
+        <planetmint_driver.driver.TransactionsEndpoint.send_many>`;
+        ``transactions`` may also be an asynchronous iterable.
+
+        Args:
+            transactions: The transactions (dicts or
+                :class:`~planetmint_driver.offchain.PreparedTransaction`)
+                to send to the Federation node(s).
+            mode (str): Either ``'async'``, ``'sync'`` or ``'commit'``.
+                Defaults to ``'async'``.
+            concurrency (int): Maximum number of requests in flight.
+                Defaults to ``8``.
+            headers (dict): Optional headers to pass to the requests.
+
+        Returns:
+            :obj:`list` of :class:`~planetmint_driver.bulk.SendResult`:
+            The response or the error of each transaction, in input order.
+
+        """
+        return await async_send_many(self._get_sender(mode, headers), transactions, concurrency)
+
+
+class AsyncBlocksEndpoint(BlocksEndpoint):
+    """Asyncio flavour of :class:`~planetmint_driver.driver.BlocksEndpoint`."""
+
+    async def get(self, *, txid, headers=None):
+        """Get the block that contains the given transaction id (``txid``)
+           else return ``None``
+
+        Args:
+            txid (str): Transaction id.
+            headers (dict): Optional headers to pass to the request.
+
+        Returns:
+            :obj:`list` of :obj:`int`: List of block heights.
+
+        """
+        block_list = await self._get_cacheable(
+            MUTABLE, path=self.rel_uri, params={"transaction_id": txid}, headers=headers
+        )
+        return block_list if block_list else None
+
+    def follow(self, start=1, **kwargs):
+        """Iterates asynchronously over the blocks in order from height
+        ``start`` on, see
+        :meth:`BlocksEndpoint.follow()
+        <planetmint_driver.driver.BlocksEndpoint.follow>`.
+
+        Returns:
+            :class:`~planetmint_driver.follow.AsyncBlockFollower`: An
+            asynchronous iterator over the blocks.
+
+        """
+        return AsyncBlockFollower(self.driver, start, **kwargs)
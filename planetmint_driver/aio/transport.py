@@ -0,0 +1,154 @@
+# Copyright Planetmint GmbH and Planetmint contributors
+# SPDX-License-Identifier: (Apache-2.0 AND CC-BY-4.0)
+# Code is Apache-2.0 and docs are CC-BY-4.0
+
+import asyncio
+
+from functools import partial
+from time import time
+
+from aiohttp import ClientConnectionError
+
+from ..cache import MUTABLE
+from ..exceptions import TimeoutError, TransportError
+from ..transport import NO_TIMEOUT_BACKOFF_CAP, Transport
+from ..singleflight import AsyncSingleFlight
+from .connection import AsyncConnection
+
+
+class AsyncTransport(Transport):
+    """Asyncio counterpart of :class:`~planetmint_driver.transport.Transport`."""
+
+    connection_class = AsyncConnection
+    single_flight_class = AsyncSingleFlight
+
+    async def forward_request(self, method, path=None, json=None, params=None, headers=None, cacheable=None):
+        """Makes HTTP requests to the configured nodes.
+
+           Behaves like
+           :meth:`Transport.forward_request()
+           <planetmint_driver.transport.Transport.forward_request>`:
+           connection errors are retried on the next node picked from the
+           pool, exponential backoff is implemented individually for
+           each node, ``GET`` requests are hedged if a
+           :class:`~planetmint_driver.hedging.HedgingPolicy` is set,
+           cacheable responses are cached if a cache is set, and identical
+           concurrent ``GET`` requests are coalesced if ``coalesce`` is set.
+
+        Args:
+            method (str): HTTP method name (e.g.: ``'GET'``).
+            path (str): Path to be appended to the base url of a node. E.g.:
+                ``'/transactions'``).
+            json (dict): Payload to be sent with the HTTP request.
+            params (dict)): Dictionary of URL (query) parameters.
+            headers (dict): Optional headers to pass to the request.
+            cacheable (str): Either :attr:`~planetmint_driver.cache.IMMUTABLE`
+                or :attr:`~planetmint_driver.cache.MUTABLE` if the response
+                may be cached. Defaults to ``None``.
+
+        Returns:
+            dict: The decoded JSON body of the response.
+
+        """
+        request = dict(method=method, path=path, json=json, params=params, headers=headers)
+        cache = self._should_cache(method, cacheable)
+        coalesce = self._should_coalesce(method)
+        if not (cache or coalesce):
+            return await self._dispatch_request(request)
+
+        key = self._request_key(request)
+        if cache:
+            try:
+                return self.cache.get(key)
+            except KeyError:
+                pass
+        if coalesce:
+            data = await self._single_flight.do(key, partial(self._dispatch_request, request))
+        else:
+            data = await self._dispatch_request(request)
+        if cache:
+            self.cache.set(key, data, mutable=cacheable == MUTABLE)
+        return data
+
+    async def stream_request(self, method, path=None, params=None, headers=None, key=None):
+        """Makes an HTTP request to one of the configured nodes and yields
+           the items of the JSON array in the response body as they are
+           received.
+
+           Asynchronous generator counterpart of
+           :meth:`Transport.stream_request()
+           <planetmint_driver.transport.Transport.stream_request>`.
+
+        Args:
+            method (str): HTTP method name (e.g.: ``'GET'``).
+            path (str): Path to be appended to the base url of a node.
+            params (dict)): Dictionary of URL (query) parameters.
+            headers (dict): Optional headers to pass to the request.
+            key (str): Optional key of the array to stream, if the response
+                body is a JSON object.
+
+        """
+        request = dict(
+            method=method, path=path, json=None, params=params, headers=headers, stream=True, stream_key=key
+        )
+        items = await self._forward_request(request)
+        async for item in items:
+            yield item
+
+    async def _dispatch_request(self, request):
+        if self._should_hedge(request["method"]):
+            return await self._forward_hedged_request(request)
+        return await self._forward_request(request)
+
+    async def _forward_request(self, request, exclude=(), tried=None):
+        error_trace = []
+        timeout = self.timeout
+        backoff_cap = NO_TIMEOUT_BACKOFF_CAP if timeout is None else timeout / 2
+        while timeout is None or timeout > 0:
+            connection = self.connection_pool.get_connection(exclude=exclude)
+            if tried is not None:
+                tried.append(connection)
+
+            start = time()
+            try:
+                response = await connection.request(timeout=timeout, backoff_cap=backoff_cap, **request)
+            except ClientConnectionError as err:
+                error_trace.append(err)
+                continue
+            else:
+                return response.data
+            finally:
+                elapsed = time() - start
+                if timeout is not None:
+                    timeout -= elapsed
+
+        raise TimeoutError(error_trace)
+
+    async def _forward_hedged_request(self, request):
+        tried = []
+        started = {asyncio.ensure_future(self._forward_request(request, tried=tried)): time()}
+        done, _ = await asyncio.wait(started, timeout=self.hedging.delay)
+        if not done:
+            started[asyncio.ensure_future(self._forward_request(request, exclude=tuple(tried)))] = time()
+
+        error = None
+        pending = set(started)
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    exc = task.exception()
+                    if exc is None or isinstance(exc, TransportError):
+                        # NOTE: an HTTP error is an answer of the node as well
+                        self.hedging.record(time() - started[task])
+                        return task.result()
+                    error = error or exc
+            raise error
+        finally:
+            for task in pending:
+                task.cancel()
+
+    async def close(self):
+        """Closes the sessions of all the connections in the pool."""
+        for connection in self.connection_pool.connections:
+            await connection.close()
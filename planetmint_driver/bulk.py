@@ -0,0 +1,110 @@
+# Copyright Planetmint GmbH and Planetmint contributors
+# SPDX-License-Identifier: (Apache-2.0 AND CC-BY-4.0)
+# Code is Apache-2.0 and docs are CC-BY-4.0
+
+"""Bulk submission of transactions with a bounded number of requests in
+flight.
+
+"""
+import asyncio
+
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from threading import BoundedSemaphore
+
+SendResult = namedtuple("SendResult", ("transaction", "response", "error"))
+SendResult.__doc__ = """Outcome of the submission of one transaction.
+
+Attributes:
+    transaction (dict): The submitted transaction.
+    response (dict): The response of the node, or ``None`` if the
+        submission failed.
+    error (Exception): The exception raised by the submission, or ``None``
+        if it succeeded.
+"""
+
+
+def _check_concurrency(concurrency):
+    if concurrency < 1:
+        raise ValueError("concurrency must be at least 1, got {}".format(concurrency))
+
+
+def send_many(send, transactions, concurrency):
+    """Calls ``send`` on each transaction from a pool of threads, with at
+    most ``concurrency`` calls in flight.
+
+    ``transactions`` is consumed lazily: the next transaction is only
+    pulled once a call completes, so that a slow Federation slows down the
+    producer instead of letting pending transactions pile up in memory.
+
+    Args:
+        send (callable): Submits a single transaction, e.g.
+            :meth:`~planetmint_driver.driver.TransactionsEndpoint.send_async`.
+        transactions (iterable): The transactions to submit.
+        concurrency (int): Maximum number of calls in flight.
+
+    Returns:
+        :obj:`list` of :class:`~planetmint_driver.bulk.SendResult`: The
+        outcome of each submission, in input order.
+
+    """
+    _check_concurrency(concurrency)
+    slots = BoundedSemaphore(concurrency)
+    submitted = []
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        for transaction in transactions:
+            slots.acquire()
+            future = executor.submit(send, transaction)
+            future.add_done_callback(lambda _: slots.release())
+            submitted.append((transaction, future))
+
+    results = []
+    for transaction, future in submitted:
+        error = future.exception()
+        results.append(SendResult(transaction, None if error else future.result(), error))
+    return results
+
+
+async def async_send_many(send, transactions, concurrency):
+    """Asyncio counterpart of :func:`send_many`.
+
+    Args:
+        send (callable): Coroutine function submitting a single
+            transaction.
+        transactions: Iterable or asynchronous iterable of the
+            transactions to submit.
+        concurrency (int): Maximum number of calls in flight.
+
+    Returns:
+        :obj:`list` of :class:`~planetmint_driver.bulk.SendResult`: The
+        outcome of each submission, in input order.
+
+    """
+    _check_concurrency(concurrency)
+    slots = asyncio.Semaphore(concurrency)
+
+    async def send_one(transaction):
+        try:
+            return SendResult(transaction, await send(transaction), None)
+        except Exception as exc:
+            return SendResult(transaction, None, exc)
+        finally:
+            slots.release()
+
+    async def submit(transaction):
+        await slots.acquire()
+        tasks.append(asyncio.ensure_future(send_one(transaction)))
+
+    tasks = []
+    try:
+        if hasattr(transactions, "__aiter__"):
+            async for transaction in transactions:
+                await submit(transaction)
+        else:
+            for transaction in transactions:
+                await submit(transaction)
+        return list(await asyncio.gather(*tasks))
+    except BaseException:
+        for task in tasks:
+            task.cancel()
+        raise
@@ -0,0 +1,114 @@
+# Copyright Planetmint GmbH and Planetmint contributors
+# SPDX-License-Identifier: (Apache-2.0 AND CC-BY-4.0)
+# Code is Apache-2.0 and docs are CC-BY-4.0
+
+"""Response caches that can be plugged into a
+:class:`~planetmint_driver.transport.Transport`.
+
+Attributes:
+    IMMUTABLE (str): Marks a response that never changes, e.g. a committed
+        transaction or block.
+    MUTABLE (str): Marks a response that may change over time, e.g. the
+        outputs of a public key.
+"""
+from abc import ABCMeta, abstractmethod
+from collections import OrderedDict
+from threading import Lock
+from time import monotonic
+
+IMMUTABLE = "immutable"
+MUTABLE = "mutable"
+
+
+class AbstractCache(metaclass=ABCMeta):
+    """Abstract class for response caches."""
+
+    @abstractmethod
+    def get(self, key):
+        """Returns the value cached under ``key``.
+
+        Args:
+            key (tuple): Hashable key of a request.
+
+        Raises:
+            KeyError: If nothing is cached under ``key``.
+
+        """
+        pass  # pragma: no cover
+
+    @abstractmethod
+    def set(self, key, value, mutable=False):
+        """Caches ``value`` under ``key``.
+
+        Args:
+            key (tuple): Hashable key of a request.
+            value: The decoded response.
+            mutable (bool): Whether the response may change over time. It
+                is up to the cache to expire, or to not store, such values.
+
+        """
+        pass  # pragma: no cover
+
+
+class LRUCache(AbstractCache):
+    """A size-bounded, thread-safe, least recently used cache.
+
+    Immutable responses are kept until they are evicted. Mutable responses
+    are only cached if a ``ttl`` is given, and expire after ``ttl`` seconds.
+
+    .. note:: Cached responses are shared between callers, and must not be
+        modified in place.
+
+    """
+
+    def __init__(self, maxsize=1024, ttl=None):
+        """Initializes a :class:`~planetmint_driver.cache.LRUCache` instance.
+
+        Args:
+            maxsize (int): Maximum number of cached responses.
+            ttl (float): Optional time to live in seconds of mutable
+                responses. Defaults to ``None``, meaning that mutable
+                responses are not cached.
+
+        """
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key):
+        with self._lock:
+            try:
+                value, expires = self._entries[key]
+            except KeyError:
+                self.misses += 1
+                raise
+            if expires is not None and expires <= monotonic():
+                del self._entries[key]
+                self.misses += 1
+                raise KeyError(key)
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key, value, mutable=False):
+        if mutable and self.ttl is None:
+            return
+        expires = monotonic() + self.ttl if mutable else None
+        with self._lock:
+            self._entries[key] = (value, expires)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        """Removes all the cached responses and resets the counters."""
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
@@ -0,0 +1,109 @@
+# Copyright Planetmint GmbH and Planetmint contributors
+# SPDX-License-Identifier: (Apache-2.0 AND CC-BY-4.0)
+# Code is Apache-2.0 and docs are CC-BY-4.0
+
+"""Canonical serialization of transactions, i.e. compact JSON with sorted
+keys, which is hashed into the id of a transaction and signed by its
+inputs.
+
+A transaction is serialized three times on its way to a node: without its
+signatures for the message to sign, with its signatures but without its id
+for the id, and in full for the request body. These serializations only
+differ in the ``inputs`` and ``id`` members, so
+:class:`CanonicalTransaction` serializes each member once, and assembles the
+documents from the serialized members.
+
+"""
+from hashlib import sha3_256
+
+import rapidjson
+
+from .codec import RawJSON
+
+
+def dumps(obj):
+    """Returns the canonical serialization of ``obj``, as :obj:`bytes`.
+
+    The output is the same as the one of
+    :func:`transactions.common.utils.serialize`, encoded in UTF-8.
+
+    """
+    return rapidjson.dumps(obj, skipkeys=False, ensure_ascii=False, sort_keys=True).encode()
+
+
+def hash_serialized(serialized):
+    """Returns the SHA3-256 hex digest of a serialized transaction, i.e. its
+    id when it is serialized with a ``null`` id.
+    """
+    return sha3_256(serialized).hexdigest()
+
+
+class CanonicalTransaction:
+    """Canonical serialization of a transaction payload, assembled from its
+    separately serialized members.
+
+    """
+
+    def __init__(self, transaction):
+        """Initializes a
+        :class:`~planetmint_driver.canonical.CanonicalTransaction` instance.
+
+        Args:
+            transaction (dict): The transaction payload. It must not be
+                modified afterwards, except through :meth:`set_inputs`.
+
+        """
+        self.transaction = transaction
+        self._members = {key: dumps(value) for key, value in transaction.items()}
+
+    def set_inputs(self, inputs):
+        """Replaces the inputs of the transaction, e.g. once signed."""
+        self.transaction["inputs"] = inputs
+        self._members["inputs"] = dumps(inputs)
+
+    def serialize(self, *, with_id=True, with_signatures=True):
+        """Returns the canonical serialization of the transaction.
+
+        Args:
+            with_id (bool): Whether to include the id, or ``null``, as when
+                the id is computed.
+            with_signatures (bool): Whether to include the fulfillments of
+                the inputs, or ``null``, as when the inputs are signed.
+
+        Returns:
+            bytes: The serialized transaction.
+
+        """
+        members = self._members
+        if not with_id:
+            members = dict(members, id=b"null")
+        if not with_signatures:
+            inputs = [dict(input_, fulfillment=None) for input_ in self.transaction["inputs"]]
+            members = dict(members, inputs=dumps(inputs))
+        # NOTE: the keys of a transaction are ASCII, sorting them in Python
+        # gives the same order as rapidjson
+        return b"{" + b",".join(dumps(key) + b":" + members[key] for key in sorted(members)) + b"}"
+
+    def update_id(self):
+        """Sets the id of the transaction to the hash of its serialization.
+
+        Returns:
+            str: The id.
+
+        """
+        txid = hash_serialized(self.serialize(with_id=False))
+        self.transaction["id"] = txid
+        self._members["id"] = dumps(txid)
+        return txid
+
+    def to_dict(self):
+        """Returns a copy of the payload decoded from the serialized
+        members, which shares no object with :attr:`transaction`.
+        """
+        return {key: rapidjson.loads(member) for key, member in self._members.items()}
+
+    def to_raw_json(self):
+        """Returns the serialized transaction as a request body, see
+        :class:`~planetmint_driver.codec.RawJSON`.
+        """
+        return RawJSON(self.serialize())
@@ -0,0 +1,93 @@
+# Copyright Planetmint GmbH and Planetmint contributors
+# SPDX-License-Identifier: (Apache-2.0 AND CC-BY-4.0)
+# Code is Apache-2.0 and docs are CC-BY-4.0
+
+"""JSON codecs used to serialize request bodies and to decode response
+bodies.
+
+"""
+import json
+
+from abc import ABCMeta, abstractmethod
+
+import rapidjson
+
+
+class RawJSON(bytes):
+    """A JSON document serialized beforehand, e.g. the canonical
+    serialization of a transaction, which is sent as is as a request body
+    instead of being serialized again by the codec.
+    """
+
+
+class AbstractCodec(metaclass=ABCMeta):
+    """Abstract class for JSON codecs.
+
+    Attributes:
+        content_type (str): Value of the ``Content-Type`` header of the
+            request bodies produced by :meth:`dumps`.
+
+    """
+
+    content_type = "application/json"
+
+    @abstractmethod
+    def dumps(self, obj):
+        """Serializes ``obj`` into a JSON document.
+
+        Args:
+            obj: The object to serialize.
+
+        Returns:
+            bytes: The UTF-8 encoded document.
+
+        """
+        pass  # pragma: no cover
+
+    @abstractmethod
+    def loads(self, data):
+        """Deserializes a JSON document.
+
+        Args:
+            data (bytes): The UTF-8 encoded document.
+
+        Raises:
+            ValueError: If ``data`` is not a valid JSON document.
+
+        """
+        pass  # pragma: no cover
+
+
+class JSONCodec(AbstractCodec):
+    """Default codec: serializes with :mod:`rapidjson`, which is several
+    times faster than the standard library at encoding, and decodes with
+    the standard library :mod:`json` module, whose C decoder is faster
+    than :mod:`rapidjson` at decoding (see ``benchmarks/bench_codec.py``).
+
+    """
+
+    def dumps(self, obj):
+        return rapidjson.dumps(obj, ensure_ascii=False).encode()
+
+    def loads(self, data):
+        return json.loads(data)
+
+
+class RapidJSONCodec(AbstractCodec):
+    """Codec based on :mod:`rapidjson` only."""
+
+    def dumps(self, obj):
+        return rapidjson.dumps(obj, ensure_ascii=False).encode()
+
+    def loads(self, data):
+        return rapidjson.loads(data)
+
+
+class StdlibJSONCodec(AbstractCodec):
+    """Codec based on the standard library :mod:`json` module."""
+
+    def dumps(self, obj):
+        return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode()
+
+    def loads(self, data):
+        return json.loads(data)
@@ -0,0 +1,176 @@
+# Copyright Planetmint GmbH and Planetmint contributors
+# SPDX-License-Identifier: (Apache-2.0 AND CC-BY-4.0)
+# Code is Apache-2.0 and docs are CC-BY-4.0
+
+"""Coin selection for transfers of divisible assets: picks the unspent
+outputs covering an amount, and sends the remainder back as change.
+
+The outputs may be any objects with an ``amount`` and an ``input``
+attribute, e.g. the :class:`~planetmint_driver.utxo.UTXO` of a
+:class:`~planetmint_driver.utxo.UTXOIndex`.
+
+Attributes:
+    LARGEST_FIRST (str): Spends the largest outputs first, which
+        minimizes the number of inputs.
+    OLDEST_FIRST (str): Spends the outputs in the order they are given,
+        e.g. oldest indexed first.
+    BRANCH_AND_BOUND (str): Looks for a set of outputs matching the amount
+        exactly, so that no change output is created, and falls back to
+        :attr:`LARGEST_FIRST`.
+"""
+from collections import namedtuple
+from itertools import accumulate
+from operator import attrgetter
+
+from .exceptions import InsufficientFunds
+from .offchain import prepare_transfer_transaction
+
+LARGEST_FIRST = "largest-first"
+OLDEST_FIRST = "oldest-first"
+BRANCH_AND_BOUND = "branch-and-bound"
+
+BNB_MAX_TRIES = 100000  # steps of the branch and bound search
+
+Selection = namedtuple("Selection", ("utxos", "total", "change"))
+Selection.__doc__ = """Outputs selected to cover an amount.
+
+Attributes:
+    utxos (list): The selected outputs.
+    total (int): Sum of the amounts of the selected outputs.
+    change (int): Amount in excess, to be sent back as change.
+"""
+
+
+def _select_in_order(utxos, amount):
+    total = 0
+    for count, total in enumerate(accumulate(utxo.amount for utxo in utxos), 1):
+        if total >= amount:
+            return Selection(utxos[:count], total, total - amount)
+    raise InsufficientFunds(amount, total)
+
+
+def largest_first(utxos, amount):
+    """Selects the largest outputs until ``amount`` is covered."""
+    return _select_in_order(sorted(utxos, key=attrgetter("amount"), reverse=True), amount)
+
+
+def oldest_first(utxos, amount):
+    """Selects the outputs in the given order until ``amount`` is
+    covered.
+    """
+    return _select_in_order(utxos, amount)
+
+
+def branch_and_bound(utxos, amount, max_tries=BNB_MAX_TRIES):
+    """Searches for a set of outputs summing to exactly ``amount``, and
+    falls back to :func:`largest_first` if none is found within
+    ``max_tries`` steps.
+
+    The search explores the outputs ordered by decreasing amount, each
+    being either included or excluded, and prunes the branches that
+    overshoot the amount or cannot reach it anymore.
+
+    """
+    pool = sorted((utxo for utxo in utxos if utxo.amount <= amount), key=attrgetter("amount"), reverse=True)
+    values = [utxo.amount for utxo in pool]
+    available = sum(values)
+    included = []
+    value = 0
+    for _ in range(max_tries):
+        if value == amount:
+            return Selection([pool[i] for i, include in enumerate(included) if include], amount, 0)
+
+        if value > amount or value + available < amount or len(included) == len(pool):
+            # NOTE: backtrack to the last included output, and exclude it
+            while included and not included[-1]:
+                included.pop()
+                available += values[len(included)]
+            if not included:
+                break
+            included[-1] = False
+            value -= values[len(included) - 1]
+            continue
+
+        i = len(included)
+        available -= values[i]
+        if included and not included[-1] and values[i] == values[i - 1]:
+            # NOTE: including an output equal to the one just excluded
+            # would explore the same sums again
+            included.append(False)
+        else:
+            included.append(True)
+            value += values[i]
+
+    return largest_first(utxos, amount)
+
+
+STRATEGIES = {
+    LARGEST_FIRST: largest_first,
+    OLDEST_FIRST: oldest_first,
+    BRANCH_AND_BOUND: branch_and_bound,
+}
+
+
+def select_coins(utxos, amount, strategy=LARGEST_FIRST):
+    """Selects outputs covering ``amount``.
+
+    Args:
+        utxos (list): The spendable outputs.
+        amount (int): The amount to cover.
+        strategy (:obj:`str` | callable): One of :attr:`LARGEST_FIRST`,
+            :attr:`OLDEST_FIRST` and :attr:`BRANCH_AND_BOUND`, or a
+            function taking ``utxos`` and ``amount`` and returning a
+            :class:`~planetmint_driver.coinselect.Selection`.
+
+    Returns:
+        :class:`~planetmint_driver.coinselect.Selection`: The selected
+        outputs.
+
+    Raises:
+        :exc:`~planetmint_driver.exceptions.InsufficientFunds`: If the
+            outputs do not cover ``amount``.
+
+    """
+    if amount < 1:
+        raise ValueError("amount must be positive, got {}".format(amount))
+    if not callable(strategy):
+        try:
+            strategy = STRATEGIES[strategy]
+        except KeyError:
+            raise ValueError("Unknown coin selection strategy {!r}".format(strategy)) from None
+    return strategy(list(utxos), amount)
+
+
+def prepare_transfer(utxos, recipients, *, asset_id, change_public_key, strategy=LARGEST_FIRST, metadata=None):
+    """Prepares a ``"TRANSFER"`` transaction paying ``recipients`` from
+    outputs picked by coin selection, with a change output if needed.
+
+    Args:
+        utxos (list): The spendable outputs of ``asset_id``.
+        recipients (list): The ``([public_key, ...], amount)`` pairs to
+            pay.
+        asset_id (str): Id of the asset being transferred.
+        change_public_key (str): Public key receiving the change.
+        strategy: The coin selection strategy, see :func:`select_coins`.
+        metadata (:obj:`str`, optional): Metadata associated with the
+            transaction.
+
+    Returns:
+        dict: The prepared ``"TRANSFER"`` transaction, ready to be
+        fulfilled.
+
+    Raises:
+        :exc:`~planetmint_driver.exceptions.InsufficientFunds`: If the
+            outputs do not cover the amounts of ``recipients``.
+
+    """
+    recipients = list(recipients)
+    selection = select_coins(utxos, sum(amount for _, amount in recipients), strategy)
+    if selection.change:
+        recipients.append(([change_public_key], selection.change))
+    return prepare_transfer_transaction(
+        inputs=[utxo.input for utxo in selection.utxos],
+        recipients=recipients,
+        assets=[asset_id],
+        metadata=metadata,
+    )
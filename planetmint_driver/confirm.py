@@ -0,0 +1,299 @@
+# Copyright Planetmint GmbH and Planetmint contributors
+# SPDX-License-Identifier: (Apache-2.0 AND CC-BY-4.0)
+# Code is Apache-2.0 and docs are CC-BY-4.0
+
+"""Background confirmation of submitted transactions: instead of holding a
+request open until a transaction is committed (``mode=commit``), the
+transaction is sent in ``async`` or ``sync`` mode and a shared confirmer
+polls the nodes until it is committed.
+
+"""
+import asyncio
+
+from collections import namedtuple
+from concurrent.futures import Future, ThreadPoolExecutor
+from heapq import heappop, heappush
+from threading import Condition, Thread
+from time import monotonic
+
+from .exceptions import ConfirmationTimeout, PlanetmintException
+
+BACKOFF_FACTOR = 1.5  # growth of the polling interval of a transaction
+
+_Pending = namedtuple("_Pending", ("future", "deadline"))
+
+
+class BaseConfirmer:
+    """Bookkeeping shared by the blocking
+    :class:`~planetmint_driver.confirm.Confirmer` and its asyncio
+    counterpart :class:`~planetmint_driver.confirm.AsyncConfirmer`.
+
+    Each pending transaction is polled with
+    :meth:`~planetmint_driver.driver.TransactionsEndpoint.retrieve`, which
+    only finds committed transactions. The polling interval of a
+    transaction starts at ``poll_interval`` and grows up to
+    ``max_poll_interval``, so that many slow transactions do not flood the
+    nodes, and at most ``batch_size`` transactions are polled per round.
+
+    """
+
+    def __init__(self, driver, *, timeout=60, poll_interval=0.5, max_poll_interval=5.0, batch_size=256, max_workers=4):
+        """Initializes a confirmer.
+
+        Args:
+            driver (:class:`~planetmint_driver.Planetmint`): The driver used
+                to poll the nodes.
+            timeout (float): Default number of seconds after which a
+                transaction that is not committed is given up.
+            poll_interval (float): Initial polling interval in seconds.
+            max_poll_interval (float): Maximal polling interval in seconds.
+            batch_size (int): Maximum number of transactions polled per
+                round.
+            max_workers (int): Maximum number of concurrent polling
+                requests.
+
+        """
+        self.driver = driver
+        self.timeout = timeout
+        self.poll_interval = poll_interval
+        self.max_poll_interval = max_poll_interval
+        self.batch_size = batch_size
+        self.max_workers = max_workers
+        self._pending = {}
+        self._schedule = []
+
+    @property
+    def pending(self):
+        """int: Number of transactions awaiting confirmation."""
+        return len(self._pending)
+
+    def _add(self, txid, timeout, make_future):
+        pending = self._pending.get(txid)
+        if pending is not None:
+            return pending.future
+        now = monotonic()
+        deadline = now + (self.timeout if timeout is None else timeout)
+        future = make_future()
+        self._pending[txid] = _Pending(future, deadline)
+        heappush(self._schedule, (min(now + self.poll_interval, deadline), txid, self.poll_interval))
+        return future
+
+    def _next_due(self):
+        return self._schedule[0][0] if self._schedule else None
+
+    def _take_due(self, now):
+        batch = []
+        while self._schedule and self._schedule[0][0] <= now and len(batch) < self.batch_size:
+            batch.append(heappop(self._schedule))
+        return batch
+
+    def _settle(self, batch, outcomes, now):
+        """Reschedules the transactions that are still pending, and returns
+        the ``(future, transaction, error)`` to resolve.
+        """
+        settled = []
+        for (_, txid, interval), (transaction, error) in zip(batch, outcomes):
+            pending = self._pending.get(txid)
+            if pending is None:
+                continue
+            if pending.future.done():
+                # NOTE: cancelled by the caller
+                del self._pending[txid]
+            elif transaction is not None or error is not None:
+                del self._pending[txid]
+                settled.append((pending.future, transaction, error))
+            elif pending.deadline <= now:
+                del self._pending[txid]
+                settled.append((pending.future, None, ConfirmationTimeout(txid)))
+            else:
+                interval = min(interval * BACKOFF_FACTOR, self.max_poll_interval)
+                heappush(self._schedule, (min(now + interval, pending.deadline), txid, interval))
+        return settled
+
+    @staticmethod
+    def _resolve(settled):
+        for future, transaction, error in settled:
+            if future.done():
+                continue
+            if error is None:
+                future.set_result(transaction)
+            else:
+                future.set_exception(error)
+
+
+class Confirmer(BaseConfirmer):
+    """Confirms transactions from a background thread.
+
+    The thread is started when a transaction is tracked, and stops once no
+    transaction is pending. The polling requests are made from a small pool
+    of ``max_workers`` threads, so that tens of thousands of transactions
+    can be tracked with a few connections.
+
+    Example:
+
+        >>> confirmer = Confirmer(bdb, timeout=120)
+        >>> bdb.transactions.send_async(tx)
+        >>> future = confirmer.track(tx['id'])
+        >>> committed_tx = future.result()
+
+    """
+
+    def __init__(self, driver, **kwargs):
+        super().__init__(driver, **kwargs)
+        self._condition = Condition()
+        self._thread = None
+        self._executor = None
+
+    def track(self, txid, timeout=None):
+        """Tracks the transaction with the given id until it is committed.
+
+        Args:
+            txid (str): Id of the transaction.
+            timeout (float): Optional number of seconds after which the
+                transaction is given up. Defaults to :attr:`timeout`.
+
+        Returns:
+            :class:`concurrent.futures.Future`: Resolves to the committed
+            transaction, or fails with
+            :exc:`~planetmint_driver.exceptions.ConfirmationTimeout`.
+            Tracking a pending transaction again returns the same future.
+
+        """
+        with self._condition:
+            future = self._add(txid, timeout, Future)
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers, thread_name_prefix="planetmint-confirmer"
+                )
+            if self._thread is None:
+                self._thread = Thread(target=self._run, name="planetmint-confirmer", daemon=True)
+                self._thread.start()
+            self._condition.notify()
+        return future
+
+    def close(self):
+        """Cancels the pending futures and releases the polling threads."""
+        with self._condition:
+            pending, self._pending = self._pending, {}
+            self._schedule.clear()
+            executor, self._executor = self._executor, None
+            self._condition.notify()
+        for entry in pending.values():
+            entry.future.cancel()
+        if executor is not None:
+            executor.shutdown(wait=False)
+
+    def _run(self):
+        while True:
+            with self._condition:
+                while True:
+                    if not self._pending:
+                        self._thread = None
+                        return
+                    now = monotonic()
+                    due = self._next_due()
+                    if due <= now:
+                        break
+                    self._condition.wait(due - now)
+                batch = self._take_due(now)
+                executor = self._executor
+
+            try:
+                outcomes = list(executor.map(self._check, [txid for _, txid, _ in batch]))
+            except RuntimeError:
+                # NOTE: the confirmer was closed during the round, and its
+                # pending transactions dropped
+                continue
+            with self._condition:
+                settled = self._settle(batch, outcomes, monotonic())
+            self._resolve(settled)
+
+    def _check(self, txid):
+        # NOTE: driver errors (e.g. the transaction is not committed yet, or
+        # a node is unreachable) are retried until the deadline
+        try:
+            return self.driver.transactions.retrieve(txid), None
+        except PlanetmintException:
+            return None, None
+        except Exception as exc:
+            return None, exc
+
+
+class AsyncConfirmer(BaseConfirmer):
+    """Asyncio counterpart of :class:`~planetmint_driver.confirm.Confirmer`,
+    polling from a task of the running event loop.
+    """
+
+    def __init__(self, driver, **kwargs):
+        super().__init__(driver, **kwargs)
+        self._wakeup = None
+        self._task = None
+
+    def track(self, txid, timeout=None):
+        """Tracks the transaction with the given id until it is committed.
+
+        Must be called from the event loop.
+
+        Args:
+            txid (str): Id of the transaction.
+            timeout (float): Optional number of seconds after which the
+                transaction is given up. Defaults to :attr:`timeout`.
+
+        Returns:
+            :class:`asyncio.Future`: Resolves to the committed
+            transaction, or fails with
+            :exc:`~planetmint_driver.exceptions.ConfirmationTimeout`.
+
+        """
+        loop = asyncio.get_running_loop()
+        future = self._add(txid, timeout, loop.create_future)
+        if self._task is None:
+            self._wakeup = asyncio.Event()
+            self._task = loop.create_task(self._run())
+        self._wakeup.set()
+        return future
+
+    async def close(self):
+        """Cancels the pending futures and the polling task."""
+        pending, self._pending = self._pending, {}
+        self._schedule.clear()
+        for entry in pending.values():
+            entry.future.cancel()
+        task, self._task = self._task, None
+        if task is not None:
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+
+    async def _run(self):
+        slots = asyncio.Semaphore(self.max_workers)
+
+        async def check(txid):
+            async with slots:
+                try:
+                    return await self.driver.transactions.retrieve(txid), None
+                except PlanetmintException:
+                    return None, None
+                except Exception as exc:
+                    return None, exc
+
+        try:
+            while self._pending:
+                now = monotonic()
+                due = self._next_due()
+                if due > now:
+                    self._wakeup.clear()
+                    try:
+                        await asyncio.wait_for(self._wakeup.wait(), due - now)
+                    except asyncio.TimeoutError:
+                        pass
+                    continue
+
+                batch = self._take_due(now)
+                outcomes = await asyncio.gather(*(check(txid) for _, txid, _ in batch))
+                self._resolve(self._settle(batch, outcomes, monotonic()))
+        finally:
+            if self._task is asyncio.current_task():
+                self._task = None
@@ -5,38 +5,295 @@
 import time
 
 from collections import namedtuple
+from contextlib import contextmanager
 from datetime import datetime, timedelta
+from threading import Event, Lock, local
 
 from requests import Session
 from requests.exceptions import ConnectionError
 
+from .codec import JSONCodec, RawJSON
 from .exceptions import HTTP_EXCEPTIONS, TransportError
+from .streaming import iter_json_array
 
 
 BACKOFF_DELAY = 0.5  # seconds
+MAX_BACKOFF_EXPONENT = 32  # keeps the backoff delay representable
+EWMA_WEIGHT = 0.3  # weight of the latest sample in the moving averages
+STREAM_CHUNK_SIZE = 64 * 1024  # bytes read at a time from streamed responses
+
+# circuit breaker states of a connection
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half-open"
 
 HttpResponse = namedtuple("HttpResponse", ("status_code", "headers", "data"))
 
 
-class Connection:
-    """A Connection object to make HTTP requests to a particular node."""
+class BaseConnection:
+    """Per-node state shared by the blocking
+    :class:`~planetmint_driver.connection.Connection` and its asyncio
+    counterpart :class:`~planetmint_driver.aio.connection.AsyncConnection`.
 
-    def __init__(self, *, node_url, headers=None):
-        """Initializes a :class:`~planetmint_driver.connection.Connection`
+    The backoff state, the moving averages and the in-flight counter are
+    guarded by a lock, so that they can be updated from several threads.
+
+    The backoff doubles as a circuit breaker with three states:
+
+    * ``closed``: the node is healthy and takes requests.
+    * ``open``: a connection error occurred and the backoff time has not
+      passed yet. The :class:`~planetmint_driver.pool.Pool` skips the node.
+    * ``half-open``: the backoff time has passed. A single probe request
+      is let through; its success closes the breaker, its failure opens it
+      again with a doubled backoff.
+
+    The probe is claimed with :meth:`try_acquire` when the
+    :class:`~planetmint_driver.pool.Pool` picks the connection. Other
+    requests made while it is in flight wait for its outcome before they
+    are sent.
+
+    """
+
+    def __init__(self, *, node_url, codec=None):
+        """Initializes a :class:`~planetmint_driver.connection.BaseConnection`
         instance.
 
         Args:
             node_url (str):  Url of the node to connect to.
-            headers (dict): Optional headers to send with each request.
+            codec (:class:`~planetmint_driver.codec.AbstractCodec`): Optional
+                JSON codec for request and response bodies. Defaults to
+                :class:`~planetmint_driver.codec.JSONCodec`.
 
         """
         self.node_url = node_url
-        self.session = Session()
-        if headers:
-            self.session.headers.update(headers)
-
+        self.codec = codec if codec is not None else JSONCodec()
         self._retries = 0
         self.backoff_time = None
+        self.latency = None
+        self.error_rate = 0.0
+        self.in_flight = 0
+        self._probing = False
+        self._probe_reserved = False
+        self._probe_waiters = []
+        self._lock = Lock()
+
+    @property
+    def state(self):
+        """str: The circuit breaker state, one of ``'closed'``,
+        ``'open'`` and ``'half-open'``.
+        """
+        backoff_time = self.backoff_time
+        if backoff_time is None:
+            return CLOSED
+        if backoff_time > datetime.utcnow():
+            return OPEN
+        return HALF_OPEN
+
+    @property
+    def available(self):
+        """bool: Whether the connection should take a new request, i.e. its
+        breaker is closed, or half-open with no probe in flight.
+        """
+        state = self.state
+        return state == CLOSED or (state == HALF_OPEN and not self._probing)
+
+    def try_acquire(self):
+        """Claims the connection for a new request, if it is available.
+
+        A request to a half-open connection is its probe: the probe is
+        reserved atomically, so that no other caller may claim the
+        connection until the probe completes.
+
+        Returns:
+            bool: Whether the connection was claimed.
+
+        """
+        with self._lock:
+            state = self.state
+            if state == CLOSED:
+                return True
+            if state == HALF_OPEN and not self._probing:
+                self._probing = True
+                self._probe_reserved = True
+                return True
+            return False
+
+    def _admit(self, notify):
+        """Decides whether a request may be sent now.
+
+        Returns:
+            tuple: ``(admitted, probe, delay)``. If the request is not
+            admitted, ``delay`` is the remaining backoff time, or ``None``
+            if a probe is in flight, in which case ``notify`` is called
+            once the probe completes.
+
+        """
+        with self._lock:
+            if self._probe_reserved:
+                self._probe_reserved = False
+                return True, True, None
+            state = self.state
+            if state == CLOSED:
+                return True, False, None
+            if state == OPEN:
+                return False, False, (self.backoff_time - datetime.utcnow()).total_seconds()
+            if not self._probing:
+                self._probing = True
+                return True, True, None
+            self._probe_waiters.append(notify)
+            return False, False, None
+
+    def _release_probe(self):
+        with self._lock:
+            self._probing = False
+            waiters, self._probe_waiters = self._probe_waiters, []
+        for notify in waiters:
+            notify()
+
+    def get_backoff_timedelta(self):
+        backoff_time = self.backoff_time
+        if backoff_time is None:
+            return 0
+
+        return (backoff_time - datetime.utcnow()).total_seconds()
+
+    def update_backoff_time(self, success, backoff_cap=None):
+        with self._lock:
+            if success:
+                self._retries = 0
+                self.backoff_time = None
+            else:
+                utcnow = datetime.utcnow()
+                backoff_delta = BACKOFF_DELAY * 2 ** min(self._retries, MAX_BACKOFF_EXPONENT)
+                if backoff_cap is not None:
+                    backoff_delta = min(backoff_delta, backoff_cap)
+                self.backoff_time = utcnow + timedelta(seconds=backoff_delta)
+                self._retries += 1
+
+    def record_request(self, elapsed, success):
+        """Updates the exponentially weighted moving averages of the
+        response latency and of the error rate of the node.
+
+        Args:
+            elapsed (float): Duration of the request in seconds.
+            success (bool): Whether the node answered the request.
+
+        """
+        with self._lock:
+            self.error_rate += EWMA_WEIGHT * ((0.0 if success else 1.0) - self.error_rate)
+            if success:
+                if self.latency is None:
+                    self.latency = elapsed
+                else:
+                    self.latency += EWMA_WEIGHT * (elapsed - self.latency)
+
+    @contextmanager
+    def _track_in_flight(self):
+        with self._lock:
+            self.in_flight += 1
+        try:
+            yield
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+
+    def _wait_admission(self, timeout):
+        """Waits until the request may be sent, see :meth:`_admit`.
+
+        Returns:
+            tuple: Whether the request is the probe of the circuit breaker,
+            and what is left of ``timeout``.
+
+        Raises:
+            :exc:`TimeoutError`: If the request may not be sent in time.
+
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            probe_done = Event()
+            admitted, probe, delay = self._admit(probe_done.set)
+            if admitted:
+                return probe, timeout
+            remaining = None if deadline is None else deadline - time.monotonic()
+            if delay is not None:
+                if remaining is not None and remaining < delay:
+                    raise TimeoutError
+                time.sleep(max(delay, 0))
+            elif not probe_done.wait(remaining):
+                raise TimeoutError
+            timeout = None if deadline is None else deadline - time.monotonic()
+
+    def _get_url(self, path):
+        return self.node_url + path if path else self.node_url
+
+    def _encode_body(self, json, headers):
+        if json is None:
+            return None, headers
+        body = bytes(json) if isinstance(json, RawJSON) else self.codec.dumps(json)
+        return body, {**(headers or {}), "Content-Type": self.codec.content_type}
+
+    def _make_response(self, status_code, headers, content, url, encoding=None):
+        # NOTE: the body is decoded once, straight from the raw bytes; the
+        # text is only needed for errors and non-JSON bodies
+        try:
+            json = self.codec.loads(content)
+        except ValueError:
+            json = None
+        ok = 200 <= status_code < 300
+        text = content.decode(encoding or "utf-8", errors="replace") if json is None or not ok else None
+        if not ok:
+            exc_cls = HTTP_EXCEPTIONS.get(status_code, TransportError)
+            raise exc_cls(status_code, text, json, url)
+        data = json if json is not None else text
+        return HttpResponse(status_code, headers, data)
+
+
+class Connection(BaseConnection):
+    """A Connection object to make HTTP requests to a particular node.
+
+    A :class:`~planetmint_driver.connection.Connection` may be shared
+    between threads: each thread gets its own :class:`requests.Session`
+    (and therefore its own sockets), while the backoff state of the node
+    is shared.
+
+    """
+
+    def __init__(self, *, node_url, headers=None, codec=None):
+        """Initializes a :class:`~planetmint_driver.connection.Connection`
+        instance.
+
+        Args:
+            node_url (str):  Url of the node to connect to.
+            headers (dict): Optional headers to send with each request.
+            codec (:class:`~planetmint_driver.codec.AbstractCodec`): Optional
+                JSON codec for request and response bodies.
+
+        """
+        super().__init__(node_url=node_url, codec=codec)
+        self.headers = dict(headers) if headers else {}
+        self._local = local()
+        self._sessions = []
+
+    @property
+    def session(self):
+        """:class:`requests.Session`: The session of the calling thread."""
+        try:
+            return self._local.session
+        except AttributeError:
+            session = Session()
+            session.headers.update(self.headers)
+            self._local.session = session
+            with self._lock:
+                self._sessions.append(session)
+            return session
+
+    def close(self):
+        """Closes the sessions of all threads."""
+        with self._lock:
+            sessions, self._sessions = self._sessions, []
+        for session in sessions:
+            session.close()
+        self._local = local()
 
     def request(
         self, method, *, path=None, json=None, params=None, headers=None, timeout=None, backoff_cap=None, **kwargs
@@ -58,6 +315,19 @@ class Connection:
            If a request is successful, the backoff timestamp is removed,
            the retry count is back to zero.
 
+           While the request is outstanding (including the backoff wait),
+           it is counted in :attr:`in_flight`. A request made while the
+           backoff time is set is the probe of the circuit breaker, or
+           waits for the outcome of the probe in flight (see
+           :class:`~planetmint_driver.connection.BaseConnection`).
+
+           If ``stream`` is set, the response body is not read up front:
+           the :attr:`data` of a successful response is an iterator over
+           the items of the JSON array in the body (or of the array stored
+           under ``stream_key``, if the body is an object), decoded as they
+           are received. A connection error raised while iterating is not
+           retried.
+
         Args:
             method (str): HTTP method (e.g.: ``'GET'``).
             path (str): API endpoint path (e.g.: ``'/transactions'``).
@@ -67,63 +337,47 @@ class Connection:
             timeout (int): Optional timeout in seconds.
             backoff_cap (int): The maximal allowed backoff delay in seconds
                                to be assigned to a node.
-            kwargs: Optional keyword arguments.
+            kwargs: Optional keyword arguments, e.g. ``stream`` and
+                ``stream_key``.
 
         """
-        backoff_timedelta = self.get_backoff_timedelta()
+        with self._track_in_flight():
+            probe, timeout = self._wait_admission(timeout)
+            try:
+                conn_exc = None
+                start = time.perf_counter()
+                try:
+                    response = self._request(
+                        method=method,
+                        timeout=timeout,
+                        url=self._get_url(path),
+                        json=json,
+                        params=params,
+                        headers=headers,
+                        **kwargs,
+                    )
+                except ConnectionError as err:
+                    conn_exc = err
+                    raise err
+                finally:
+                    self.update_backoff_time(success=conn_exc is None, backoff_cap=backoff_cap)
+                    self.record_request(time.perf_counter() - start, success=conn_exc is None)
+                return response
+            finally:
+                if probe:
+                    self._release_probe()
 
-        if timeout is not None and timeout < backoff_timedelta:
-            raise TimeoutError
+    def _request(self, *, json=None, headers=None, stream=False, stream_key=None, **kwargs):
+        data, headers = self._encode_body(json, headers)
+        response = self.session.request(data=data, headers=headers, stream=stream, **kwargs)
+        if stream and 200 <= response.status_code < 300:
+            return HttpResponse(response.status_code, response.headers, self._stream_items(response, stream_key))
+        return self._make_response(
+            response.status_code, response.headers, response.content, kwargs["url"], response.encoding
+        )
 
-        if backoff_timedelta > 0:
-            time.sleep(backoff_timedelta)
-
-        conn_exc = None
-        timeout = timeout if timeout is None else timeout - backoff_timedelta
+    def _stream_items(self, response, key):
         try:
-            response = self._request(
-                method=method,
-                timeout=timeout,
-                url=self.node_url + path if path else self.node_url,
-                json=json,
-                params=params,
-                headers=headers,
-                **kwargs,
-            )
-        except ConnectionError as err:
-            conn_exc = err
-            raise err
+            yield from iter_json_array(response.iter_content(STREAM_CHUNK_SIZE), self.codec.loads, key=key)
         finally:
-            self.update_backoff_time(success=conn_exc is None, backoff_cap=backoff_cap)
-        return response
-
-    def get_backoff_timedelta(self):
-        if self.backoff_time is None:
-            return 0
-
-        return (self.backoff_time - datetime.utcnow()).total_seconds()
-
-    def update_backoff_time(self, success, backoff_cap=None):
-        if success:
-            self._retries = 0
-            self.backoff_time = None
-        else:
-            utcnow = datetime.utcnow()
-            backoff_delta = BACKOFF_DELAY * 2**self._retries
-            if backoff_cap is not None:
-                backoff_delta = min(backoff_delta, backoff_cap)
-            self.backoff_time = utcnow + timedelta(seconds=backoff_delta)
-            self._retries += 1
-
-    def _request(self, **kwargs):
-        response = self.session.request(**kwargs)
-        text = response.text
-        try:
-            json = response.json()
-        except ValueError:
-            json = None
-        if not (200 <= response.status_code < 300):
-            exc_cls = HTTP_EXCEPTIONS.get(response.status_code, TransportError)
-            raise exc_cls(response.status_code, text, json, kwargs["url"])
-        data = json if json is not None else text
-        return HttpResponse(response.status_code, response.headers, data)
+            response.close()
@@ -2,13 +2,23 @@
 # SPDX-License-Identifier: (Apache-2.0 AND CC-BY-4.0)
 # Code is Apache-2.0 and docs are CC-BY-4.0
 
+import hmac
+import os
+
 from collections import namedtuple
+from hashlib import sha512
 
+import base58
+from nacl.bindings import crypto_sign_seed_keypair
 from planetmint_cryptoconditions import crypto
 
+from .cache import LRUCache
+from .exceptions import InvalidPrivateKey
 
 CryptoKeypair = namedtuple("CryptoKeypair", ("private_key", "public_key"))
 
+HARDENED_OFFSET = 2**31  # first hardened index of SLIP-0010
+
 
 def generate_keypair(seed=None):
     """Generates a cryptographic key pair.
@@ -24,3 +34,213 @@ def generate_keypair(seed=None):
 
     """
     return CryptoKeypair(*(k.decode() for k in crypto.ed25519_generate_key_pair(seed)))
+
+
+def _keypair_from_seed(seed):
+    # NOTE: the private key of an Ed25519 key pair is its seed, one call to
+    # libsodium derives the public key without the base58 round trips of
+    # ed25519_generate_key_pair()
+    public_key, _ = crypto_sign_seed_keypair(seed)
+    return CryptoKeypair(base58.b58encode(seed).decode(), base58.b58encode(public_key).decode())
+
+
+def generate_keypairs(n):
+    """Generates ``n`` cryptographic key pairs.
+
+    Args:
+        n (int): The number of key pairs.
+
+    Returns:
+        :obj:`list` of :class:`~planetmint_driver.crypto.CryptoKeypair`:
+        The key pairs, as returned by :func:`generate_keypair`.
+
+    """
+    return [_keypair_from_seed(os.urandom(32)) for _ in range(n)]
+
+
+def _master_node(master_seed):
+    if not 16 <= len(master_seed) <= 64:
+        raise ValueError("master_seed must be 16 to 64 bytes long, got {}".format(len(master_seed)))
+    digest = hmac.digest(b"ed25519 seed", master_seed, sha512)
+    return digest[:32], digest[32:]
+
+
+def _derive_child(node, index):
+    if not 0 <= index < HARDENED_OFFSET:
+        raise ValueError("index must be in [0, 2**31), got {}".format(index))
+    key, chain_code = node
+    digest = hmac.digest(chain_code, b"\x00" + key + (HARDENED_OFFSET + index).to_bytes(4, "big"), sha512)
+    return digest[:32]
+
+
+def derive_keypair(master_seed, index):
+    """Derives the key pair of ``index`` from ``master_seed``.
+
+    The key pair is the hardened child ``m/index'`` of the master seed, as
+    specified by SLIP-0010 for Ed25519, so that the key pairs can be
+    derived again on demand, e.g. by a hardware wallet, instead of being
+    stored.
+
+    Args:
+        master_seed (bytes): 16 to 64 bytes of secret entropy.
+        index (int): Index of the key pair, in ``[0, 2**31)``.
+
+    Returns:
+        :class:`~planetmint_driver.crypto.CryptoKeypair`: The key pair.
+
+    """
+    return _keypair_from_seed(_derive_child(_master_node(master_seed), index))
+
+
+class KeyChain:
+    """Key pairs derived from a master seed, see :func:`derive_keypair`.
+
+    The master node is derived once, and the recently derived key pairs are
+    kept in a :class:`~planetmint_driver.cache.LRUCache`, e.g. for an
+    application holding one key pair per asset and signing the transfers of
+    a few assets at a time::
+
+        >>> chain = KeyChain(master_seed)
+        >>> owner = chain.keypair(asset_index)
+        >>> keyring = chain.keyring(range(100))
+
+    """
+
+    def __init__(self, master_seed, cache_size=1024):
+        """Initializes a :class:`~planetmint_driver.crypto.KeyChain`
+        instance.
+
+        Args:
+            master_seed (bytes): 16 to 64 bytes of secret entropy.
+            cache_size (int): Maximum number of cached key pairs.
+
+        """
+        self._master = _master_node(master_seed)
+        self.cache = LRUCache(maxsize=cache_size)
+
+    def keypair(self, index):
+        """Returns the key pair of ``index``.
+
+        Args:
+            index (int): Index of the key pair, in ``[0, 2**31)``.
+
+        Returns:
+            :class:`~planetmint_driver.crypto.CryptoKeypair`: The key pair.
+
+        """
+        try:
+            return self.cache.get(index)
+        except KeyError:
+            pass
+        keypair = _keypair_from_seed(_derive_child(self._master, index))
+        self.cache.set(index, keypair)
+        return keypair
+
+    def keypairs(self, indexes):
+        """Returns the key pairs of ``indexes``, in order."""
+        return [self.keypair(index) for index in indexes]
+
+    def keyring(self, indexes):
+        """Returns a :class:`~planetmint_driver.crypto.Keyring` holding the
+        private keys of ``indexes``.
+        """
+        return Keyring.from_keypairs(self.keypairs(indexes))
+
+
+class Keyring:
+    """Private keys parsed once, for signing many transactions.
+
+    Passing the private keys as strings to
+    :func:`~planetmint_driver.offchain.fulfill_transaction` decodes them
+    and derives their public keys on every call. A keyring does it once,
+    and may be passed in their place::
+
+        >>> keyring = Keyring([alice.private_key, bob.private_key])
+        >>> fulfill_transaction(transaction, private_keys=keyring)
+
+    """
+
+    def __init__(self, private_keys=()):
+        """Initializes a :class:`~planetmint_driver.crypto.Keyring`
+        instance.
+
+        Args:
+            private_keys (:obj:`str` | :obj:`list` | :obj:`tuple`): One or
+                more base58 encoded private keys.
+
+        Raises:
+            :exc:`~planetmint_driver.exceptions.InvalidPrivateKey`: If a
+                private key cannot be decoded.
+
+        """
+        self._signing_keys = {}
+        if isinstance(private_keys, str):
+            private_keys = [private_keys]
+        for private_key in private_keys:
+            self.add(private_key)
+
+    @classmethod
+    def from_keypairs(cls, keypairs):
+        """Builds a keyring from the key pairs returned by
+        :func:`generate_keypair`.
+        """
+        return cls([keypair.private_key for keypair in keypairs])
+
+    def __len__(self):
+        return len(self._signing_keys)
+
+    def __contains__(self, public_key):
+        return public_key in self._signing_keys
+
+    def __reduce__(self):
+        # NOTE: the parsed keys cannot be pickled, e.g. to be sent to the
+        # worker processes of fulfill_transactions()
+        return type(self), (list(self.private_keys()),)
+
+    @property
+    def public_keys(self):
+        """list: The base58 encoded public keys of the keyring."""
+        return list(self._signing_keys)
+
+    def private_keys(self):
+        """Returns an iterator over the base58 encoded private keys."""
+        return (signing_key.encode().decode() for signing_key in self._signing_keys.values())
+
+    def add(self, private_key):
+        """Adds a private key to the keyring.
+
+        Args:
+            private_key (str): A base58 encoded private key.
+
+        Returns:
+            str: The base58 encoded public key of ``private_key``.
+
+        Raises:
+            :exc:`~planetmint_driver.exceptions.InvalidPrivateKey`: If
+                ``private_key`` cannot be decoded.
+
+        """
+        try:
+            signing_key = crypto.Ed25519SigningKey(private_key)
+        except (TypeError, ValueError) as exc:
+            raise InvalidPrivateKey("Invalid private key") from exc
+        public_key = signing_key.get_verifying_key().encode().decode()
+        self._signing_keys[public_key] = signing_key
+        return public_key
+
+    def sign(self, public_key, message):
+        """Signs ``message`` with the private key of ``public_key``.
+
+        Args:
+            public_key (str): The base58 encoded public key.
+            message (bytes): The message to sign.
+
+        Returns:
+            bytes: The raw Ed25519 signature.
+
+        Raises:
+            :exc:`KeyError`: If the keyring holds no private key for
+                ``public_key``.
+
+        """
+        return self._signing_keys[public_key].sign(message, encoding="bytes")
@@ -0,0 +1,214 @@
+# Copyright Planetmint GmbH and Planetmint contributors
+# SPDX-License-Identifier: (Apache-2.0 AND CC-BY-4.0)
+# Code is Apache-2.0 and docs are CC-BY-4.0
+
+"""Offline preparation of chains of transactions, e.g. an asset created and
+transferred through several owners, and their submission in dependency
+order.
+
+"""
+import asyncio
+
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from .bulk import SendResult, _check_concurrency
+from .crypto import Keyring
+from .exceptions import DependencyFailed
+from .offchain import fulfill_transaction, prepare_create_transaction, prepare_transfer_transaction
+from .utxo import UTXO, _asset_id, _make_utxo
+
+
+class _Schedule:
+    """Bookkeeping of a submission: which transactions may be sent, given
+    the outcome of those they spend.
+    """
+
+    def __init__(self, graph):
+        self._graph = graph
+        self._waiting = {txid: len(parents) for txid, parents in graph._parents.items()}
+        self._ready = deque(txid for txid, count in self._waiting.items() if not count)
+        self.results = {}
+
+    def __bool__(self):
+        return bool(self._ready)
+
+    def pop(self):
+        return self._ready.popleft()
+
+    def done(self, txid, response=None, error=None):
+        self.results[txid] = SendResult(self._graph._transactions[txid], response, error)
+        for child in self._graph._children.get(txid, ()):
+            if child in self.results:
+                continue
+            if error is not None:
+                self.done(child, error=DependencyFailed(txid))
+                continue
+            self._waiting[child] -= 1
+            if not self._waiting[child]:
+                self._ready.append(child)
+
+    def ordered_results(self):
+        return [self.results[txid] for txid in self._graph._transactions]
+
+
+class TransactionGraph:
+    """Transactions prepared and signed offline, spending the outputs of one
+    another, and submitted in dependency order.
+
+    The inputs of a transfer are derived from the outputs of the in-memory
+    transactions it spends, so that a whole chain is built without waiting
+    for each transaction to be committed. On submission, a transaction is
+    sent as soon as all the transactions of the graph it spends are
+    committed, with up to ``concurrency`` transactions in flight.
+
+    Example:
+
+        >>> graph = TransactionGraph([alice.private_key, bob.private_key])
+        >>> create = graph.create(signers=alice.public_key, assets=[{"data": asset_cid}])
+        >>> to_bob = graph.transfer([(create, 0)], bob.public_key)
+        >>> to_carol = graph.transfer([(to_bob, 0)], carol.public_key)
+        >>> results = graph.submit(bdb)
+
+    """
+
+    def __init__(self, private_keys):
+        """Initializes a :class:`~planetmint_driver.dag.TransactionGraph`
+        instance.
+
+        Args:
+            private_keys (:obj:`str` | :obj:`list` | :obj:`tuple` | :class:`~planetmint_driver.crypto.Keyring`):
+                The private keys signing the transactions of the graph.
+
+        """
+        self.keyring = private_keys if isinstance(private_keys, Keyring) else Keyring(private_keys)
+        self._transactions = {}
+        self._parents = {}
+        self._children = {}
+        self._spent = set()
+
+    def __len__(self):
+        return len(self._transactions)
+
+    def __iter__(self):
+        """Iterates over the signed transactions, parents first."""
+        return iter(self._transactions.values())
+
+    def create(self, *, signers, recipients=None, assets=None, metadata=None):
+        """Prepares and signs a ``"CREATE"`` transaction, see
+        :func:`~planetmint_driver.offchain.prepare_create_transaction`.
+
+        Returns:
+            dict: The signed transaction.
+
+        """
+        transaction = prepare_create_transaction(
+            signers=signers, recipients=recipients, assets=assets, metadata=metadata
+        )
+        return self._add(fulfill_transaction(transaction, private_keys=self.keyring), ())
+
+    def transfer(self, spends, recipients, *, metadata=None):
+        """Prepares and signs a ``"TRANSFER"`` transaction.
+
+        Args:
+            spends (list): The outputs to spend, either
+                ``(transaction, output_index)`` pairs, where the transaction
+                was added to the graph or is already committed, or
+                :class:`~planetmint_driver.utxo.UTXO` instances.
+            recipients: The recipients, see
+                :func:`~planetmint_driver.offchain.prepare_transfer_transaction`.
+            metadata (:obj:`str`, optional): Metadata associated with the
+                transaction.
+
+        Returns:
+            dict: The signed transaction.
+
+        Raises:
+            :exc:`ValueError`: If an output is spent twice in the graph.
+
+        """
+        utxos = [
+            spend if isinstance(spend, UTXO) else _make_utxo(spend[0], spend[1], _asset_id(spend[0]))
+            for spend in spends
+        ]
+        outpoints = [(utxo.transaction_id, utxo.output_index) for utxo in utxos]
+        for index, outpoint in enumerate(outpoints):
+            if outpoint in self._spent or outpoint in outpoints[:index]:
+                raise ValueError("Output {1} of {0} is already spent".format(*outpoint))
+        transaction = prepare_transfer_transaction(
+            inputs=[utxo.input for utxo in utxos],
+            recipients=recipients,
+            assets=list(dict.fromkeys(utxo.asset_id for utxo in utxos)),
+            metadata=metadata,
+        )
+        parents = dict.fromkeys(utxo.transaction_id for utxo in utxos if utxo.transaction_id in self._transactions)
+        signed = self._add(fulfill_transaction(transaction, private_keys=self.keyring), tuple(parents))
+        # NOTE: the outputs are only spent once the transfer is signed, so
+        # that a failed transfer may be retried
+        self._spent.update(outpoints)
+        return signed
+
+    def _add(self, transaction, parents):
+        txid = transaction["id"]
+        self._transactions[txid] = transaction
+        self._parents[txid] = parents
+        for parent in parents:
+            self._children.setdefault(parent, []).append(txid)
+        return transaction
+
+    def submit(self, driver, concurrency=8, headers=None):
+        """Sends the transactions in ``commit`` mode, each one once the
+        transactions of the graph it spends are committed.
+
+        A transaction spending a transaction that failed is not sent, and
+        fails with :exc:`~planetmint_driver.exceptions.DependencyFailed`.
+
+        Args:
+            driver (:class:`~planetmint_driver.Planetmint`): The driver used
+                to send the transactions.
+            concurrency (int): Maximum number of requests in flight.
+                Defaults to ``8``.
+            headers (dict): Optional headers to pass to the requests.
+
+        Returns:
+            :obj:`list` of :class:`~planetmint_driver.bulk.SendResult`:
+            The response or the error of each transaction, parents first.
+
+        """
+        _check_concurrency(concurrency)
+        schedule = _Schedule(self)
+        pending = {}
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            while schedule or pending:
+                while schedule and len(pending) < concurrency:
+                    txid = schedule.pop()
+                    future = executor.submit(driver.transactions.send_commit, self._transactions[txid], headers)
+                    pending[future] = txid
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    error = future.exception()
+                    schedule.done(pending.pop(future), None if error else future.result(), error)
+        return schedule.ordered_results()
+
+    async def async_submit(self, driver, concurrency=8, headers=None):
+        """Asyncio counterpart of :meth:`submit`, for an
+        :class:`~planetmint_driver.aio.AsyncPlanetmint` driver.
+        """
+        _check_concurrency(concurrency)
+        schedule = _Schedule(self)
+        pending = {}
+        try:
+            while schedule or pending:
+                while schedule and len(pending) < concurrency:
+                    txid = schedule.pop()
+                    task = asyncio.ensure_future(driver.transactions.send_commit(self._transactions[txid], headers))
+                    pending[task] = txid
+                done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    error = task.exception()
+                    schedule.done(pending.pop(task), None if error else task.result(), error)
+        except BaseException:
+            for task in pending:
+                task.cancel()
+            raise
+        return schedule.ordered_results()
@@ -2,9 +2,17 @@
 # SPDX-License-Identifier: (Apache-2.0 AND CC-BY-4.0)
 # Code is Apache-2.0 and docs are CC-BY-4.0
 
+from functools import partial
+from threading import Lock
+
+from .bulk import send_many
+from .cache import IMMUTABLE, MUTABLE
+from .confirm import Confirmer
+from .follow import BlockFollower
 from .transport import Transport
-from .offchain import prepare_transaction, fulfill_transaction
+from .offchain import PreparedTransaction, prepare_transaction, fulfill_transaction
 from .utils import normalize_nodes
+from .validation import validate_transaction
 
 
 class Planetmint:
@@ -12,12 +20,25 @@ class Planetmint:
     and submit transactions to one or more nodes in a Federation.
 
     If initialized with ``>1`` nodes, the driver will send successive
-    requests to different nodes in a round-robin fashion (this will be
-    customizable in the future).
+    requests to different nodes in a round-robin fashion. This can be
+    customized by passing another ``picker_class`` (see
+    :mod:`planetmint_driver.pool`).
+
+    A single driver instance can be shared by many threads.
+
+    Attributes:
+        confirmer_class: Class of the :attr:`confirmer` created on the first
+            call to :meth:`~.TransactionsEndpoint.submit`.
+        validate_transactions (bool): Whether transactions are validated
+            before they are sent.
 
     """
 
-    def __init__(self, *nodes, transport_class=Transport, headers=None, timeout=20):
+    confirmer_class = Confirmer
+
+    def __init__(
+        self, *nodes, transport_class=Transport, headers=None, timeout=20, validate_transactions=False, **kwargs
+    ):
         """Initialize a :class:`~planetmint_driver.Planetmint` driver instance.
 
         Args:
@@ -35,14 +56,24 @@ class Planetmint:
                 <.TransactionsEndpoint.send_commit>`).
             timeout (int): Optional timeout in seconds that will be passed
                 to each request.
+            validate_transactions (bool): Whether to validate the schema,
+                the id and the signatures of the transactions before they
+                are sent, see
+                :func:`~planetmint_driver.validation.validate_transaction`.
+                Defaults to ``False``, leaving the validation to the nodes.
+            kwargs: Optional keyword arguments passed on to
+                ``transport_class``, e.g. ``picker_class``.
         """
+        self.validate_transactions = validate_transactions
         self._nodes = normalize_nodes(*nodes, headers=headers)
-        self._transport = transport_class(*self._nodes, timeout=timeout)
+        self._transport = transport_class(*self._nodes, timeout=timeout, **kwargs)
         self._transactions = TransactionsEndpoint(self)
         self._outputs = OutputsEndpoint(self)
         self._blocks = BlocksEndpoint(self)
         self._assets = AssetsEndpoint(self)
         self._metadata = MetadataEndpoint(self)
+        self._confirmer = None
+        self._confirmer_lock = Lock()
         self.api_prefix = "/api/v1"
 
     @property
@@ -65,6 +96,24 @@ class Planetmint:
         """
         return self._transactions
 
+    @property
+    def confirmer(self):
+        """:class:`~planetmint_driver.confirm.Confirmer`: Shared confirmer
+        resolving the futures returned by
+        :meth:`~.TransactionsEndpoint.submit`. It is created with the
+        default settings on first use, and may be replaced, e.g.
+        ``bdb.confirmer = Confirmer(bdb, timeout=300)``.
+        """
+        with self._confirmer_lock:
+            if self._confirmer is None:
+                self._confirmer = self.confirmer_class(self)
+            return self._confirmer
+
+    @confirmer.setter
+    def confirmer(self, confirmer):
+        with self._confirmer_lock:
+            self._confirmer = confirmer
+
     @property
     def outputs(self):
         """:class:`~planetmint_driver.driver.OutputsEndpoint`:
@@ -93,6 +142,24 @@ class Planetmint:
         """
         return self._blocks
 
+    def valid_transactions(self, **kwargs):
+        """Subscribes to the valid transaction event stream of the nodes.
+
+        Requires the optional ``aiohttp`` dependency.
+
+        Args:
+            kwargs: Optional keyword arguments passed on to
+                :class:`~planetmint_driver.events.ValidTransactionStream`.
+
+        Returns:
+            :class:`~planetmint_driver.events.ValidTransactionStream`: An
+            iterator, and asynchronous iterator, over the events.
+
+        """
+        from .events import ValidTransactionStream
+
+        return ValidTransactionStream(*self.nodes, **kwargs)
+
     def info(self, headers=None):
         """Retrieves information of the node being connected to via the
         root endpoint ``'/'``.
@@ -164,6 +231,14 @@ class NamespacedDriver:
     def rel_uri(self):
         return self.api_prefix + self._PATH
 
+    def _get_cacheable(self, cacheable, **request):
+        # NOTE: ``cacheable`` is only passed to a transport with a cache, so
+        # that custom transports with the original signature of
+        # forward_request() keep working
+        if getattr(self.transport, "cache", None) is not None:
+            request["cacheable"] = cacheable
+        return self.transport.forward_request(method="GET", **request)
+
 
 class TransactionsEndpoint(NamespacedDriver):
     """Exposes functionality of the ``'/transactions/'`` endpoint.
@@ -307,7 +382,27 @@ class TransactionsEndpoint(NamespacedDriver):
             list: List of transactions.
 
         """
-        return self.transport.forward_request(
+        return self._get_cacheable(
+            MUTABLE, path=self.rel_uri, params={"asset_ids": asset_ids, "operation": operation}, headers=headers
+        )
+
+    def iter_get(self, *, asset_ids, operation=None, headers=None):
+        """Like :meth:`.get`, but yields the transactions one by one as
+        they are received, so that long histories can be processed
+        without holding the whole response in memory.
+
+        Args:
+            asset_ids (list): Ids of the assets.
+            operation (str): The type of operation the transaction
+                should be. Either ``'CREATE'`` or ``'TRANSFER'``.
+                Defaults to ``None``.
+            headers (dict): Optional headers to pass to the request.
+
+        Yields:
+            dict: The transactions.
+
+        """
+        return self.transport.stream_request(
             method="GET",
             path=self.rel_uri,
             params={"asset_ids": asset_ids, "operation": operation},
@@ -318,18 +413,25 @@ class TransactionsEndpoint(NamespacedDriver):
         """Submit a transaction to the Federation with the mode `async`.
 
         Args:
-            transaction (dict): the transaction to be sent
-                to the Federation node(s).
+            transaction (:obj:`dict` | :class:`~planetmint_driver.offchain.PreparedTransaction`):
+                the transaction to be sent to the Federation node(s). The
+                canonical serialization of a prepared transaction is sent
+                as is.
             headers (dict): Optional headers to pass to the request.
 
         Returns:
             dict: The transaction sent to the Federation node(s).
 
+        Raises:
+            :exc:`~.exceptions.InvalidTransaction`: If
+                :attr:`~.Planetmint.validate_transactions` is set and the
+                transaction is not valid.
+
         """
         return self.transport.forward_request(
             method="POST",
             path=self.rel_uri,
-            json=transaction,
+            json=self._get_body(transaction),
             params={"mode": "async"},
             headers=headers,
         )
@@ -338,18 +440,25 @@ class TransactionsEndpoint(NamespacedDriver):
         """Submit a transaction to the Federation with the mode `sync`.
 
         Args:
-            transaction (dict): the transaction to be sent
-                to the Federation node(s).
+            transaction (:obj:`dict` | :class:`~planetmint_driver.offchain.PreparedTransaction`):
+                the transaction to be sent to the Federation node(s). The
+                canonical serialization of a prepared transaction is sent
+                as is.
             headers (dict): Optional headers to pass to the request.
 
         Returns:
             dict: The transaction sent to the Federation node(s).
 
+        Raises:
+            :exc:`~.exceptions.InvalidTransaction`: If
+                :attr:`~.Planetmint.validate_transactions` is set and the
+                transaction is not valid.
+
         """
         return self.transport.forward_request(
             method="POST",
             path=self.rel_uri,
-            json=transaction,
+            json=self._get_body(transaction),
             params={"mode": "sync"},
             headers=headers,
         )
@@ -358,22 +467,114 @@ class TransactionsEndpoint(NamespacedDriver):
         """Submit a transaction to the Federation with the mode `commit`.
 
         Args:
-            transaction (dict): the transaction to be sent
-                to the Federation node(s).
+            transaction (:obj:`dict` | :class:`~planetmint_driver.offchain.PreparedTransaction`):
+                the transaction to be sent to the Federation node(s). The
+                canonical serialization of a prepared transaction is sent
+                as is.
             headers (dict): Optional headers to pass to the request.
 
         Returns:
             dict: The transaction sent to the Federation node(s).
 
+        Raises:
+            :exc:`~.exceptions.InvalidTransaction`: If
+                :attr:`~.Planetmint.validate_transactions` is set and the
+                transaction is not valid.
+
         """
         return self.transport.forward_request(
             method="POST",
             path=self.rel_uri,
-            json=transaction,
+            json=self._get_body(transaction),
             params={"mode": "commit"},
             headers=headers,
         )
 
+    def submit(self, transaction, mode="async", timeout=None, headers=None):
+        """Submit a transaction and return a future that resolves once the
+        transaction is committed.
+
+        Unlike :meth:`.send_commit`, no request is held open while the
+        transaction is being committed: it is sent in ``async`` or ``sync``
+        mode and then tracked by the shared :attr:`~.Planetmint.confirmer`,
+        which polls the nodes for many pending transactions at once.
+
+        Args:
+            transaction (:obj:`dict` | :class:`~planetmint_driver.offchain.PreparedTransaction`):
+                the transaction to be sent to the Federation node(s).
+            mode (str): Either ``'async'`` or ``'sync'``. Defaults to
+                ``'async'``.
+            timeout (float): Optional number of seconds to wait for the
+                commit. Defaults to the timeout of the confirmer.
+            headers (dict): Optional headers to pass to the request.
+
+        Returns:
+            :class:`concurrent.futures.Future`: Resolves to the committed
+            transaction, or fails with
+            :exc:`~planetmint_driver.exceptions.ConfirmationTimeout`.
+
+        Raises:
+            :exc:`~.exceptions.TransportError`: If the node rejects the
+                transaction.
+
+        Example:
+
+            >>> futures = [bdb.transactions.submit(tx) for tx in signed_txs]
+            >>> committed = [future.result() for future in futures]
+
+        """
+        self._get_sender(mode, headers, ("async", "sync"))(transaction)
+        return self.driver.confirmer.track(self._get_id(transaction), timeout=timeout)
+
+    def send_many(self, transactions, mode="async", concurrency=8, headers=None):
+        """Submit many transactions, keeping up to ``concurrency`` requests
+        in flight across the nodes of the pool.
+
+        ``transactions`` may be a generator: it is consumed as requests
+        complete, so that the producer is slowed down to the pace of the
+        Federation. An error does not stop the submission of the other
+        transactions; it is reported in the result of the transaction.
+
+        Args:
+            transactions (iterable): The transactions (dicts or
+                :class:`~planetmint_driver.offchain.PreparedTransaction`)
+                to send to the Federation node(s).
+            mode (str): Either ``'async'``, ``'sync'`` or ``'commit'``.
+                Defaults to ``'async'``.
+            concurrency (int): Maximum number of requests in flight.
+                Defaults to ``8``.
+            headers (dict): Optional headers to pass to the requests.
+
+        Returns:
+            :obj:`list` of :class:`~planetmint_driver.bulk.SendResult`:
+            The response or the error of each transaction, in input order.
+
+        Example:
+
+            >>> results = bdb.transactions.send_many(signed_txs, mode='sync', concurrency=16)
+            >>> failed = [result for result in results if result.error]
+
+        """
+        return send_many(self._get_sender(mode, headers), transactions, concurrency)
+
+    @staticmethod
+    def _get_id(transaction):
+        return transaction.id if isinstance(transaction, PreparedTransaction) else transaction["id"]
+
+    def _get_body(self, transaction):
+        if not isinstance(transaction, PreparedTransaction):
+            if self.driver.validate_transactions:
+                validate_transaction(transaction)
+            return transaction
+        if self.driver.validate_transactions:
+            transaction.validate()
+        return transaction.serialize()
+
+    def _get_sender(self, mode, headers, modes=("async", "sync", "commit")):
+        if mode not in modes:
+            raise ValueError("Unknown mode {!r}, expected one of {}".format(mode, ", ".join(map(repr, modes))))
+        return partial(getattr(self, "send_" + mode), headers=headers)
+
     def retrieve(self, txid):
         """Retrieves the transaction with the given id.
 
@@ -386,7 +587,7 @@ class TransactionsEndpoint(NamespacedDriver):
 
         """
         comp_uri = self.rel_uri + txid
-        return self.transport.forward_request(method="GET", path=comp_uri, headers=None)
+        return self._get_cacheable(IMMUTABLE, path=comp_uri, headers=None)
 
 
 class OutputsEndpoint(NamespacedDriver):
@@ -426,7 +627,27 @@ class OutputsEndpoint(NamespacedDriver):
                 ... ['../transactions/da1b64a907ba54/conditions/0']
 
         """
-        return self.transport.forward_request(
+        return self._get_cacheable(
+            MUTABLE, path=self.rel_uri, params={"public_key": public_key, "spent": spent}, headers=headers
+        )
+
+    def iter_get(self, public_key, spent=None, headers=None):
+        """Like :meth:`.get`, but yields the outputs one by one as they are
+        received, so that public keys owning many outputs can be processed
+        without holding the whole response in memory.
+
+        Args:
+            public_key (str): Public key for which unfulfilled
+                conditions are sought.
+            spent (bool): Indicate if the result set should include only spent
+                or only unspent outputs. Defaults to ``None``, meaning both.
+            headers (dict): Optional headers to pass to the request.
+
+        Yields:
+            dict: The outputs.
+
+        """
+        return self.transport.stream_request(
             method="GET",
             path=self.rel_uri,
             params={"public_key": public_key, "spent": spent},
@@ -456,12 +677,7 @@ class BlocksEndpoint(NamespacedDriver):
             :obj:`list` of :obj:`int`: List of block heights.
 
         """
-        block_list = self.transport.forward_request(
-            method="GET",
-            path=self.rel_uri,
-            params={"transaction_id": txid},
-            headers=headers,
-        )
+        block_list = self._get_cacheable(MUTABLE, path=self.rel_uri, params={"transaction_id": txid}, headers=headers)
         return block_list if block_list else None
 
     def retrieve(self, block_height):
@@ -476,7 +692,39 @@ class BlocksEndpoint(NamespacedDriver):
 
         """
         comp_uri = self.rel_uri + block_height
-        return self.transport.forward_request(method="GET", path=comp_uri, headers=None)
+        return self._get_cacheable(IMMUTABLE, path=comp_uri, headers=None)
+
+    def follow(self, start=1, **kwargs):
+        """Iterates over the blocks in order from height ``start`` on,
+        prefetching the next blocks in parallel and waiting for new blocks
+        at the tip of the chain.
+
+        Args:
+            start (int): Height of the first block. Defaults to ``1``.
+            kwargs: Optional keyword arguments passed on to
+                :class:`~planetmint_driver.follow.BlockFollower`, e.g.
+                ``checkpoint``.
+
+        Returns:
+            :class:`~planetmint_driver.follow.BlockFollower`: An iterator
+            over the blocks.
+
+        """
+        return BlockFollower(self.driver, start, **kwargs)
+
+    def iter_transactions(self, block_height):
+        """Yields the transactions of the block with the given
+        ``block_height`` one by one as they are received, without holding
+        the whole block in memory.
+
+        Args:
+            block_height (str): height of the block.
+
+        Yields:
+            dict: The transactions of the block.
+
+        """
+        return self.transport.stream_request(method="GET", path=self.rel_uri + block_height, key="transactions")
 
 
 class AssetsEndpoint(NamespacedDriver):
@@ -502,7 +750,23 @@ class AssetsEndpoint(NamespacedDriver):
             :obj:`list` of :obj:`dict`: List of assets that match the query.
 
         """
-        return self.transport.forward_request(
+        return self._get_cacheable(MUTABLE, path=self.rel_uri + "/" + cid, params={"limit": limit}, headers=headers)
+
+    def iter_get(self, *, cid, limit=0, headers=None):
+        """Like :meth:`.get`, but yields the assets one by one as they are
+        received.
+
+        Args:
+            cid (str): Content identifier of the assets.
+            limit (int): Limit the number of returned documents. Defaults to
+                zero meaning that it returns all the matching assets.
+            headers (dict): Optional headers to pass to the request.
+
+        Yields:
+            dict: The assets that match the query.
+
+        """
+        return self.transport.stream_request(
             method="GET",
             path=self.rel_uri + "/" + cid,
             params={"limit": limit},
@@ -533,7 +797,25 @@ class MetadataEndpoint(NamespacedDriver):
             :obj:`list` of :obj:`dict`: List of metadata that match the query.
 
         """
-        return self.transport.forward_request(
+        return self._get_cacheable(
+            MUTABLE, path=self.rel_uri, params={"search": search, "limit": limit}, headers=headers
+        )
+
+    def iter_get(self, *, search, limit=0, headers=None):
+        """Like :meth:`.get`, but yields the metadata one by one as they
+        are received.
+
+        Args:
+            search (str): Text search string.
+            limit (int): Limit the number of returned documents. Defaults to
+                zero meaning that it returns all the matching metadata.
+            headers (dict): Optional headers to pass to the request.
+
+        Yields:
+            dict: The metadata that match the query.
+
+        """
+        return self.transport.stream_request(
             method="GET",
             path=self.rel_uri,
             params={"search": search, "limit": limit},
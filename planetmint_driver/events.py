@@ -0,0 +1,244 @@
+# Copyright Planetmint GmbH and Planetmint contributors
+# SPDX-License-Identifier: (Apache-2.0 AND CC-BY-4.0)
+# Code is Apache-2.0 and docs are CC-BY-4.0
+
+"""Subscriber for the WebSocket event stream of Planetmint nodes, which
+pushes an event for every valid transaction::
+
+    {"transaction_id": "...", "asset_id": "...", "height": 12}
+
+Requires the optional ``aiohttp`` dependency (``pip install planetmint-driver[aio]``).
+
+"""
+import asyncio
+
+from queue import Full, Queue
+from threading import Event, Thread
+from urllib.parse import urlparse, urlunparse
+
+from aiohttp import ClientError, ClientSession, WSMsgType
+
+from .codec import JSONCodec
+from .exceptions import TimeoutError
+from .utils import normalize_nodes
+
+STREAM_PATH = "/api/v1/streams/valid_transactions"
+EVENTS_PORT = 9985
+API_PORT = 9984
+
+_END = object()
+
+
+def events_url(node_url, path=STREAM_PATH):
+    """Returns the URL of the event stream of a node.
+
+    The scheme is switched to ``ws`` (or ``wss``), and the default API port
+    ``9984`` to the default event stream port ``9985``; other ports, e.g.
+    of a reverse proxy, are kept.
+
+    Args:
+        node_url (str): Url of the node, e.g. ``'http://localhost:9984'``.
+        path (str): Path of the stream.
+
+    Returns:
+        str: E.g. ``'ws://localhost:9985/api/v1/streams/valid_transactions'``.
+
+    """
+    parts = urlparse(node_url)
+    if parts.scheme in ("ws", "wss"):
+        return node_url
+    scheme = "wss" if parts.scheme == "https" else "ws"
+    port = EVENTS_PORT if parts.port in (None, API_PORT) else parts.port
+    # NOTE: only the port is swapped, so that the credentials and the
+    # brackets of an IPv6 host are kept
+    userinfo, at, host = parts.netloc.rpartition("@")
+    if parts.port is not None:
+        host = host.rpartition(":")[0]
+    netloc = "{}{}{}:{}".format(userinfo, at, host, port)
+    return urlunparse((scheme, netloc, parts.path.rstrip("/") + path, "", "", ""))
+
+
+class ValidTransactionStream:
+    """Iterates over the valid transaction events pushed by the nodes.
+
+    The stream may be consumed either with a ``for`` loop, from a
+    background thread running its own event loop, or with an ``async for``
+    loop from a running event loop. If the connection drops, or cannot be
+    established, the stream reconnects to the next node with an
+    exponential backoff. Events pushed while disconnected are missed.
+
+    Buffering is bounded: when the consumer falls behind, at most
+    ``max_queue`` events are queued, then the socket is no longer read,
+    which lets TCP flow control slow the node down.
+
+    Attributes:
+        nodes (tuple): The event stream URLs and headers of the nodes.
+        url (str): URL of the node currently connected to, if any.
+
+    Example:
+
+        >>> for event in ValidTransactionStream('http://localhost:9984'):
+        ...     print(event['transaction_id'])
+
+        >>> async for event in ValidTransactionStream('http://localhost:9984'):
+        ...     print(event['transaction_id'])
+
+    """
+
+    def __init__(
+        self,
+        *nodes,
+        max_queue=1024,
+        reconnect_delay=0.5,
+        max_reconnect_delay=30.0,
+        max_retries=None,
+        heartbeat=30.0,
+        codec=None,
+    ):
+        """Initializes a
+        :class:`~planetmint_driver.events.ValidTransactionStream` instance.
+
+        Args:
+            *nodes (list of (str or dict)): Planetmint nodes to subscribe to,
+                given as for :class:`~planetmint_driver.Planetmint` (the
+                event stream URLs are derived with :func:`events_url`), or
+                as ``ws://`` URLs.
+            max_queue (int): Maximum number of events buffered for a slow
+                consumer.
+            reconnect_delay (float): Initial delay in seconds before
+                reconnecting.
+            max_reconnect_delay (float): Maximal delay in seconds before
+                reconnecting.
+            max_retries (int): Optional maximum number of consecutive failed
+                connection attempts, after which
+                :exc:`~planetmint_driver.exceptions.TimeoutError` is raised.
+                Defaults to ``None``, meaning retry forever.
+            heartbeat (float): Interval in seconds of the pings detecting
+                dead connections.
+            codec (:class:`~planetmint_driver.codec.AbstractCodec`): Optional
+                JSON codec for the events.
+
+        """
+        self.nodes = tuple(
+            {"url": events_url(node["endpoint"]), "headers": node["headers"]} for node in normalize_nodes(*nodes)
+        )
+        self.max_queue = max_queue
+        self.reconnect_delay = reconnect_delay
+        self.max_reconnect_delay = max_reconnect_delay
+        self.max_retries = max_retries
+        self.heartbeat = heartbeat
+        self.codec = codec if codec is not None else JSONCodec()
+        self.url = None
+
+    def __aiter__(self):
+        return self._events()
+
+    async def _events(self):
+        errors = []
+        delay = self.reconnect_delay
+        index = 0
+        async with ClientSession() as session:
+            while True:
+                node = self.nodes[index % len(self.nodes)]
+                index += 1
+                try:
+                    async with session.ws_connect(
+                        node["url"], headers=node["headers"], heartbeat=self.heartbeat
+                    ) as ws:
+                        errors.clear()
+                        delay = self.reconnect_delay
+                        self.url = node["url"]
+                        async for message in ws:
+                            if message.type in (WSMsgType.TEXT, WSMsgType.BINARY):
+                                yield self.codec.loads(message.data)
+                            elif message.type == WSMsgType.ERROR:
+                                errors.append(ws.exception())
+                                break
+                except (ClientError, OSError, asyncio.TimeoutError) as err:
+                    errors.append(err)
+                    if self.max_retries is not None and len(errors) > self.max_retries:
+                        raise TimeoutError(list(errors))
+                finally:
+                    self.url = None
+
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, self.max_reconnect_delay)
+
+    def __iter__(self):
+        queue = Queue(maxsize=self.max_queue)
+        stop = Event()
+        pump = _Pump(self, queue, stop)
+        pump.start()
+        try:
+            while True:
+                item = queue.get()
+                if item is _END:
+                    if pump.error is not None:
+                        raise pump.error
+                    return
+                yield item
+        finally:
+            stop.set()
+            pump.cancel()
+
+
+class _Pump(Thread):
+    """Runs the event stream in an event loop of its own, and hands the
+    events over to the consuming thread through a bounded queue.
+    """
+
+    def __init__(self, stream, queue, stop):
+        super().__init__(name="planetmint-events", daemon=True)
+        self.stream = stream
+        self.queue = queue
+        self.stop = stop
+        self.error = None
+        self._loop = None
+        self._task = None
+
+    def run(self):
+        self._loop = asyncio.new_event_loop()
+        try:
+            self._task = self._loop.create_task(self._pump())
+            self._loop.run_until_complete(self._task)
+        except asyncio.CancelledError:
+            pass
+        except Exception as exc:
+            self.error = exc
+        finally:
+            self._loop.run_until_complete(self._loop.shutdown_asyncgens())
+            self._loop.close()
+            self._put_end()
+
+    async def _pump(self):
+        events = self.stream.__aiter__()
+        try:
+            async for event in events:
+                while True:
+                    if self.stop.is_set():
+                        return
+                    try:
+                        self.queue.put_nowait(event)
+                        break
+                    except Full:
+                        # NOTE: the consumer is behind, stop reading the socket
+                        await asyncio.sleep(0.01)
+        finally:
+            await events.aclose()
+
+    def cancel(self):
+        loop, task = self._loop, self._task
+        if loop is not None and task is not None and not loop.is_closed():
+            try:
+                loop.call_soon_threadsafe(task.cancel)
+            except RuntimeError:
+                pass
+
+    def _put_end(self):
+        # NOTE: gives up once the consumer is gone
+        while not self.stop.is_set():
+            try:
+                self.queue.put(_END, timeout=0.1)
+                return
+            except Full:
+                pass
@@ -27,6 +27,10 @@ class MissingPrivateKeyError(PlanetmintException):
     """Raised if a private key is missing."""
 
 
+class InvalidTransaction(PlanetmintException):
+    """Raised if a transaction fails the client-side validation."""
+
+
 class TimeoutError(PlanetmintException):
     """Raised if the request algorithm times out."""
 
@@ -36,6 +40,40 @@ class TimeoutError(PlanetmintException):
         return self.args[0]
 
 
+class InsufficientFunds(PlanetmintException):
+    """Raised if the spendable outputs do not cover an amount."""
+
+    @property
+    def amount(self):
+        """Returns the amount requested."""
+        return self.args[0]
+
+    @property
+    def available(self):
+        """Returns the amount available."""
+        return self.args[1]
+
+
+class ConfirmationTimeout(PlanetmintException):
+    """Raised if a transaction is not committed before its deadline."""
+
+    @property
+    def txid(self):
+        """Returns the id of the transaction."""
+        return self.args[0]
+
+
+class DependencyFailed(PlanetmintException):
+    """Raised if a transaction is not sent because a transaction it spends
+    failed to be committed.
+    """
+
+    @property
+    def txid(self):
+        """Returns the id of the failed transaction."""
+        return self.args[0]
+
+
 class TransportError(PlanetmintException):
     """Base exception for transport related errors.
 
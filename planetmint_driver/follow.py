@@ -0,0 +1,209 @@
+# Copyright Planetmint GmbH and Planetmint contributors
+# SPDX-License-Identifier: (Apache-2.0 AND CC-BY-4.0)
+# Code is Apache-2.0 and docs are CC-BY-4.0
+
+"""Sequential scanning of the chain, for indexers that need to see every
+block once, in order, and to resume where they stopped after a restart.
+
+"""
+import asyncio
+import os
+import time
+
+from concurrent.futures import ThreadPoolExecutor
+
+from .exceptions import NotFoundError
+
+
+class FileCheckpoint:
+    """Stores the height of the last processed block in a file.
+
+    The file is replaced atomically, so that a crash while saving leaves
+    either the previous or the new height, never a truncated file.
+
+    """
+
+    def __init__(self, path, fsync=True):
+        """Initializes a :class:`~planetmint_driver.follow.FileCheckpoint`
+        instance.
+
+        Args:
+            path (str): Path of the checkpoint file.
+            fsync (bool): Whether to flush the file to disk on each save, so
+                that the checkpoint survives a power loss. Defaults to
+                ``True``.
+
+        """
+        self.path = os.fspath(path)
+        self.fsync = fsync
+
+    def load(self):
+        """Returns the saved height, or ``None`` if there is none yet."""
+        try:
+            with open(self.path) as f:
+                return int(f.read().strip())
+        except FileNotFoundError:
+            return None
+
+    def save(self, height):
+        """Saves ``height`` as the height of the last processed block."""
+        tmp_path = "{}.tmp".format(self.path)
+        with open(tmp_path, "w") as f:
+            f.write(str(height))
+            if self.fsync:
+                f.flush()
+                os.fsync(f.fileno())
+        os.replace(tmp_path, self.path)
+
+
+class BlockFollower:
+    """Iterates over the blocks of the chain in order, from a given height
+    on, waiting for new blocks once the tip of the chain is reached.
+
+    Up to ``window`` blocks ahead of the one being processed are fetched in
+    parallel. Once a block is not found, i.e. the tip is reached, the
+    prefetching stops and the next height is polled every
+    ``poll_interval`` seconds until it is committed.
+
+    If a ``checkpoint`` is given, the height of a block is saved once the
+    consumer asks for the next one, i.e. once the block has been processed,
+    and iteration resumes after the saved height. A block being processed
+    when the process stops is therefore yielded again on restart.
+
+    Example:
+
+        >>> follower = BlockFollower(bdb, start=1, checkpoint=FileCheckpoint('indexer.checkpoint'))
+        >>> for block in follower:
+        ...     index(block)
+
+    """
+
+    def __init__(self, driver, start=1, *, stop=None, window=8, poll_interval=1.0, checkpoint=None):
+        """Initializes a :class:`~planetmint_driver.follow.BlockFollower`
+        instance.
+
+        Args:
+            driver (:class:`~planetmint_driver.Planetmint`): The driver used
+                to retrieve the blocks.
+            start (int): Height of the first block, if there is no saved
+                checkpoint. Defaults to ``1``.
+            stop (int): Optional height of the last block. Defaults to
+                ``None``, meaning follow the chain forever.
+            window (int): Maximum number of blocks fetched in parallel.
+            poll_interval (float): Seconds between two polls at the tip of
+                the chain.
+            checkpoint: Optional object with ``load()`` and ``save(height)``
+                methods, e.g. a
+                :class:`~planetmint_driver.follow.FileCheckpoint`.
+
+        """
+        if window < 1:
+            raise ValueError("window must be at least 1, got {}".format(window))
+        self.driver = driver
+        self.start = start
+        self.stop = stop
+        self.window = window
+        self.poll_interval = poll_interval
+        self.checkpoint = checkpoint
+        self.height = None
+
+    def next_height(self):
+        """int: The height of the next block to yield."""
+        if self.height is not None:
+            return self.height + 1
+        saved = self.checkpoint.load() if self.checkpoint is not None else None
+        return saved + 1 if saved is not None else self.start
+
+    def __iter__(self):
+        height = self.next_height()
+        ahead = self.window
+        pending = {}
+        executor = ThreadPoolExecutor(max_workers=self.window, thread_name_prefix="planetmint-follower")
+        try:
+            while self.stop is None or height <= self.stop:
+                last = height + ahead - 1 if self.stop is None else min(height + ahead - 1, self.stop)
+                for prefetch in range(height, last + 1):
+                    if prefetch not in pending:
+                        pending[prefetch] = executor.submit(self.driver.blocks.retrieve, str(prefetch))
+
+                try:
+                    block = pending.pop(height).result()
+                except NotFoundError:
+                    # NOTE: the tip of the chain is reached, the blocks
+                    # prefetched beyond it are not found either
+                    for future in pending.values():
+                        future.cancel()
+                    pending.clear()
+                    ahead = 1
+                    time.sleep(self.poll_interval)
+                    continue
+
+                ahead = self.window
+                yield block
+                self.height = height
+                if self.checkpoint is not None:
+                    self.checkpoint.save(height)
+                height += 1
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+
+def _discard(tasks):
+    for task in tasks:
+        if task.done():
+            # NOTE: retrieve the outcome, e.g. the NotFoundError of a block
+            # prefetched beyond the tip, so that it is not logged as never
+            # retrieved
+            if not task.cancelled():
+                task.exception()
+        else:
+            task.cancel()
+
+
+class AsyncBlockFollower(BlockFollower):
+    """Asyncio counterpart of
+    :class:`~planetmint_driver.follow.BlockFollower`, for an
+    :class:`~planetmint_driver.aio.AsyncPlanetmint` driver.
+
+    The blocks ahead are prefetched by asyncio tasks instead of threads.
+
+    Example:
+
+        >>> async for block in AsyncBlockFollower(bdb, start=1):
+        ...     await index(block)
+
+    """
+
+    def __iter__(self):
+        raise TypeError("{} must be iterated with 'async for'".format(type(self).__name__))
+
+    async def __aiter__(self):
+        height = self.next_height()
+        ahead = self.window
+        pending = {}
+        try:
+            while self.stop is None or height <= self.stop:
+                last = height + ahead - 1 if self.stop is None else min(height + ahead - 1, self.stop)
+                for prefetch in range(height, last + 1):
+                    if prefetch not in pending:
+                        pending[prefetch] = asyncio.ensure_future(self.driver.blocks.retrieve(str(prefetch)))
+
+                try:
+                    block = await pending.pop(height)
+                except NotFoundError:
+                    # NOTE: the tip of the chain is reached, the blocks
+                    # prefetched beyond it are not found either
+                    _discard(pending.values())
+                    pending.clear()
+                    ahead = 1
+                    await asyncio.sleep(self.poll_interval)
+                    continue
+
+                ahead = self.window
+                yield block
+                self.height = height
+                if self.checkpoint is not None:
+                    self.checkpoint.save(height)
+                height += 1
+        finally:
+            _discard(pending.values())
@@ -0,0 +1,87 @@
+# Copyright Planetmint GmbH and Planetmint contributors
+# SPDX-License-Identifier: (Apache-2.0 AND CC-BY-4.0)
+# Code is Apache-2.0 and docs are CC-BY-4.0
+
+"""Hedged requests: if a read has not been answered after a delay derived
+from the recently observed latencies, the same request is sent to a second
+node and the first response wins.
+
+"""
+from collections import deque
+from threading import Lock
+
+
+class HedgingPolicy:
+    """Decides how long to wait for a node before hedging a ``GET`` request
+    to another node.
+
+    The delay is the ``percentile`` of the latencies of the last ``window``
+    requests, clamped to ``[min_delay, max_delay]``. Until ``min_samples``
+    latencies have been recorded, ``initial_delay`` is used.
+
+    """
+
+    def __init__(
+        self,
+        percentile=95,
+        *,
+        min_delay=0.005,
+        max_delay=2.0,
+        initial_delay=0.5,
+        window=1000,
+        min_samples=20,
+        max_workers=64,
+    ):
+        """Initializes a :class:`~planetmint_driver.hedging.HedgingPolicy`
+        instance.
+
+        Args:
+            percentile (float): Percentile of the observed latencies after
+                which a request is hedged, between ``0`` and ``100``.
+            min_delay (float): Lower bound of the delay in seconds.
+            max_delay (float): Upper bound of the delay in seconds.
+            initial_delay (float): Delay in seconds used until enough
+                latencies have been observed.
+            window (int): Number of recent latencies to keep.
+            min_samples (int): Number of latencies needed before the
+                percentile is used.
+            max_workers (int): Maximum number of threads used by a blocking
+                :class:`~planetmint_driver.transport.Transport` to run the
+                hedged requests.
+
+        """
+        if not 0 < percentile <= 100:
+            raise ValueError("`percentile` must be in the interval (0, 100]")
+        self.percentile = percentile
+        self.min_delay = min_delay
+        self.max_delay = max_delay
+        self.initial_delay = initial_delay
+        self.min_samples = min_samples
+        self.max_workers = max_workers
+        self._samples = deque(maxlen=window)
+        self._recorded = 0
+        self._delay = None
+        self._lock = Lock()
+
+    def record(self, latency):
+        """Records the latency of a request, in seconds."""
+        with self._lock:
+            self._samples.append(latency)
+            self._recorded += 1
+            # NOTE: recomputing the percentile on every request would sort
+            # the whole window each time
+            if self._recorded <= self.min_samples or self._recorded % 16 == 0:
+                self._delay = self._compute_delay()
+
+    @property
+    def delay(self):
+        """float: Seconds to wait for the first node before hedging."""
+        with self._lock:
+            return self._delay if self._delay is not None else self._compute_delay()
+
+    def _compute_delay(self):
+        if len(self._samples) < self.min_samples:
+            return self.initial_delay
+        samples = sorted(self._samples)
+        index = min(len(samples) - 1, int(len(samples) * self.percentile / 100))
+        return min(self.max_delay, max(self.min_delay, samples[index]))
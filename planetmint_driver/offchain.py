@@ -6,9 +6,17 @@
 a connection to one or more  Planetmint federation nodes.
 
 """
+import inspect
 import logging
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from copy import deepcopy
 from functools import singledispatch
+from hashlib import sha3_256
 
+import base58
+import rapidjson
+from planetmint_cryptoconditions import Ed25519Sha256, ThresholdSha256
 from transactions.common.transaction import (
     Input,
     Transaction,
@@ -18,18 +26,48 @@ from transactions.types.assets.create import Create
 from transactions.types.assets.transfer import Transfer
 from transactions.types.assets.compose import Compose
 from transactions.types.assets.decompose import Decompose
+from transactions.common.schema import validate_transaction_schema
 from transactions.common.utils import _fulfillment_from_details
 from transactions.common.exceptions import KeypairMismatchException
 
+from .canonical import CanonicalTransaction, dumps as canonical_dumps
+from .codec import RawJSON
+from .crypto import Keyring
 from .exceptions import PlanetmintException, MissingPrivateKeyError
 from .utils import (
     CreateOperation,
     TransferOperation,
     _normalize_operation,
 )
+from .validation import validate_transaction
 
 logger = logging.getLogger(__name__)
 
+FULFILL_CHUNK_SIZE = 64  # transactions signed per task of a worker process
+
+FulfillResult = namedtuple("FulfillResult", ("transaction", "fulfilled", "error"))
+FulfillResult.__doc__ = """Outcome of the fulfillment of one transaction.
+
+Attributes:
+    transaction (dict): The transaction to be fulfilled.
+    fulfilled (dict): The fulfilled transaction, or ``None`` if the
+        fulfillment failed.
+    error (Exception): The exception raised by the fulfillment, or
+        ``None`` if it succeeded.
+"""
+
+SigningRequest = namedtuple("SigningRequest", ("transaction_index", "input_index", "public_key", "message"))
+SigningRequest.__doc__ = """A signature requested from a delegated signer.
+
+Attributes:
+    transaction_index (int): Index of the transaction in the batch.
+    input_index (int): Index of the input in the transaction.
+    public_key (str): The base58 encoded public key whose private key
+        must sign.
+    message (bytes): The message to sign, i.e. the SHA3-256 digest of the
+        unsigned transaction and of the output spent by the input.
+"""
+
 
 @singledispatch
 def _prepare_transaction(operation, signers=None, recipients=None, assets=None, metadata=None, inputs=None):
@@ -166,6 +204,21 @@ def prepare_create_transaction(*, signers, recipients=None, assets=None, metadat
                 recipients = signers
 
     """
+    return _generate_create_transaction(signers, recipients, assets, metadata).to_dict()
+
+
+def _generate_create_transaction(signers, recipients, assets, metadata):
+    signers, recipients = _normalize_create_parties(signers, recipients)
+    transaction = Create.generate(
+        signers,
+        recipients,
+        metadata=metadata,
+        assets=assets if assets else None,
+    )
+    return transaction
+
+
+def _normalize_create_parties(signers, recipients):
     if not isinstance(signers, (list, tuple)):
         signers = [signers]
     # NOTE: Needed for the time being. See
@@ -181,14 +234,69 @@ def prepare_create_transaction(*, signers, recipients=None, assets=None, metadat
     # https://github.com/planetmint/planetmint/issues/797
     elif isinstance(recipients, tuple):
         recipients = [(list(recipients), 1)]
+    return signers, recipients
 
-    transaction = Create.generate(
-        signers,
-        recipients,
-        metadata=metadata,
-        assets=assets if assets else None,
-    )
-    return transaction.to_dict()
+
+class CreateTemplate:
+    """Prepares ``"CREATE"`` transactions that differ only by their assets
+    and metadata, e.g. when minting in bulk.
+
+    :func:`prepare_create_transaction` builds the conditions, outputs and
+    inputs of every transaction again from the public keys. A template
+    builds them once, and each prepared transaction is cloned from the
+    serialized skeleton, which is several times faster.
+
+    Example:
+
+        >>> template = CreateTemplate(signers=alice.public_key)
+        >>> transactions = [template.prepare(metadata=cid) for cid in metadata_cids]
+
+    """
+
+    def __init__(self, *, signers, recipients=None, assets=None):
+        """Initializes a :class:`~planetmint_driver.offchain.CreateTemplate`
+        instance.
+
+        Args:
+            signers (:obj:`list` | :obj:`tuple` | :obj:`str`): One
+                or more public keys representing the issuer(s) of the
+                assets being created.
+            recipients (:obj:`list` | :obj:`tuple` | :obj:`str`, optional):
+                One or more public keys representing the new recipients(s)
+                of the assets being created. Defaults to ``None``.
+            assets (:obj:`list`, optional): The default assets of the
+                prepared transactions. Defaults to ``None``.
+
+        See :func:`prepare_create_transaction` for the details of the
+        arguments.
+
+        """
+        self.signers, self.recipients = _normalize_create_parties(signers, recipients)
+        self.assets = assets if assets else None
+        skeleton = Create.generate(self.signers, self.recipients, assets=self.assets).to_dict()
+        self._skeleton = rapidjson.dumps(skeleton)
+
+    def prepare(self, *, assets=None, metadata=None):
+        """Prepares a ``"CREATE"`` transaction payload, ready to be
+        fulfilled.
+
+        Args:
+            assets (:obj:`list`, optional): The assets to be created.
+                Defaults to the assets of the template.
+            metadata (:obj:`str`, optional): Metadata associated with the
+                transaction. Defaults to ``None``.
+
+        Returns:
+            dict: The prepared ``"CREATE"`` transaction, as returned by
+            :func:`prepare_create_transaction`.
+
+        """
+        Create.validate_create(self.signers, self.recipients, assets or self.assets, metadata)
+        transaction = rapidjson.loads(self._skeleton)
+        if assets:
+            transaction["assets"] = assets
+        transaction["metadata"] = metadata
+        return transaction
 
 
 def prepare_transfer_transaction(*, inputs, recipients, assets, metadata=None):
@@ -280,6 +388,10 @@ def prepare_transfer_transaction(*, inputs, recipients, assets, metadata=None):
         ... )
 
     """
+    return _generate_transfer_transaction(inputs, recipients, assets, metadata).to_dict()
+
+
+def _generate_transfer_transaction(inputs, recipients, assets, metadata):
     if not isinstance(inputs, (list, tuple)):
         inputs = (inputs,)
     if not isinstance(recipients, (list, tuple)):
@@ -313,7 +425,7 @@ def prepare_transfer_transaction(*, inputs, recipients, assets, metadata=None):
         asset_ids=assets,
         metadata=metadata,
     )
-    return transaction.to_dict()
+    return transaction
 
 
 def prepare_compose_transaction(*, inputs: list, assets: list, recipients):
@@ -336,34 +448,278 @@ def prepare_decompose_transaction(*, inputs: list, assets: list, recipients: lis
     return decompose_tx
 
 
+def _sign_fulfillment(fulfillment, public_key, message, keyring):
+    try:
+        fulfillment.signature = keyring.sign(public_key, message)
+    except KeyError:
+        raise KeypairMismatchException("Public key {} is not a pair to any of the private keys".format(public_key))
+
+
+def _collect_signing(transaction, payload=None):
+    """Builds the payload of ``transaction`` with its inputs unsigned, and
+    returns it as a
+    :class:`~planetmint_driver.canonical.CanonicalTransaction`, along with
+    the copies of the inputs to be signed and the signatures they need, as
+    ``(input_index, fulfillment, public_key, message)`` tuples.
+
+    The payload is built from a single :meth:`Transaction.to_dict` instead
+    of one for the message, one for the id and one for the result, or taken
+    from ``payload`` if the transaction was loaded from it.
+
+    """
+    # NOTE: neither the payload given nor the one returned by the memoized
+    # Transaction.to_dict() may be modified, only a copy is
+    canonical = CanonicalTransaction(dict(payload if payload is not None else transaction.to_dict(), id=None))
+    message = canonical.serialize(with_signatures=False)
+    inputs = []
+    signatures = []
+
+    for index, input_ in enumerate(transaction.inputs):
+        input_ = deepcopy(input_)
+        input_message = sha3_256(message)
+        if input_.fulfills:
+            input_message.update("{}{}".format(input_.fulfills.txid, input_.fulfills.output).encode())
+        digest = input_message.digest()
+
+        fulfillment = input_.fulfillment
+        if isinstance(fulfillment, Ed25519Sha256):
+            signatures.append((index, fulfillment, input_.owners_before[0], digest))
+        elif isinstance(fulfillment, ThresholdSha256):
+            for owner_before in set(input_.owners_before):
+                subfulfillments = fulfillment.get_subcondition_from_vk(base58.b58decode(owner_before))
+                if not subfulfillments:
+                    raise KeypairMismatchException(
+                        "Public key {} cannot be found in the fulfillment".format(owner_before)
+                    )
+                signatures.extend((index, subfulfillment, owner_before, digest) for subfulfillment in subfulfillments)
+        else:
+            raise ValueError("Fulfillment couldn't be matched to crypto condition fulfillment type.")
+        inputs.append(input_)
+
+    return canonical, inputs, signatures
+
+
+def _complete_signing(transaction, canonical, inputs):
+    """Sets the signed ``inputs`` and the id of ``transaction``, once their
+    signatures are set, and returns ``canonical``.
+    """
+    transaction.inputs[:] = inputs
+    canonical.set_inputs([input_.to_dict() for input_ in inputs])
+    transaction._id = canonical.update_id()
+    return canonical
+
+
+def _sign_with_keyring(transaction, keyring, payload=None):
+    """Signs the inputs of ``transaction`` and returns the fulfilled
+    transaction payload, as a
+    :class:`~planetmint_driver.canonical.CanonicalTransaction`.
+
+    Does the same as :meth:`Transaction.sign`, with the keys parsed
+    beforehand, see :func:`_collect_signing`. Only the inputs are
+    serialized again once signed.
+
+    """
+    canonical, inputs, signatures = _collect_signing(transaction, payload)
+    for _, fulfillment, public_key, message in signatures:
+        _sign_fulfillment(fulfillment, public_key, message, keyring)
+    return _complete_signing(transaction, canonical, inputs)
+
+
+class PreparedTransaction:
+    """A transaction kept as an object from its preparation to its
+    fulfillment.
+
+    :func:`prepare_create_transaction` and :func:`fulfill_transaction`
+    exchange the transaction as a :obj:`dict`, so that it is serialized once
+    to be prepared, parsed again to be fulfilled, and serialized twice more
+    while signing. A prepared transaction builds its payload once, when it
+    is signed, and caches it along with its canonical serialization.
+
+    Example:
+
+        >>> prepared = PreparedTransaction.create(signers=alice.public_key, metadata=metadata_cid)
+        >>> prepared.sign(keyring)
+        >>> bdb.transactions.send_commit(prepared)
+
+    Attributes:
+        transaction (:class:`~transactions.common.transaction.Transaction`):
+            The underlying transaction.
+
+    """
+
+    def __init__(self, transaction):
+        """Initializes a :class:`~planetmint_driver.offchain.PreparedTransaction`
+        instance.
+
+        Args:
+            transaction (:class:`~transactions.common.transaction.Transaction`):
+                The transaction to be fulfilled.
+
+        """
+        self.transaction = transaction
+        self._payload = None
+        self._canonical = None
+        self._serialized = None
+
+    @classmethod
+    def create(cls, *, signers, recipients=None, assets=None, metadata=None):
+        """Prepares a ``"CREATE"`` transaction, see
+        :func:`prepare_create_transaction`.
+        """
+        return cls(_generate_create_transaction(signers, recipients, assets, metadata))
+
+    @classmethod
+    def transfer(cls, *, inputs, recipients, assets, metadata=None):
+        """Prepares a ``"TRANSFER"`` transaction, see
+        :func:`prepare_transfer_transaction`.
+        """
+        return cls(_generate_transfer_transaction(inputs, recipients, assets, metadata))
+
+    @classmethod
+    def from_dict(cls, transaction, *, trusted=False):
+        """Loads a prepared transaction payload.
+
+        Args:
+            transaction (dict): The transaction payload, e.g. as returned by
+                :func:`prepare_transaction`.
+            trusted (bool): Whether to skip the validation of the payload
+                against the transaction schema. Only payloads built by the
+                driver itself should be trusted. Defaults to ``False``.
+
+        Raises:
+            :exc:`~transactions.common.exceptions.SchemaValidationError`:
+                If the payload is not valid.
+
+        """
+        if not trusted:
+            validate_transaction_schema(transaction)
+        prepared = cls(Transaction.from_dict(transaction))
+        # NOTE: the payload is that of the transaction, it saves building
+        # it again when signing
+        prepared._payload = transaction
+        return prepared
+
+    @property
+    def id(self):
+        """str: The id of the transaction, once signed."""
+        return self.transaction.id
+
+    @property
+    def signed(self):
+        """bool: Whether the transaction is signed."""
+        return self._canonical is not None
+
+    def sign(self, private_keys):
+        """Fulfills the inputs of the transaction.
+
+        Args:
+            private_keys (:obj:`str` | :obj:`list` | :obj:`tuple` | :class:`~planetmint_driver.crypto.Keyring`):
+                One or more private keys to be used for fulfilling the
+                transaction.
+
+        Returns:
+            :class:`~planetmint_driver.offchain.PreparedTransaction`: The
+            fulfilled transaction itself.
+
+        Raises:
+            :exc:`~.exceptions.MissingPrivateKeyError`: If a private
+                key is missing.
+
+        """
+        keyring = private_keys if isinstance(private_keys, Keyring) else Keyring(private_keys)
+        try:
+            self._canonical = _sign_with_keyring(self.transaction, keyring, self._payload)
+        except KeypairMismatchException as exc:
+            raise MissingPrivateKeyError("A private key is missing!") from exc
+        self._serialized = None
+        return self
+
+    def validate(self, **checks):
+        """Validates the fulfilled transaction, see
+        :func:`~planetmint_driver.validation.validate_transaction`.
+
+        The checks of a signed transaction run on the canonical form built
+        while signing, instead of serializing its payload again.
+
+        Args:
+            checks: Optional keyword arguments of
+                :func:`~planetmint_driver.validation.validate_transaction`,
+                e.g. ``signatures=False``.
+
+        Raises:
+            :exc:`~planetmint_driver.exceptions.InvalidTransaction`: If the
+                transaction is not valid.
+
+        """
+        validate_transaction(self._canonical if self._canonical is not None else self.to_dict(), **checks)
+
+    def to_dict(self):
+        """Returns the transaction payload, fulfilled if it was signed.
+
+        The payload of a signed transaction is built once and cached: it
+        must not be modified.
+
+        """
+        if self._canonical is None:
+            return self._payload if self._payload is not None else self.transaction.to_dict()
+        return self._canonical.transaction
+
+    def serialize(self):
+        """Returns the canonical JSON serialization of the payload, i.e.
+        compact and with sorted keys.
+
+        The serialization of a signed transaction is assembled from the
+        members serialized while signing, and cached. It is sent as is by
+        the ``send_*`` methods of
+        :class:`~planetmint_driver.driver.TransactionsEndpoint`.
+
+        Returns:
+            :class:`~planetmint_driver.codec.RawJSON`: The serialized
+            payload.
+
+        """
+        if self._canonical is None:
+            return RawJSON(canonical_dumps(self.to_dict()))
+        if self._serialized is None:
+            self._serialized = self._canonical.to_raw_json()
+        return self._serialized
+
+
 def fulfill_transaction(transaction, *, private_keys):
     """Fulfills the given transaction.
 
     Args:
         transaction (dict): The transaction to be fulfilled.
-        private_keys (:obj:`str` | :obj:`list` | :obj:`tuple`): One or
-            more private keys to be used for fulfilling the
-            transaction.
+        private_keys (:obj:`str` | :obj:`list` | :obj:`tuple` | :class:`~planetmint_driver.crypto.Keyring`):
+            One or more private keys to be used for fulfilling the
+            transaction. A :class:`~planetmint_driver.crypto.Keyring` saves
+            parsing the keys again on each call.
 
     Returns:
         dict: The fulfilled transaction payload, ready to be sent to a
-        Planetmint federation.
+        Planetmint federation. It is a new payload, sharing no object with
+        ``transaction``.
 
     Raises:
         :exc:`~.exceptions.MissingPrivateKeyError`: If a private
             key is missing.
 
     """
-    if not isinstance(private_keys, (list, tuple)):
-        private_keys = [private_keys]
-
-    # NOTE: Needed for the time being. See
-    # https://github.com/planetmint/planetmint/issues/797
-    if isinstance(private_keys, tuple):
-        private_keys = list(private_keys)
-
     transaction_obj = Transaction.from_dict(transaction)
     try:
+        if isinstance(private_keys, Keyring):
+            # NOTE: the signed payload shares the members of ``transaction``
+            # but its inputs, a copy is returned as in the other path
+            return _sign_with_keyring(transaction_obj, private_keys, transaction).to_dict()
+
+        if not isinstance(private_keys, (list, tuple)):
+            private_keys = [private_keys]
+
+        # NOTE: Needed for the time being. See
+        # https://github.com/planetmint/planetmint/issues/797
+        if isinstance(private_keys, tuple):
+            private_keys = list(private_keys)
+
         signed_transaction = transaction_obj.sign(private_keys)
     except KeypairMismatchException as exc:
         raise MissingPrivateKeyError("A private key is missing!") from exc
@@ -371,6 +727,89 @@ def fulfill_transaction(transaction, *, private_keys):
     return signed_transaction.to_dict()
 
 
+# NOTE: keyring of a worker process of fulfill_transactions(), set once by
+# the pool initializer instead of being pickled along with every task
+_worker_keyring = None
+
+
+def _init_fulfill_worker(keyring):
+    global _worker_keyring
+    _worker_keyring = keyring
+
+
+def _fulfill_chunk(transactions):
+    outcomes = []
+    for transaction in transactions:
+        try:
+            outcomes.append((fulfill_transaction(transaction, private_keys=_worker_keyring), None))
+        except Exception as exc:
+            outcomes.append((None, exc))
+    return outcomes
+
+
+def fulfill_transactions(
+    transactions, *, private_keys, max_workers=None, chunksize=FULFILL_CHUNK_SIZE, mp_context=None
+):
+    """Fulfills many transactions in parallel, on a pool of processes.
+
+    Signing is CPU bound, so :func:`fulfill_transaction` cannot use more
+    than one core from threads. The private keys are handed over once to
+    each worker process, when it starts, and parsed there once into a
+    :class:`~planetmint_driver.crypto.Keyring`. The transactions are sent
+    to the workers in chunks of ``chunksize``.
+
+    Args:
+        transactions (iterable): The transactions to be fulfilled.
+        private_keys (:obj:`str` | :obj:`list` | :obj:`tuple` | :class:`~planetmint_driver.crypto.Keyring`):
+            One or more private keys to be used for fulfilling the
+            transactions. Each transaction is signed with the keys of its
+            inputs, so a batch of transactions with different signers may
+            be fulfilled at once by passing all of their keys.
+        max_workers (int): Maximum number of worker processes. Defaults to
+            the number of processors.
+        chunksize (int): Number of transactions sent to a worker at once.
+        mp_context: Optional :mod:`multiprocessing` context used to start
+            the workers, e.g. ``multiprocessing.get_context('spawn')``.
+
+    Returns:
+        :obj:`list` of :class:`~planetmint_driver.offchain.FulfillResult`:
+        The outcome of each fulfillment, in input order. A transaction that
+        cannot be fulfilled, e.g. because a private key is missing, does
+        not abort the batch: its
+        :attr:`~planetmint_driver.offchain.FulfillResult.error` is set.
+
+    Raises:
+        :exc:`~planetmint_driver.exceptions.InvalidPrivateKey`: If a
+            private key cannot be decoded.
+
+    """
+    if chunksize < 1:
+        raise ValueError("chunksize must be at least 1, got {}".format(chunksize))
+    keyring = private_keys if isinstance(private_keys, Keyring) else Keyring(private_keys)
+    transactions = list(transactions)
+    chunks = [transactions[start : start + chunksize] for start in range(0, len(transactions), chunksize)]
+    results = []
+    if not chunks:
+        return results
+
+    with ProcessPoolExecutor(
+        max_workers=max_workers,
+        mp_context=mp_context,
+        initializer=_init_fulfill_worker,
+        initargs=(keyring,),
+    ) as executor:
+        futures = [executor.submit(_fulfill_chunk, chunk) for chunk in chunks]
+        for chunk, future in zip(chunks, futures):
+            try:
+                outcomes = future.result()
+            except Exception as exc:
+                # NOTE: the whole chunk is lost, e.g. if a worker died or
+                # an outcome could not be pickled
+                outcomes = [(None, exc)] * len(chunk)
+            results.extend(FulfillResult(transaction, *outcome) for transaction, outcome in zip(chunk, outcomes))
+    return results
+
+
 def fulfill_with_signing_delegation(transaction, signing_callback):
     """Fulfills the given transction with signing delegated to
     `signing_callback`.
@@ -385,3 +824,84 @@ def fulfill_with_signing_delegation(transaction, signing_callback):
             Planetmint federation.
     """
     return Transaction.from_dict(transaction).delegate_signing(signing_callback).to_dict()
+
+
+def _collect_batch_signing(transactions):
+    batch = []
+    requests = []
+    fulfillments = []
+    for transaction_index, transaction in enumerate(transactions):
+        transaction_obj = Transaction.from_dict(transaction)
+        canonical, inputs, signatures = _collect_signing(transaction_obj, transaction)
+        batch.append((transaction_obj, canonical, inputs))
+        for input_index, fulfillment, public_key, message in signatures:
+            requests.append(SigningRequest(transaction_index, input_index, public_key, message))
+            fulfillments.append(fulfillment)
+    return batch, requests, fulfillments
+
+
+def _complete_batch_signing(batch, fulfillments, signatures):
+    signatures = list(signatures)
+    if len(signatures) != len(fulfillments):
+        raise ValueError("Expected {} signatures, got {}".format(len(fulfillments), len(signatures)))
+    for fulfillment, signature in zip(fulfillments, signatures):
+        fulfillment.signature = signature
+    return [_complete_signing(*signing).transaction for signing in batch]
+
+
+def fulfill_batch_with_signing_delegation(transactions, signing_callback):
+    """Fulfills many transactions with a single call to a delegated signer,
+    e.g. a remote signing service or an HSM.
+
+    The messages to sign for all the inputs of all the transactions are
+    collected first, passed at once to ``signing_callback``, and the
+    signatures it returns are assembled into the fulfillments, so that
+    signing a batch costs one round trip to the signer, instead of one per
+    input with :func:`fulfill_with_signing_delegation`.
+
+    Args:
+        transactions (iterable): The transactions to be fulfilled.
+        signing_callback (callable): Takes the list of the
+            :class:`~planetmint_driver.offchain.SigningRequest` of the
+            batch, and returns the raw Ed25519 signatures (bytes) of their
+            messages, in the same order.
+
+    Returns:
+        :obj:`list` of :obj:`dict`: The fulfilled transaction payloads, in
+        input order.
+
+    Raises:
+        :exc:`ValueError`: If the callback does not return one signature
+            per request.
+
+    Example:
+
+        >>> def sign_remotely(requests):
+        ...     return signer.sign_many([request.message for request in requests])
+        >>> fulfilled = fulfill_batch_with_signing_delegation(transactions, sign_remotely)
+
+    """
+    batch, requests, fulfillments = _collect_batch_signing(transactions)
+    return _complete_batch_signing(batch, fulfillments, signing_callback(requests))
+
+
+async def async_fulfill_batch_with_signing_delegation(transactions, signing_callback):
+    """Asyncio counterpart of :func:`fulfill_batch_with_signing_delegation`.
+
+    Args:
+        transactions (iterable): The transactions to be fulfilled.
+        signing_callback (callable): Takes the list of the
+            :class:`~planetmint_driver.offchain.SigningRequest` of the
+            batch, and returns the signatures, or an awaitable resolving to
+            them, e.g. a coroutine function.
+
+    Returns:
+        :obj:`list` of :obj:`dict`: The fulfilled transaction payloads, in
+        input order.
+
+    """
+    batch, requests, fulfillments = _collect_batch_signing(transactions)
+    signatures = signing_callback(requests)
+    if inspect.isawaitable(signatures):
+        signatures = await signatures
+    return _complete_batch_signing(batch, fulfillments, signatures)
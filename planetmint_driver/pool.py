@@ -2,8 +2,11 @@
 # SPDX-License-Identifier: (Apache-2.0 AND CC-BY-4.0)
 # Code is Apache-2.0 and docs are CC-BY-4.0
 
+import random
+
 from abc import ABCMeta, abstractmethod
 from datetime import datetime
+from threading import Lock
 
 
 class AbstractPicker(metaclass=ABCMeta):
@@ -50,8 +53,105 @@ class RoundRobinPicker(AbstractPicker):
         return min(*connections, key=key)
 
 
+class LatencyAwarePicker(AbstractPicker):
+    """Picks the healthy :class:`~planetmint_driver.connection.Connection`
+    with the lowest exponentially weighted moving average of its response
+    latency, penalized by its recent error rate.
+
+    Every connection is measured at least once, and with probability
+    ``exploration`` a random healthy connection is picked instead of the
+    fastest one, so that the latency of slow nodes keeps being re-measured.
+
+    """
+
+    def __init__(self, exploration=0.05, error_penalty=10):
+        """Initializes a :class:`~planetmint_driver.pool.LatencyAwarePicker`
+        instance.
+
+        Args:
+            exploration (float): Probability of picking a random healthy
+                connection instead of the fastest one.
+            error_penalty (float): Factor by which a connection with an
+                error rate of ``1`` has its latency inflated.
+
+        """
+        self.exploration = exploration
+        self.error_penalty = error_penalty
+
+    def score(self, connection):
+        """Returns the expected cost of sending a request to
+        ``connection``. Lower is better.
+        """
+        return connection.latency * (1 + self.error_penalty * connection.error_rate)
+
+    def pick(self, connections):
+        """Picks the fastest healthy connection.
+
+           A connection is healthy if it has no backoff time, or if its
+           backoff time has passed. If no connection is healthy, the one
+           with the earliest backoff time is picked.
+
+        Args:
+            connections (:obj:list): List of
+                :class:`~planetmint_driver.connection.Connection` instances.
+
+        """
+        if len(connections) == 1:
+            return connections[0]
+
+        utcnow = datetime.utcnow()
+        healthy = [conn for conn in connections if (conn.backoff_time or datetime.min) <= utcnow]
+        if not healthy:
+            return min(connections, key=lambda conn: conn.backoff_time or datetime.min)
+
+        for conn in healthy:
+            if conn.latency is None:
+                return conn
+
+        if self.exploration and random.random() < self.exploration:
+            return random.choice(healthy)
+
+        return min(healthy, key=self.score)
+
+
+class LeastOutstandingPicker(AbstractPicker):
+    """Picks the :class:`~planetmint_driver.connection.Connection` with the
+    fewest requests in flight, which balances the load when a driver is
+    shared by several threads or tasks.
+
+    """
+
+    def pick(self, connections):
+        """Picks the connection with the fewest outstanding requests.
+
+           Connections whose backoff time has not passed yet are only
+           picked if every connection is backing off. Ties are broken by
+           the earliest backoff time, then by the order of the connections.
+
+        Args:
+            connections (:obj:list): List of
+                :class:`~planetmint_driver.connection.Connection` instances.
+
+        """
+        if len(connections) == 1:
+            return connections[0]
+
+        utcnow = datetime.utcnow()
+
+        def key(conn):
+            backoff_time = datetime.min if conn.backoff_time is None else conn.backoff_time
+            return (backoff_time > utcnow, conn.in_flight, backoff_time)
+
+        return min(connections, key=key)
+
+
 class Pool:
-    """Pool of connections."""
+    """Pool of connections.
+
+    The list of connections is frozen at initialization and picking is
+    serialized, so a pool may be shared between threads.
+
+    """
 
     def __init__(self, connections, picker_class=RoundRobinPicker):
         """Initializes a :class:`~planetmint_driver.pool.Pool` instance.
@@ -59,17 +159,47 @@ class Pool:
         Args:
             connections (list): List of
                 :class:`~planetmint_driver.connection.Connection` instances.
+            picker_class: Optional picker class to use. Defaults to
+                :class:`~planetmint_driver.pool.RoundRobinPicker`.
 
         """
-        self.connections = connections
+        self.connections = tuple(connections)
         self.picker = picker_class()
+        self._lock = Lock()
 
-    def get_connection(self):
+    def get_connection(self, exclude=()):
         """Gets a :class:`~planetmint_driver.connection.Connection`
         instance from the pool.
 
+        Connections whose circuit breaker is open, or half-open with a
+        probe in flight, are skipped, as long as another connection is
+        available. Otherwise the picker chooses among all connections and
+        the request waits for the backoff of the chosen node, or for the
+        outcome of its probe.
+
+        The picked connection is claimed with
+        :meth:`~planetmint_driver.connection.BaseConnection.try_acquire`
+        while the pool is locked: if its breaker is half-open, the caller
+        owns its probe, which is released by the next
+        :meth:`~planetmint_driver.connection.Connection.request`.
+
+        Args:
+            exclude (:obj:`tuple`): Connections to avoid, e.g. because a
+                request is already pending on them. They are only picked
+                if no other connection is left.
+
         Returns:
             A :class:`~planetmint_driver.connection.Connection` instance.
 
         """
-        return self.picker.pick(self.connections)
+        connections = self.connections
+        if exclude:
+            connections = tuple(conn for conn in connections if conn not in exclude) or connections
+        with self._lock:
+            candidates = [conn for conn in connections if conn.available]
+            while candidates:
+                connection = self.picker.pick(candidates)
+                if connection.try_acquire():
+                    return connection
+                candidates.remove(connection)
+            return self.picker.pick(connections)
@@ -0,0 +1,90 @@
+# Copyright Planetmint GmbH and Planetmint contributors
+# SPDX-License-Identifier: (Apache-2.0 AND CC-BY-4.0)
+# Code is Apache-2.0 and docs are CC-BY-4.0
+
+"""Coalescing of identical concurrent calls: while a call for a given key
+is in flight, further calls for the same key wait for it and share its
+result or exception instead of being made again.
+
+"""
+import asyncio
+
+from concurrent.futures import Future
+from threading import Lock
+
+
+class SingleFlight:
+    """Coalesces identical concurrent calls made from several threads."""
+
+    def __init__(self):
+        self._calls = {}
+        self._lock = Lock()
+
+    def do(self, key, func):
+        """Calls ``func`` unless a call for ``key`` is already in flight,
+        in which case its outcome is awaited and shared.
+
+        Args:
+            key: Hashable key identifying the call.
+            func (callable): Function taking no arguments.
+
+        Returns:
+            The return value of ``func``.
+
+        Raises:
+            Whatever exception ``func`` raised.
+
+        """
+        with self._lock:
+            future = self._calls.get(key)
+            leader = future is None
+            if leader:
+                future = self._calls[key] = Future()
+
+        if not leader:
+            return future.result()
+
+        try:
+            result = func()
+        except BaseException as exc:
+            self._forget(key)
+            future.set_exception(exc)
+            raise
+        self._forget(key)
+        future.set_result(result)
+        return result
+
+    def _forget(self, key):
+        with self._lock:
+            del self._calls[key]
+
+
+class AsyncSingleFlight:
+    """Coalesces identical concurrent calls made from several tasks of an
+    event loop.
+
+    The shared call runs in its own task, so that cancelling one of the
+    waiters does not cancel it for the others.
+
+    """
+
+    def __init__(self):
+        self._calls = {}
+
+    async def do(self, key, func):
+        """Awaits ``func()`` unless a call for ``key`` is already in flight,
+        in which case its outcome is awaited and shared.
+
+        Args:
+            key: Hashable key identifying the call.
+            func (callable): Coroutine function taking no arguments.
+
+        Returns:
+            The result of ``func()``.
+
+        """
+        task = self._calls.get(key)
+        if task is None:
+            task = self._calls[key] = asyncio.ensure_future(func())
+            task.add_done_callback(lambda _: self._calls.pop(key, None))
+        return await asyncio.shield(task)
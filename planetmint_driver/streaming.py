@@ -0,0 +1,201 @@
+# Copyright Planetmint GmbH and Planetmint contributors
+# SPDX-License-Identifier: (Apache-2.0 AND CC-BY-4.0)
+# Code is Apache-2.0 and docs are CC-BY-4.0
+
+"""Incremental parsing of JSON arrays, so that large list responses can be
+consumed item by item, in constant memory, while they are read from the
+socket.
+
+"""
+import re
+
+_SPECIAL = re.compile(rb'[\[\]{}",]')
+_STRING_SPECIAL = re.compile(rb'["\\]')
+
+
+class JSONArrayParser:
+    """Splits a JSON array fed in chunks into its items.
+
+    Only the bytes of the item being read are buffered: each item is
+    decoded with ``loads`` as soon as its end is seen. By default the
+    document must be an array; if ``key`` is given, the document must be an
+    object and the items of the array stored under ``key`` are produced,
+    while the other members are skipped.
+
+    Example:
+
+        >>> parser = JSONArrayParser(json.loads)
+        >>> parser.feed(b'[{"a": 1}, {"a"')
+        [{'a': 1}]
+        >>> parser.feed(b': 2}]')
+        [{'a': 2}]
+        >>> parser.close()
+
+    """
+
+    def __init__(self, loads, key=None):
+        """Initializes a :class:`~planetmint_driver.streaming.JSONArrayParser`
+        instance.
+
+        Args:
+            loads (callable): Decodes the bytes of a single item, e.g.
+                :meth:`~planetmint_driver.codec.AbstractCodec.loads`.
+            key (str): Optional key of the array to stream, if the document
+                is an object.
+
+        """
+        self.loads = loads
+        self.key = key.encode() if key is not None else None
+        self.done = False
+        self._buffer = bytearray()
+        self._pos = 0
+        self._depth = 0
+        self._in_string = False
+        self._string_start = None
+        self._last_string = None
+        self._target_depth = None
+        self._start = None
+
+    def feed(self, chunk):
+        """Feeds the next chunk of the document.
+
+        Args:
+            chunk (bytes): The next bytes of the document.
+
+        Returns:
+            list: The items completed by ``chunk``.
+
+        Raises:
+            ValueError: If the document is not of the expected shape, or an
+                item is not valid JSON.
+
+        """
+        if self.done:
+            if chunk.strip():
+                raise ValueError("Extra data after the end of the JSON document")
+            return []
+
+        self._buffer += chunk
+        items = []
+        buffer = self._buffer
+        pos = self._pos
+        while not self.done:
+            if self._in_string:
+                match = _STRING_SPECIAL.search(buffer, pos)
+                if match is None:
+                    pos = len(buffer)
+                    break
+                if match.group() == b"\\":
+                    if match.end() >= len(buffer):
+                        # NOTE: the escaped character is in the next chunk
+                        pos = match.start()
+                        break
+                    pos = match.end() + 1
+                    continue
+                self._in_string = False
+                if self.key is not None and self._depth == 1:
+                    self._last_string = bytes(buffer[self._string_start : match.start()])
+                self._string_start = None
+                pos = match.end()
+                continue
+
+            match = _SPECIAL.search(buffer, pos)
+            if match is None:
+                pos = len(buffer)
+                break
+            pos = match.end()
+            char = match.group()
+            if char == b'"':
+                self._in_string = True
+                self._string_start = pos
+            elif char in b"[{":
+                self._open(char, pos)
+            elif char in b"]}":
+                if self._depth == self._target_depth:
+                    self._emit(items, match.start())
+                    self._start = None
+                    if self._target_depth == 1:
+                        self.done = True
+                    self._target_depth = None
+                self._depth -= 1
+                if self._depth == 0:
+                    self.done = True
+            elif self._depth == self._target_depth:
+                # NOTE: a comma separating two items of the streamed array
+                self._emit(items, match.start())
+                self._start = pos
+
+        if self.done and buffer[pos:].strip():
+            raise ValueError("Extra data after the end of the JSON document")
+        self._compact(pos)
+        return items
+
+    def close(self):
+        """Checks that the whole document has been fed.
+
+        Raises:
+            ValueError: If the document is truncated.
+
+        """
+        if not self.done:
+            raise ValueError("Truncated JSON document")
+
+    def _open(self, char, pos):
+        if self._depth == 0:
+            if self.key is None and char != b"[":
+                raise ValueError("Expected a JSON array")
+            if self.key is not None and char != b"{":
+                raise ValueError("Expected a JSON object")
+            if self.key is None:
+                self._target_depth = 1
+                self._start = pos
+        elif (
+            self.key is not None
+            and self._depth == 1
+            and char == b"["
+            and self._last_string == self.key
+            and self._target_depth is None
+        ):
+            self._target_depth = 2
+            self._start = pos
+        self._depth += 1
+
+    def _emit(self, items, end):
+        item = bytes(self._buffer[self._start : end])
+        if item.strip():
+            items.append(self.loads(item))
+
+    def _compact(self, pos):
+        if self._start is not None:
+            keep = self._start
+        elif self._in_string:
+            keep = self._string_start if self._string_start is not None else pos
+        else:
+            keep = pos
+        if keep:
+            del self._buffer[:keep]
+            pos -= keep
+            if self._start is not None:
+                self._start -= keep
+            if self._string_start is not None:
+                self._string_start -= keep
+        self._pos = pos
+
+
+def iter_json_array(chunks, loads, key=None):
+    """Yields the items of the JSON array read from ``chunks``.
+
+    Args:
+        chunks (iterable): Iterable of :obj:`bytes`.
+        loads (callable): Decodes the bytes of a single item.
+        key (str): Optional key of the array to stream, if the document is
+            an object.
+
+    Raises:
+        ValueError: If the document is truncated or malformed.
+
+    """
+    parser = JSONArrayParser(loads, key=key)
+    for chunk in chunks:
+        yield from parser.feed(chunk)
+    parser.close()
@@ -2,22 +2,46 @@
 # SPDX-License-Identifier: (Apache-2.0 AND CC-BY-4.0)
 # Code is Apache-2.0 and docs are CC-BY-4.0
 
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from functools import partial
+from threading import BoundedSemaphore
 from time import time
 
 from requests.exceptions import ConnectionError
 
+from .cache import MUTABLE
 from .connection import Connection
-from .exceptions import TimeoutError
-from .pool import Pool
+from .exceptions import TimeoutError, TransportError
+from .pool import Pool, RoundRobinPicker
+from .singleflight import SingleFlight
 
 
 NO_TIMEOUT_BACKOFF_CAP = 10  # seconds
 
 
 class Transport:
-    """Transport class."""
+    """Transport class.
 
-    def __init__(self, *nodes, timeout=None):
+    A transport is safe to share between threads: requests made
+    concurrently are spread over the pool, every thread talks to a node
+    through its own HTTP session, and the per-node backoff state is
+    updated atomically.
+
+    """
+
+    connection_class = Connection
+    single_flight_class = SingleFlight
+
+    def __init__(
+        self,
+        *nodes,
+        timeout=None,
+        picker_class=RoundRobinPicker,
+        hedging=None,
+        cache=None,
+        coalesce=False,
+        codec=None,
+    ):
         """Initializes an instance of
         :class:`~planetmint_driver.transport.Transport`.
 
@@ -25,13 +49,41 @@ class Transport:
             nodes: each node is a dictionary with the keys `endpoint` and
                    `headers`
             timeout (int): Optional timeout in seconds.
+            picker_class: Optional picker class used by the connection
+                pool. Defaults to
+                :class:`~planetmint_driver.pool.RoundRobinPicker`.
+            hedging (:class:`~planetmint_driver.hedging.HedgingPolicy`):
+                Optional policy enabling hedged ``GET`` requests. Defaults
+                to ``None``, meaning that requests are not hedged.
+            cache (:class:`~planetmint_driver.cache.AbstractCache`): Optional
+                cache for the responses of cacheable ``GET`` requests.
+                Defaults to ``None``.
+            coalesce (bool): Whether identical ``GET`` requests made
+                concurrently share a single HTTP request. Defaults to
+                ``False``.
+            codec (:class:`~planetmint_driver.codec.AbstractCodec`): Optional
+                JSON codec used by the connections. Defaults to
+                :class:`~planetmint_driver.codec.JSONCodec`.
 
         """
         self.nodes = nodes
         self.timeout = timeout
-        self.connection_pool = Pool([Connection(node_url=node["endpoint"], headers=node["headers"]) for node in nodes])
+        self.hedging = hedging
+        self.cache = cache
+        self._single_flight = self.single_flight_class() if coalesce else None
+        self._hedging_executor = None
+        if hedging is not None:
+            self._hedging_executor = ThreadPoolExecutor(
+                max_workers=hedging.max_workers,
+                thread_name_prefix="planetmint-hedge",
+            )
+            self._hedging_slots = BoundedSemaphore(hedging.max_workers)
+        self.connection_pool = Pool(
+            [self.connection_class(node_url=node["endpoint"], headers=node["headers"], codec=codec) for node in nodes],
+            picker_class=picker_class,
+        )
 
-    def forward_request(self, method, path=None, json=None, params=None, headers=None):
+    def forward_request(self, method, path=None, json=None, params=None, headers=None, cacheable=None):
         """Makes HTTP requests to the configured nodes.
 
            Retries connection errors
@@ -46,6 +98,24 @@ class Transport:
 
            Times out when `self.timeout` is expired, if not `None`.
 
+           If a :class:`~planetmint_driver.hedging.HedgingPolicy` is set and
+           there is more than one node, a ``GET`` request that is still
+           pending after :attr:`HedgingPolicy.delay
+           <planetmint_driver.hedging.HedgingPolicy.delay>` is sent to a
+           second node as well, and the first response wins. The attempts
+           run on a pool of :attr:`HedgingPolicy.max_workers
+           <planetmint_driver.hedging.HedgingPolicy.max_workers>` threads;
+           when all of them are busy, the request is sent from the calling
+           thread without being hedged, rather than queued.
+
+           If a cache is set, the responses of ``GET`` requests marked as
+           ``cacheable`` are served from, and stored in, the cache.
+
+           If ``coalesce`` is set, a ``GET`` request identical (same path,
+           parameters and headers) to one already in flight is not sent
+           again: it waits for the pending request and shares its result,
+           or its exception.
+
         Args:
             method (str): HTTP method name (e.g.: ``'GET'``).
             path (str): Path to be appended to the base url of a node. E.g.:
@@ -53,28 +123,99 @@ class Transport:
             json (dict): Payload to be sent with the HTTP request.
             params (dict)): Dictionary of URL (query) parameters.
             headers (dict): Optional headers to pass to the request.
+            cacheable (str): Either :attr:`~planetmint_driver.cache.IMMUTABLE`
+                or :attr:`~planetmint_driver.cache.MUTABLE` if the response
+                may be cached. Defaults to ``None``.
 
         Returns:
             dict: Result of :meth:`requests.models.Response.json`
 
         """
+        request = dict(method=method, path=path, json=json, params=params, headers=headers)
+        cache = self._should_cache(method, cacheable)
+        coalesce = self._should_coalesce(method)
+        if not (cache or coalesce):
+            return self._dispatch_request(request)
+
+        key = self._request_key(request)
+        if cache:
+            try:
+                return self.cache.get(key)
+            except KeyError:
+                pass
+        if coalesce:
+            data = self._single_flight.do(key, partial(self._dispatch_request, request))
+        else:
+            data = self._dispatch_request(request)
+        if cache:
+            self.cache.set(key, data, mutable=cacheable == MUTABLE)
+        return data
+
+    def stream_request(self, method, path=None, params=None, headers=None, key=None):
+        """Makes an HTTP request to one of the configured nodes and yields
+           the items of the JSON array in the response body as they are
+           received, without holding the whole body in memory.
+
+           Connection errors are retried, with the same backoff and timeout
+           as :meth:`forward_request`, until the response headers are
+           received. Once items have been yielded, a connection error is
+           raised to the caller. Streamed requests are neither hedged,
+           cached nor coalesced.
+
+        Args:
+            method (str): HTTP method name (e.g.: ``'GET'``).
+            path (str): Path to be appended to the base url of a node.
+            params (dict)): Dictionary of URL (query) parameters.
+            headers (dict): Optional headers to pass to the request.
+            key (str): Optional key of the array to stream, if the response
+                body is a JSON object (e.g. ``'transactions'`` for a block).
+
+        Yields:
+            The decoded items of the array.
+
+        """
+        request = dict(
+            method=method, path=path, json=None, params=params, headers=headers, stream=True, stream_key=key
+        )
+        yield from self._forward_request(request)
+
+    def _dispatch_request(self, request):
+        if self._should_hedge(request["method"]):
+            return self._forward_hedged_request(request)
+        return self._forward_request(request)
+
+    def _should_cache(self, method, cacheable):
+        return self.cache is not None and cacheable is not None and method == "GET"
+
+    def _should_coalesce(self, method):
+        return self._single_flight is not None and method == "GET"
+
+    @staticmethod
+    def _request_key(request):
+        def freeze(mapping):
+            if not mapping:
+                return ()
+            return tuple(
+                sorted((key, tuple(value) if isinstance(value, list) else value) for key, value in mapping.items())
+            )
+
+        return (request["method"], request["path"], freeze(request["params"]), freeze(request["headers"]))
+
+    def _should_hedge(self, method):
+        return self.hedging is not None and method == "GET" and len(self.connection_pool.connections) > 1
+
+    def _forward_request(self, request, exclude=(), tried=None):
         error_trace = []
         timeout = self.timeout
         backoff_cap = NO_TIMEOUT_BACKOFF_CAP if timeout is None else timeout / 2
         while timeout is None or timeout > 0:
-            connection = self.connection_pool.get_connection()
+            connection = self.connection_pool.get_connection(exclude=exclude)
+            if tried is not None:
+                tried.append(connection)
 
             start = time()
             try:
-                response = connection.request(
-                    method=method,
-                    path=path,
-                    params=params,
-                    json=json,
-                    headers=headers,
-                    timeout=timeout,
-                    backoff_cap=backoff_cap,
-                )
+                response = connection.request(timeout=timeout, backoff_cap=backoff_cap, **request)
             except ConnectionError as err:
                 error_trace.append(err)
                 continue
@@ -86,3 +227,62 @@ class Transport:
                     timeout -= elapsed
 
         raise TimeoutError(error_trace)
+
+    def _submit_hedged(self, request, **kwargs):
+        """Runs ``request`` on a hedging thread, if one is idle.
+
+        Returns:
+            :class:`~concurrent.futures.Future`: The pending result, or
+            ``None`` if all the hedging threads are busy.
+
+        """
+        if not self._hedging_slots.acquire(blocking=False):
+            return None
+
+        def run():
+            try:
+                return self._forward_request(request, **kwargs)
+            finally:
+                self._hedging_slots.release()
+
+        try:
+            return self._hedging_executor.submit(run)
+        except BaseException:
+            self._hedging_slots.release()
+            raise
+
+    def _forward_hedged_request(self, request):
+        # NOTE: a thread is claimed before the hedging delay starts, so that
+        # the time spent in the queue of a saturated executor neither delays
+        # the request nor triggers the hedge
+        tried = []
+        first = self._submit_hedged(request, tried=tried)
+        if first is None:
+            return self._forward_request(request)
+
+        started = {first: time()}
+        done, _ = wait(started, timeout=self.hedging.delay)
+        if not done:
+            hedge = self._submit_hedged(request, exclude=tuple(tried))
+            if hedge is not None:
+                started[hedge] = time()
+
+        error = None
+        pending = set(started)
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                exc = future.exception()
+                if exc is None or isinstance(exc, TransportError):
+                    # NOTE: an HTTP error is an answer of the node as well
+                    self.hedging.record(time() - started[future])
+                    return future.result()
+                error = error or exc
+        raise error
+
+    def close(self):
+        """Closes the HTTP sessions of all the connections in the pool."""
+        if self._hedging_executor is not None:
+            self._hedging_executor.shutdown(wait=False)
+        for connection in self.connection_pool.connections:
+            connection.close()
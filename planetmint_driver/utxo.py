@@ -0,0 +1,194 @@
+# Copyright Planetmint GmbH and Planetmint contributors
+# SPDX-License-Identifier: (Apache-2.0 AND CC-BY-4.0)
+# Code is Apache-2.0 and docs are CC-BY-4.0
+
+"""In-process index of the unspent outputs of a set of watched public
+keys, so that transfers can be prepared without querying the nodes.
+
+"""
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from threading import Lock
+
+UTXO = namedtuple("UTXO", ("transaction_id", "output_index", "amount", "asset_id", "public_keys", "input"))
+UTXO.__doc__ = """An unspent output.
+
+Attributes:
+    transaction_id (str): Id of the transaction holding the output.
+    output_index (int): Index of the output in the transaction.
+    amount (int): Amount of the output.
+    asset_id (str): Id of the asset of the output.
+    public_keys (list): Public keys owning the output.
+    input (dict): The input spending the output, as expected by
+        :func:`~planetmint_driver.offchain.prepare_transfer_transaction`.
+"""
+
+_MINTING_OPERATIONS = ("CREATE", "COMPOSE")
+
+
+def _asset_id(transaction):
+    if transaction["operation"] in _MINTING_OPERATIONS:
+        return transaction["id"]
+    for asset in transaction.get("assets") or ():
+        if "id" in asset:
+            return asset["id"]
+    return None
+
+
+def _make_utxo(transaction, output_index, asset_id):
+    output = transaction["outputs"][output_index]
+    input_ = {
+        "fulfillment": output["condition"]["details"],
+        "fulfills": {"output_index": output_index, "transaction_id": transaction["id"]},
+        "owners_before": output["public_keys"],
+    }
+    return UTXO(transaction["id"], output_index, int(output["amount"]), asset_id, output["public_keys"], input_)
+
+
+class UTXOIndex:
+    """Unspent outputs of the watched public keys.
+
+    The index is seeded once from the nodes with :meth:`seed`, and kept
+    current by applying the transactions that are committed afterwards,
+    e.g. from a :class:`~planetmint_driver.follow.BlockFollower`, or the
+    transactions submitted by the application itself. Applying a
+    transaction removes the outputs it spends and adds the outputs it
+    creates for the watched keys.
+
+    The unspent outputs of a key (and asset) are looked up in constant
+    time, in the order they were indexed, and their
+    :attr:`~planetmint_driver.utxo.UTXO.input` may be passed as is to
+    :func:`~planetmint_driver.offchain.prepare_transfer_transaction`.
+
+    Example:
+
+        >>> index = UTXOIndex([alice.public_key])
+        >>> index.seed(bdb)
+        >>> utxos = index.spendable(alice.public_key, asset_id)
+        >>> transfer = prepare_transfer_transaction(
+        ...     inputs=[utxo.input for utxo in utxos],
+        ...     recipients=[([bob.public_key], sum(utxo.amount for utxo in utxos))],
+        ...     assets=[asset_id],
+        ... )
+
+    """
+
+    def __init__(self, public_keys):
+        """Initializes a :class:`~planetmint_driver.utxo.UTXOIndex`
+        instance.
+
+        Args:
+            public_keys (iterable): The watched public keys.
+
+        """
+        self.public_keys = frozenset(public_keys)
+        self._utxos = {}
+        self._by_key = {}
+        self._by_asset = {}
+        self._lock = Lock()
+
+    def __len__(self):
+        return len(self._utxos)
+
+    def __contains__(self, outpoint):
+        """Whether ``(transaction_id, output_index)`` is unspent."""
+        return outpoint in self._utxos
+
+    def seed(self, driver, max_workers=8):
+        """Indexes the unspent outputs of the watched keys, as reported by
+        the nodes.
+
+        Each transaction holding an unspent output is retrieved once, with
+        up to ``max_workers`` requests in flight.
+
+        Args:
+            driver (:class:`~planetmint_driver.Planetmint`): The driver used
+                to query the nodes.
+            max_workers (int): Maximum number of concurrent requests.
+
+        """
+        txids = {}
+        for public_key in sorted(self.public_keys):
+            for output in driver.outputs.iter_get(public_key, spent=False):
+                txids.setdefault(output["transaction_id"], set()).add(output["output_index"])
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            transactions = executor.map(driver.transactions.retrieve, txids)
+            for transaction in transactions:
+                with self._lock:
+                    self._add_outputs(transaction, txids[transaction["id"]])
+
+    def apply_transaction(self, transaction):
+        """Updates the index with a committed (or submitted) transaction.
+
+        Args:
+            transaction (dict): The transaction.
+
+        """
+        with self._lock:
+            for input_ in transaction["inputs"]:
+                fulfills = input_["fulfills"]
+                if fulfills is not None:
+                    self._remove((fulfills["transaction_id"], fulfills["output_index"]))
+            self._add_outputs(transaction)
+
+    def apply_block(self, block):
+        """Updates the index with the transactions of a block.
+
+        Args:
+            block (dict): The block, as returned by
+                :meth:`~planetmint_driver.driver.BlocksEndpoint.retrieve`.
+
+        """
+        for transaction in block["transactions"]:
+            self.apply_transaction(transaction)
+
+    def spendable(self, public_key, asset_id=None):
+        """Returns the unspent outputs owned by ``public_key``.
+
+        Args:
+            public_key (str): A watched public key.
+            asset_id (str): Optional id of the asset of the outputs.
+
+        Returns:
+            :obj:`list` of :class:`~planetmint_driver.utxo.UTXO`: The
+            unspent outputs, oldest indexed first.
+
+        """
+        with self._lock:
+            if asset_id is None:
+                utxos = self._by_key.get(public_key, {})
+            else:
+                utxos = self._by_asset.get((public_key, asset_id), {})
+            return list(utxos.values())
+
+    def balance(self, public_key, asset_id):
+        """Returns the amount of ``asset_id`` spendable by ``public_key``."""
+        return sum(utxo.amount for utxo in self.spendable(public_key, asset_id))
+
+    def _add_outputs(self, transaction, output_indexes=None):
+        asset_id = _asset_id(transaction)
+        for output_index, output in enumerate(transaction["outputs"]):
+            if output_indexes is not None and output_index not in output_indexes:
+                continue
+            owners = self.public_keys.intersection(output["public_keys"])
+            outpoint = (transaction["id"], output_index)
+            if not owners or outpoint in self._utxos:
+                continue
+            utxo = _make_utxo(transaction, output_index, asset_id)
+            self._utxos[outpoint] = (utxo, owners)
+            for public_key in owners:
+                self._by_key.setdefault(public_key, {})[outpoint] = utxo
+                self._by_asset.setdefault((public_key, asset_id), {})[outpoint] = utxo
+
+    def _remove(self, outpoint):
+        try:
+            utxo, owners = self._utxos.pop(outpoint)
+        except KeyError:
+            return
+        for public_key in owners:
+            for index, key in ((self._by_key, public_key), (self._by_asset, (public_key, utxo.asset_id))):
+                utxos = index[key]
+                del utxos[outpoint]
+                if not utxos:
+                    del index[key]
@@ -3,9 +3,13 @@
 # Code is Apache-2.0 and docs are CC-BY-4.0
 
 import json
+import time
 from base64 import b64encode
 from collections import namedtuple
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 from os import environ, urandom
+from threading import Lock, Thread
+from urllib.parse import parse_qs, urlsplit
 
 import requests
 import base58
@@ -221,6 +225,90 @@ def blocks_api_full_url(api_root):
     return api_root + "/blocks"
 
 
+class StubNode:
+    """Minimal HTTP server standing in for a Planetmint node.
+
+    Routes are registered with :meth:`add` and every request received is
+    recorded in :attr:`requests` as ``(method, path, query, body)``.
+    """
+
+    def __init__(self):
+        self.routes = {}
+        self.requests = []
+        self._lock = Lock()
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), self._make_handler())
+        self.server.daemon_threads = True
+        self.url = "http://127.0.0.1:{}".format(self.server.server_port)
+        self._thread = Thread(target=self.server.serve_forever, daemon=True)
+        self._thread.start()
+
+    def add(self, method, path, json=None, *, status=200, delay=0, body=None):
+        """Registers a response. ``json`` may be a callable taking the
+        parsed query and request body and returning the payload.
+        """
+        self.routes[(method, path)] = (status, json, delay, body)
+
+    def count(self, method, path):
+        with self._lock:
+            return sum(1 for request in self.requests if request[:2] == (method, path))
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def _make_handler(self):
+        node = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def _handle(self):
+                parts = urlsplit(self.path)
+                length = int(self.headers.get("Content-Length") or 0)
+                request_body = self.rfile.read(length) if length else b""
+                query = parse_qs(parts.query)
+                with node._lock:
+                    node.requests.append((self.command, parts.path, query, request_body))
+                try:
+                    status, payload, delay, body = node.routes[(self.command, parts.path)]
+                except KeyError:
+                    status, payload, delay, body = 404, {"message": "Not found"}, 0, None
+                if delay:
+                    time.sleep(delay)
+                if callable(payload):
+                    payload = payload(query, request_body)
+                if body is None:
+                    body = json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            do_GET = do_POST = _handle
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+
+@fixture
+def make_stub_node():
+    nodes = []
+
+    def make():
+        nodes.append(StubNode())
+        return nodes[-1]
+
+    yield make
+    for node in nodes:
+        node.close()
+
+
+@fixture
+def stub_node(make_stub_node):
+    return make_stub_node()
+
+
 @fixture
 def mock_requests_post(monkeypatch):
     class MockResponse:
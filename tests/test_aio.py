@@ -0,0 +1,105 @@
+# Copyright Planetmint GmbH and Planetmint contributors
+# SPDX-License-Identifier: (Apache-2.0 AND CC-BY-4.0)
+# Code is Apache-2.0 and docs are CC-BY-4.0
+
+import asyncio
+
+import pytest
+
+pytest.importorskip("aiohttp")
+
+
+def test_encode_params():
+    from planetmint_driver.aio.connection import _encode_params
+
+    assert _encode_params(None) is None
+    assert _encode_params({"public_key": "pk", "spent": None, "limit": 0}) == [("public_key", "pk"), ("limit", "0")]
+    assert _encode_params({"asset_ids": ["a", "b"], "spent": True}) == [
+        ("asset_ids", "a"),
+        ("asset_ids", "b"),
+        ("spent", "True"),
+    ]
+
+
+def test_async_driver_endpoints(stub_node):
+    from planetmint_driver.aio import AsyncPlanetmint
+
+    stub_node.add("GET", "/api/v1/transactions/abc", {"id": "abc"})
+    stub_node.add("GET", "/api/v1/blocks/", [])
+    stub_node.add("GET", "/api/v1/outputs/", lambda query, body: [query["public_key"][0]])
+    stub_node.add("POST", "/api/v1/transactions/", lambda query, body: {"mode": query["mode"][0]})
+
+    async def main():
+        async with AsyncPlanetmint(stub_node.url) as bdb:
+            return await asyncio.gather(
+                bdb.transactions.retrieve("abc"),
+                bdb.blocks.get(txid="abc"),
+                bdb.outputs.get("pk", spent=False),
+                bdb.transactions.send_async({"id": "abc"}),
+            )
+
+    tx, blocks, outputs, sent = asyncio.run(main())
+    assert tx == {"id": "abc"}
+    assert blocks is None
+    assert outputs == ["pk"]
+    assert sent == {"mode": "async"}
+
+
+def test_async_http_errors(stub_node):
+    from planetmint_driver.aio import AsyncPlanetmint
+    from planetmint_driver.exceptions import NotFoundError
+
+    async def main():
+        async with AsyncPlanetmint(stub_node.url) as bdb:
+            await bdb.transactions.retrieve("missing")
+
+    with pytest.raises(NotFoundError) as exc:
+        asyncio.run(main())
+    assert exc.value.status_code == 404
+    assert exc.value.info == {"message": "Not found"}
+
+
+def test_async_transport_fails_over_and_backs_off(stub_node):
+    from planetmint_driver.aio import AsyncPlanetmint
+
+    stub_node.add("GET", "/api/v1/transactions/abc", {"id": "abc"})
+
+    async def main():
+        async with AsyncPlanetmint("http://127.0.0.1:1", stub_node.url) as bdb:
+            return bdb, await bdb.transactions.retrieve("abc")
+
+    bdb, tx = asyncio.run(main())
+    dead, alive = bdb.transport.connection_pool.connections
+    assert tx == {"id": "abc"}
+    assert dead.backoff_time is not None
+    assert alive.backoff_time is None
+
+
+def test_async_requests_wait_for_probe(stub_node):
+    from datetime import datetime, timedelta
+
+    from planetmint_driver.aio.connection import AsyncConnection
+    from planetmint_driver.connection import CLOSED
+
+    stub_node.add("GET", "/api/v1/", {}, delay=0.2)
+
+    async def main():
+        connection = AsyncConnection(node_url=stub_node.url)
+        connection.backoff_time = datetime.utcnow() - timedelta(seconds=1)
+        try:
+            probe = asyncio.ensure_future(connection.request("GET", path="/api/v1/", timeout=5))
+            await asyncio.sleep(0.05)
+            # a probe is in flight: the other requests wait for its outcome
+            others = [asyncio.ensure_future(connection.request("GET", path="/api/v1/", timeout=5)) for _ in range(3)]
+            await asyncio.sleep(0.05)
+            sent = stub_node.count("GET", "/api/v1/")
+            await asyncio.gather(probe, *others)
+            return connection, sent
+        finally:
+            await connection.close()
+
+    connection, sent = asyncio.run(main())
+    assert sent == 1
+    assert stub_node.count("GET", "/api/v1/") == 4
+    assert connection.state == CLOSED
+    assert connection.in_flight == 0
@@ -0,0 +1,162 @@
+# Copyright Planetmint GmbH and Planetmint contributors
+# SPDX-License-Identifier: (Apache-2.0 AND CC-BY-4.0)
+# Code is Apache-2.0 and docs are CC-BY-4.0
+
+import asyncio
+import json
+import random
+import time
+
+from threading import Lock
+
+import pytest
+
+
+class Recorder:
+    """Fake ``send`` recording how many calls are in flight."""
+
+    def __init__(self):
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._lock = Lock()
+
+    def enter(self):
+        with self._lock:
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+
+    def exit(self):
+        with self._lock:
+            self.in_flight -= 1
+
+    def send(self, transaction):
+        self.enter()
+        try:
+            time.sleep(random.uniform(0, 0.01))
+            if transaction % 5 == 0:
+                raise RuntimeError(transaction)
+            return {"id": transaction}
+        finally:
+            self.exit()
+
+
+def check_results(results, count):
+    assert [result.transaction for result in results] == list(range(count))
+    for result in results:
+        if result.transaction % 5 == 0:
+            assert result.response is None
+            assert isinstance(result.error, RuntimeError)
+        else:
+            assert result.response == {"id": result.transaction}
+            assert result.error is None
+
+
+def test_send_many_bounds_concurrency_and_keeps_order():
+    from planetmint_driver.bulk import send_many
+
+    recorder = Recorder()
+    results = send_many(recorder.send, iter(range(50)), concurrency=4)
+    check_results(results, 50)
+    assert 1 < recorder.max_in_flight <= 4
+
+
+def test_send_many_applies_backpressure():
+    from planetmint_driver.bulk import send_many
+
+    completed = []
+
+    def send(transaction):
+        time.sleep(0.005)
+        completed.append(transaction)
+
+    def produce():
+        for transaction in range(20):
+            assert transaction - len(completed) <= 3
+            yield transaction
+
+    results = send_many(send, produce(), concurrency=3)
+    assert len(results) == 20
+
+
+@pytest.mark.parametrize("concurrency", [0, -1])
+def test_send_many_invalid_concurrency(concurrency):
+    from planetmint_driver.bulk import send_many
+
+    with pytest.raises(ValueError):
+        send_many(lambda transaction: None, [], concurrency)
+
+
+def test_driver_send_many(stub_node):
+    from planetmint_driver import Planetmint
+
+    stub_node.add(
+        "POST",
+        "/api/v1/transactions/",
+        lambda query, body: {"id": json.loads(body)["id"], "mode": query["mode"][0]},
+        delay=0.02,
+    )
+    bdb = Planetmint(stub_node.url)
+    transactions = ({"id": str(i)} for i in range(20))
+
+    start = time.perf_counter()
+    results = bdb.transactions.send_many(transactions, mode="commit", concurrency=10)
+    elapsed = time.perf_counter() - start
+
+    assert [result.response for result in results] == [{"id": str(i), "mode": "commit"} for i in range(20)]
+    assert all(result.error is None for result in results)
+    assert elapsed < 20 * 0.02
+
+
+def test_driver_send_many_reports_errors(stub_node):
+    from planetmint_driver import Planetmint
+    from planetmint_driver.exceptions import BadRequest
+
+    stub_node.add("POST", "/api/v1/transactions/", {"message": "Invalid transaction"}, status=400)
+    results = Planetmint(stub_node.url).transactions.send_many([{"id": "a"}, {"id": "b"}])
+    assert [result.transaction for result in results] == [{"id": "a"}, {"id": "b"}]
+    assert all(isinstance(result.error, BadRequest) for result in results)
+
+
+def test_driver_send_many_invalid_mode():
+    from planetmint_driver import Planetmint
+
+    with pytest.raises(ValueError):
+        Planetmint().transactions.send_many([], mode="fast")
+
+
+def test_async_send_many():
+    from planetmint_driver.bulk import async_send_many
+
+    recorder = Recorder()
+
+    async def send(transaction):
+        recorder.enter()
+        try:
+            await asyncio.sleep(random.uniform(0, 0.01))
+            if transaction % 5 == 0:
+                raise RuntimeError(transaction)
+            return {"id": transaction}
+        finally:
+            recorder.exit()
+
+    async def produce():
+        for transaction in range(50):
+            yield transaction
+
+    check_results(asyncio.run(async_send_many(send, range(50), 4)), 50)
+    check_results(asyncio.run(async_send_many(send, produce(), 4)), 50)
+    assert 1 < recorder.max_in_flight <= 4
+
+
+def test_async_driver_send_many(stub_node):
+    pytest.importorskip("aiohttp")
+    from planetmint_driver.aio import AsyncPlanetmint
+
+    stub_node.add("POST", "/api/v1/transactions/", lambda query, body: json.loads(body))
+
+    async def main():
+        async with AsyncPlanetmint(stub_node.url) as bdb:
+            return await bdb.transactions.send_many([{"id": str(i)} for i in range(10)], mode="sync")
+
+    results = asyncio.run(main())
+    assert [result.response for result in results] == [{"id": str(i)} for i in range(10)]
@@ -0,0 +1,111 @@
+# Copyright Planetmint GmbH and Planetmint contributors
+# SPDX-License-Identifier: (Apache-2.0 AND CC-BY-4.0)
+# Code is Apache-2.0 and docs are CC-BY-4.0
+
+from pytest import raises
+
+from planetmint_driver.cache import LRUCache
+
+
+def test_lru_cache_evicts_least_recently_used():
+    cache = LRUCache(maxsize=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1
+    cache.set("c", 3)
+
+    assert len(cache) == 2
+    with raises(KeyError):
+        cache.get("b")
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+    assert (cache.hits, cache.misses) == (3, 1)
+
+    cache.clear()
+    assert len(cache) == 0
+    assert (cache.hits, cache.misses) == (0, 0)
+
+
+def test_lru_cache_mutable_entries(monkeypatch):
+    from planetmint_driver import cache as cache_module
+
+    cache = LRUCache()
+    cache.set("outputs", [1], mutable=True)
+    with raises(KeyError):
+        cache.get("outputs")
+
+    now = [100.0]
+    monkeypatch.setattr(cache_module, "monotonic", lambda: now[0])
+    cache = LRUCache(ttl=5)
+    cache.set("outputs", [1], mutable=True)
+    cache.set("tx", {"id": "a"})
+    now[0] += 4
+    assert cache.get("outputs") == [1]
+    now[0] += 1
+    with raises(KeyError):
+        cache.get("outputs")
+    assert cache.get("tx") == {"id": "a"}
+    assert len(cache) == 1
+
+
+def test_driver_caches_immutable_resources(stub_node):
+    from planetmint_driver import Planetmint
+
+    stub_node.add("GET", "/api/v1/transactions/abc", {"id": "abc"})
+    stub_node.add("GET", "/api/v1/blocks/1", {"height": 1})
+    stub_node.add("GET", "/api/v1/outputs/", [])
+    cache = LRUCache()
+    bdb = Planetmint(stub_node.url, cache=cache)
+
+    for _ in range(3):
+        assert bdb.transactions.retrieve("abc") == {"id": "abc"}
+        assert bdb.blocks.retrieve("1") == {"height": 1}
+        assert bdb.outputs.get("pk") == []
+
+    assert stub_node.count("GET", "/api/v1/transactions/abc") == 1
+    assert stub_node.count("GET", "/api/v1/blocks/1") == 1
+    # mutable responses are not cached without a ttl
+    assert stub_node.count("GET", "/api/v1/outputs/") == 3
+    assert cache.hits == 4
+
+
+def test_driver_caches_mutable_resources_with_ttl(stub_node):
+    from planetmint_driver import Planetmint
+
+    stub_node.add("GET", "/api/v1/outputs/", lambda query, body: query["public_key"])
+    bdb = Planetmint(stub_node.url, cache=LRUCache(ttl=60))
+
+    assert bdb.outputs.get("pk1", spent=False) == ["pk1"]
+    assert bdb.outputs.get("pk1", spent=False) == ["pk1"]
+    assert bdb.outputs.get("pk1", spent=True) == ["pk1"]
+    assert bdb.outputs.get("pk2", spent=False) == ["pk2"]
+    assert stub_node.count("GET", "/api/v1/outputs/") == 3
+
+
+def test_errors_are_not_cached(stub_node):
+    from planetmint_driver import Planetmint
+    from planetmint_driver.exceptions import NotFoundError
+
+    bdb = Planetmint(stub_node.url, cache=LRUCache())
+    for _ in range(2):
+        with raises(NotFoundError):
+            bdb.transactions.retrieve("missing")
+    assert stub_node.count("GET", "/api/v1/transactions/missing") == 2
+
+
+def test_custom_transport_without_cacheable(stub_node):
+    from planetmint_driver import Planetmint
+    from planetmint_driver.transport import Transport
+
+    class BaselineTransport(Transport):
+        def forward_request(self, method, path=None, json=None, params=None, headers=None):
+            return super().forward_request(method, path=path, json=json, params=params, headers=headers)
+
+    stub_node.add("GET", "/api/v1/transactions/abc", {"id": "abc"})
+    stub_node.add("GET", "/api/v1/blocks/", [1])
+    stub_node.add("GET", "/api/v1/outputs/", [])
+    bdb = Planetmint(stub_node.url, transport_class=BaselineTransport)
+
+    assert bdb.transactions.retrieve("abc") == {"id": "abc"}
+    assert bdb.blocks.get(txid="abc") == [1]
+    assert bdb.outputs.get("pk") == []
@@ -0,0 +1,64 @@
+# Copyright Planetmint GmbH and Planetmint contributors
+# SPDX-License-Identifier: (Apache-2.0 AND CC-BY-4.0)
+# Code is Apache-2.0 and docs are CC-BY-4.0
+
+import pytest
+from ipld import marshal, multihash
+
+from .conftest import hash_transaction, serialize_transaction
+
+
+@pytest.fixture
+def payload():
+    return {
+        "version": "3.0",
+        "operation": "TRANSFER",
+        "metadata": "bafyreie",
+        "assets": [{"id": "ab" * 32}],
+        "inputs": [{"fulfillment": "pGSAI", "fulfills": None, "owners_before": ["key"]}],
+        "outputs": [{"amount": "1", "note": "été ☃", "public_keys": ["key"]}],
+        "id": None,
+    }
+
+
+def test_dumps(payload):
+    from transactions.common.utils import serialize
+
+    from planetmint_driver.canonical import dumps
+
+    assert dumps(payload) == serialize(payload).encode() == serialize_transaction(payload).encode()
+
+
+def test_canonical_transaction(payload):
+    from planetmint_driver.canonical import CanonicalTransaction
+
+    canonical = CanonicalTransaction(dict(payload, id="f" * 64))
+    assert canonical.serialize() == serialize_transaction(dict(payload, id="f" * 64)).encode()
+    assert canonical.serialize(with_id=False) == serialize_transaction(payload).encode()
+    unsigned = dict(payload, inputs=[dict(payload["inputs"][0], fulfillment=None)])
+    assert canonical.serialize(with_id=False, with_signatures=False) == serialize_transaction(unsigned).encode()
+
+    signed_inputs = [dict(payload["inputs"][0], fulfillment="pGSAIsigned")]
+    canonical.set_inputs(signed_inputs)
+    signed = dict(payload, inputs=signed_inputs)
+    assert canonical.update_id() == hash_transaction(signed)
+    assert canonical.transaction["id"] == hash_transaction(signed)
+    assert canonical.to_raw_json() == serialize_transaction(dict(signed, id=hash_transaction(signed))).encode()
+
+
+def test_send_prepared_transaction(stub_node, alice_pubkey, alice_privkey, monkeypatch):
+    from planetmint_driver import Planetmint
+    from planetmint_driver.canonical import CanonicalTransaction
+    from planetmint_driver.offchain import PreparedTransaction
+
+    prepared = PreparedTransaction.create(signers=alice_pubkey, metadata=multihash(marshal({"msg": "hello"})))
+    prepared.sign(alice_privkey)
+    path = "/api/v1/transactions/"
+    stub_node.add("POST", path, prepared.to_dict(), status=202)
+    bdb = Planetmint(stub_node.url, validate_transactions=True)
+    # the canonical form built while signing is validated, not rebuilt
+    monkeypatch.setattr(CanonicalTransaction, "__init__", None)
+    assert bdb.transactions.send_commit(prepared) == prepared.to_dict()
+    # NOTE: the body is the serialization of the transaction computed while
+    # signing, sent as is
+    assert stub_node.requests[-1][3] == prepared.serialize()
@@ -0,0 +1,68 @@
+# Copyright Planetmint GmbH and Planetmint contributors
+# SPDX-License-Identifier: (Apache-2.0 AND CC-BY-4.0)
+# Code is Apache-2.0 and docs are CC-BY-4.0
+
+import json
+
+from pytest import mark, raises
+from responses import RequestsMock
+
+from planetmint_driver.codec import JSONCodec, RapidJSONCodec, StdlibJSONCodec
+
+
+@mark.parametrize("codec", (JSONCodec(), RapidJSONCodec(), StdlibJSONCodec()))
+def test_codec_round_trip(codec):
+    payload = {"id": "abc", "metadata": {"name": "Grüße", "amount": 10**20}, "outputs": [1, 2.5, None]}
+    data = codec.dumps(payload)
+    assert isinstance(data, bytes)
+    assert json.loads(data) == payload
+    assert codec.loads(data) == payload
+    with raises(ValueError):
+        codec.loads(b"not json")
+
+
+class CountingCodec(JSONCodec):
+    def __init__(self):
+        self.dumped = []
+        self.loaded = 0
+
+    def dumps(self, obj):
+        self.dumped.append(obj)
+        return super().dumps(obj)
+
+    def loads(self, data):
+        self.loaded += 1
+        return super().loads(data)
+
+
+def test_connection_uses_codec_once_per_body():
+    from planetmint_driver.connection import Connection
+
+    codec = CountingCodec()
+    connection = Connection(node_url="http://dummy", codec=codec)
+    with RequestsMock() as requests_mock:
+        requests_mock.add("POST", "http://dummy/transactions", json={"id": "abc"})
+        response = connection.request("POST", path="/transactions", json={"id": "abc"})
+        request = requests_mock.calls[0].request
+
+    assert response.data == {"id": "abc"}
+    assert codec.dumped == [{"id": "abc"}]
+    assert codec.loaded == 1
+    assert request.headers["Content-Type"] == "application/json"
+    assert json.loads(request.body) == {"id": "abc"}
+
+
+def test_connection_keeps_text_of_non_json_and_error_bodies():
+    from planetmint_driver.connection import Connection
+    from planetmint_driver.exceptions import BadRequest
+
+    connection = Connection(node_url="http://dummy")
+    with RequestsMock() as requests_mock:
+        requests_mock.add("GET", "http://dummy/text", body="plain")
+        requests_mock.add("POST", "http://dummy/bad", json={"message": "Invalid"}, status=400)
+        assert connection.request("GET", path="/text").data == "plain"
+        with raises(BadRequest) as exc:
+            connection.request("POST", path="/bad", json={})
+
+    assert exc.value.error == '{"message": "Invalid"}'
+    assert exc.value.info == {"message": "Invalid"}
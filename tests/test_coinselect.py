@@ -0,0 +1,133 @@
+# Copyright Planetmint GmbH and Planetmint contributors
+# SPDX-License-Identifier: (Apache-2.0 AND CC-BY-4.0)
+# Code is Apache-2.0 and docs are CC-BY-4.0
+
+import random
+
+from collections import namedtuple
+from itertools import combinations
+
+import pytest
+from ipld import marshal, multihash
+
+Coin = namedtuple("Coin", ("amount", "input"))
+
+
+def coins(*amounts):
+    return [Coin(amount, {"index": i}) for i, amount in enumerate(amounts)]
+
+
+def amounts(selection):
+    return [coin.amount for coin in selection.utxos]
+
+
+def test_largest_first():
+    from planetmint_driver.coinselect import select_coins
+
+    selection = select_coins(coins(1, 5, 3, 8, 2), 10)
+    assert amounts(selection) == [8, 5]
+    assert (selection.total, selection.change) == (13, 3)
+
+
+def test_oldest_first():
+    from planetmint_driver.coinselect import OLDEST_FIRST, select_coins
+
+    selection = select_coins(coins(1, 5, 3, 8, 2), 9, OLDEST_FIRST)
+    assert amounts(selection) == [1, 5, 3]
+    assert selection.change == 0
+
+
+def test_branch_and_bound_finds_exact_match():
+    from planetmint_driver.coinselect import BRANCH_AND_BOUND, select_coins
+
+    selection = select_coins(coins(7, 5, 4, 3, 20), 12, BRANCH_AND_BOUND)
+    assert sorted(amounts(selection)) == [5, 7]
+    assert selection.change == 0
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_branch_and_bound_matches_brute_force(seed):
+    from planetmint_driver.coinselect import BRANCH_AND_BOUND, select_coins
+
+    rng = random.Random(seed)
+    utxos = coins(*(rng.randint(1, 50) for _ in range(10)))
+    amount = rng.randint(1, sum(coin.amount for coin in utxos))
+    exact = any(
+        sum(coin.amount for coin in subset) == amount
+        for size in range(1, len(utxos) + 1)
+        for subset in combinations(utxos, size)
+    )
+    selection = select_coins(utxos, amount, BRANCH_AND_BOUND)
+    assert selection.total >= amount
+    assert (selection.change == 0) == exact
+
+
+def test_branch_and_bound_falls_back_to_largest_first():
+    from planetmint_driver.coinselect import BRANCH_AND_BOUND, select_coins
+
+    selection = select_coins(coins(10, 10, 10), 15, BRANCH_AND_BOUND)
+    assert amounts(selection) == [10, 10]
+    assert selection.change == 5
+
+
+def test_custom_strategy():
+    from planetmint_driver.coinselect import Selection, select_coins
+
+    selection = select_coins(coins(1, 2), 1, lambda utxos, amount: Selection(utxos[-1:], 2, 1))
+    assert amounts(selection) == [2]
+
+
+@pytest.mark.parametrize("strategy", ["largest-first", "oldest-first", "branch-and-bound"])
+def test_insufficient_funds(strategy):
+    from planetmint_driver.coinselect import select_coins
+    from planetmint_driver.exceptions import InsufficientFunds
+
+    with pytest.raises(InsufficientFunds) as exc:
+        select_coins(coins(1, 2), 4, strategy)
+    assert (exc.value.amount, exc.value.available) == (4, 3)
+
+
+@pytest.mark.parametrize("amount,strategy", [(0, "largest-first"), (1, "smallest-first")])
+def test_invalid_arguments(amount, strategy):
+    from planetmint_driver.coinselect import select_coins
+
+    with pytest.raises(ValueError):
+        select_coins(coins(1), amount, strategy)
+
+
+def test_prepare_transfer(alice_pubkey, alice_privkey, bob_pubkey):
+    from planetmint_driver.coinselect import prepare_transfer
+    from planetmint_driver.offchain import fulfill_transaction, prepare_create_transaction
+    from planetmint_driver.utxo import UTXOIndex
+
+    create_transaction = prepare_create_transaction(
+        signers=[alice_pubkey],
+        recipients=[([alice_pubkey], 4), ([alice_pubkey], 6), ([alice_pubkey], 1)],
+        assets=[{"data": multihash(marshal({"msg": "coins"}))}],
+    )
+    create_transaction = fulfill_transaction(create_transaction, private_keys=alice_privkey)
+    asset_id = create_transaction["id"]
+    index = UTXOIndex([alice_pubkey])
+    index.apply_transaction(create_transaction)
+
+    transfer = prepare_transfer(
+        index.spendable(alice_pubkey, asset_id),
+        [([bob_pubkey], 7)],
+        asset_id=asset_id,
+        change_public_key=alice_pubkey,
+    )
+    transfer = fulfill_transaction(transfer, private_keys=alice_privkey)
+    assert [input_["fulfills"]["output_index"] for input_ in transfer["inputs"]] == [1, 0]
+    assert [(output["public_keys"], output["amount"]) for output in transfer["outputs"]] == [
+        ([bob_pubkey], "7"),
+        ([alice_pubkey], "3"),
+    ]
+
+    exact = prepare_transfer(
+        index.spendable(alice_pubkey, asset_id),
+        [([bob_pubkey], 5)],
+        asset_id=asset_id,
+        change_public_key=alice_pubkey,
+        strategy="branch-and-bound",
+    )
+    assert len(exact["outputs"]) == 1
@@ -0,0 +1,119 @@
+# Copyright Planetmint GmbH and Planetmint contributors
+# SPDX-License-Identifier: (Apache-2.0 AND CC-BY-4.0)
+# Code is Apache-2.0 and docs are CC-BY-4.0
+
+import asyncio
+import json
+
+from threading import Timer
+
+import pytest
+
+
+def commit_later(node, txid, delay):
+    timer = Timer(delay, node.add, ("GET", "/api/v1/transactions/" + txid, {"id": txid, "committed": True}))
+    timer.start()
+    return timer
+
+
+def test_submit_resolves_once_committed(stub_node):
+    from planetmint_driver import Planetmint
+    from planetmint_driver.confirm import Confirmer
+
+    stub_node.add("POST", "/api/v1/transactions/", lambda query, body: json.loads(body))
+    bdb = Planetmint(stub_node.url)
+    bdb.confirmer = Confirmer(bdb, poll_interval=0.01, max_poll_interval=0.05, timeout=5)
+
+    commit_later(stub_node, "abc", 0.1)
+    future = bdb.transactions.submit({"id": "abc"}, mode="sync")
+    assert future.result(timeout=5) == {"id": "abc", "committed": True}
+    assert stub_node.requests[0][2] == {"mode": ["sync"]}
+    assert stub_node.count("GET", "/api/v1/transactions/abc") > 1
+    assert bdb.confirmer.pending == 0
+
+
+def test_submit_many_with_few_workers(stub_node):
+    from planetmint_driver import Planetmint
+    from planetmint_driver.confirm import Confirmer
+
+    stub_node.add("POST", "/api/v1/transactions/", lambda query, body: json.loads(body))
+    bdb = Planetmint(stub_node.url)
+    bdb.confirmer = Confirmer(bdb, poll_interval=0.01, max_poll_interval=0.05, batch_size=16, max_workers=2)
+
+    txids = [str(i) for i in range(100)]
+    for i, txid in enumerate(txids):
+        commit_later(stub_node, txid, 0.001 * i)
+    futures = [bdb.transactions.submit({"id": txid}) for txid in txids]
+    assert [future.result(timeout=10)["id"] for future in futures] == txids
+
+
+def test_confirmation_timeout(stub_node):
+    from planetmint_driver import Planetmint
+    from planetmint_driver.confirm import Confirmer
+    from planetmint_driver.exceptions import ConfirmationTimeout
+
+    confirmer = Confirmer(Planetmint(stub_node.url), poll_interval=0.01, timeout=5)
+    future = confirmer.track("missing", timeout=0.1)
+    with pytest.raises(ConfirmationTimeout) as exc:
+        future.result(timeout=5)
+    assert exc.value.txid == "missing"
+    assert stub_node.count("GET", "/api/v1/transactions/missing") > 1
+
+
+def test_track_is_idempotent_and_close_cancels(stub_node):
+    from planetmint_driver import Planetmint
+    from planetmint_driver.confirm import Confirmer
+
+    confirmer = Confirmer(Planetmint(stub_node.url), poll_interval=0.01)
+    future = confirmer.track("abc")
+    assert confirmer.track("abc") is future
+    assert confirmer.pending == 1
+    confirmer.close()
+    assert future.cancelled()
+    assert confirmer.pending == 0
+
+    # NOTE: the confirmer may be used again after being closed
+    commit_later(stub_node, "def", 0)
+    assert confirmer.track("def").result(timeout=5)["id"] == "def"
+
+
+def test_unexpected_errors_fail_the_future(stub_node):
+    from planetmint_driver import Planetmint
+    from planetmint_driver.confirm import Confirmer
+
+    bdb = Planetmint(stub_node.url)
+    bdb.transactions.retrieve = lambda txid: 1 / 0
+    confirmer = Confirmer(bdb, poll_interval=0.01)
+    with pytest.raises(ZeroDivisionError):
+        confirmer.track("abc").result(timeout=5)
+
+
+def test_submit_rejects_commit_mode():
+    from planetmint_driver import Planetmint
+
+    with pytest.raises(ValueError):
+        Planetmint().transactions.submit({"id": "abc"}, mode="commit")
+
+
+def test_async_submit(stub_node):
+    pytest.importorskip("aiohttp")
+    from planetmint_driver.aio import AsyncPlanetmint
+    from planetmint_driver.confirm import AsyncConfirmer
+    from planetmint_driver.exceptions import ConfirmationTimeout
+
+    stub_node.add("POST", "/api/v1/transactions/", lambda query, body: json.loads(body))
+    commit_later(stub_node, "abc", 0.1)
+
+    async def main():
+        async with AsyncPlanetmint(stub_node.url) as bdb:
+            bdb.confirmer = AsyncConfirmer(bdb, poll_interval=0.01, max_poll_interval=0.05)
+            committed = await (await bdb.transactions.submit({"id": "abc"}))
+            missing = await bdb.transactions.submit({"id": "missing"}, timeout=0.1)
+            with pytest.raises(ConfirmationTimeout):
+                await missing
+            pending = await bdb.transactions.submit({"id": "pending"})
+        return committed, pending
+
+    committed, pending = asyncio.run(main())
+    assert committed == {"id": "abc", "committed": True}
+    assert pending.cancelled()
@@ -2,6 +2,8 @@
 # SPDX-License-Identifier: (Apache-2.0 AND CC-BY-4.0)
 # Code is Apache-2.0 and docs are CC-BY-4.0
 
+import pytest
+
 from pytest import mark
 from requests.utils import default_headers
 from responses import RequestsMock
@@ -48,3 +50,154 @@ class TestConnection:
         assert response.status_code == 200
         del response.headers["Content-type"]
         assert response.headers == headers
+
+    def test_record_request(self):
+        from planetmint_driver.connection import EWMA_WEIGHT, Connection
+
+        connection = Connection(node_url=self.url)
+        assert connection.latency is None
+        assert connection.error_rate == 0
+
+        connection.record_request(1.0, success=True)
+        assert connection.latency == 1.0
+        connection.record_request(2.0, success=True)
+        assert connection.latency == 1.0 + EWMA_WEIGHT
+        connection.record_request(10.0, success=False)
+        assert connection.latency == 1.0 + EWMA_WEIGHT
+        assert connection.error_rate == EWMA_WEIGHT
+
+    def test_request_updates_latency(self):
+        from planetmint_driver.connection import Connection
+
+        connection = Connection(node_url=self.url)
+        with RequestsMock() as requests_mock:
+            requests_mock.add("GET", self.url, json={})
+            connection.request("GET")
+        assert connection.latency is not None
+        assert connection.error_rate == 0
+
+    def test_in_flight_counter(self):
+        from planetmint_driver.connection import Connection
+
+        connection = Connection(node_url=self.url)
+        seen = []
+
+        def callback(request):
+            seen.append(connection.in_flight)
+            return (200, {}, "{}")
+
+        with RequestsMock() as requests_mock:
+            requests_mock.add_callback("GET", self.url, callback=callback)
+            connection.request("GET")
+        assert seen == [1]
+        assert connection.in_flight == 0
+
+    def test_sessions_are_per_thread(self):
+        from threading import Thread
+
+        from planetmint_driver.connection import Connection
+
+        connection = Connection(node_url=self.url, headers={"app_id": "id"})
+        sessions = []
+        threads = [Thread(target=lambda: sessions.append(connection.session)) for _ in range(3)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert connection.session is connection.session
+        assert len({id(session) for session in sessions + [connection.session]}) == 4
+        assert all(session.headers["app_id"] == "id" for session in sessions)
+
+        connection.close()
+        assert connection._sessions == []
+
+    def test_concurrent_backoff_updates(self):
+        from concurrent.futures import ThreadPoolExecutor
+
+        from planetmint_driver.connection import Connection
+
+        connection = Connection(node_url=self.url)
+
+        def fail(_):
+            for _ in range(200):
+                connection.update_backoff_time(success=False, backoff_cap=1)
+                connection.record_request(0.1, success=False)
+
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            list(executor.map(fail, range(8)))
+        assert connection._retries == 1600
+        assert connection.backoff_time is not None
+
+    def test_circuit_breaker_states(self):
+        from datetime import datetime, timedelta
+
+        from requests.exceptions import ConnectionError
+
+        from planetmint_driver.connection import CLOSED, HALF_OPEN, OPEN, Connection
+
+        connection = Connection(node_url=self.url)
+        assert connection.state == CLOSED
+        assert connection.available
+
+        with RequestsMock() as requests_mock:
+            requests_mock.add("GET", self.url, body=ConnectionError())
+            with pytest.raises(ConnectionError):
+                connection.request("GET")
+        assert connection.state == OPEN
+        assert not connection.available
+
+        connection.backoff_time = datetime.utcnow() - timedelta(seconds=1)
+        assert connection.state == HALF_OPEN
+        assert connection.available
+
+        availability = []
+
+        def probe(request):
+            availability.append(connection.available)
+            return (200, {}, "{}")
+
+        with RequestsMock() as requests_mock:
+            requests_mock.add_callback("GET", self.url, callback=probe)
+            connection.request("GET")
+        # only one probe at a time while half-open
+        assert availability == [False]
+        assert connection.state == CLOSED
+        assert connection.available
+
+    def test_concurrent_requests_wait_for_probe(self):
+        from datetime import datetime, timedelta
+        from threading import Barrier, Lock, Thread
+        from time import sleep
+
+        from planetmint_driver.connection import CLOSED, Connection
+
+        connection = Connection(node_url=self.url)
+        connection.backoff_time = datetime.utcnow() - timedelta(seconds=1)
+        lock = Lock()
+        states = []
+
+        def respond(request):
+            with lock:
+                states.append(connection.state)
+            sleep(0.05)
+            return (200, {}, "{}")
+
+        barrier = Barrier(5)
+
+        def send():
+            barrier.wait()
+            connection.request("GET", timeout=5)
+
+        with RequestsMock() as requests_mock:
+            requests_mock.add_callback("GET", self.url, callback=respond)
+            threads = [Thread(target=send) for _ in range(5)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        # a single probe is sent while half-open, the others once it succeeded
+        assert states.count(CLOSED) == 4
+        assert len(states) == 5
+        assert connection.in_flight == 0
+        assert connection.available
@@ -2,6 +2,9 @@
 # SPDX-License-Identifier: (Apache-2.0 AND CC-BY-4.0)
 # Code is Apache-2.0 and docs are CC-BY-4.0
 
+import base58
+from pytest import mark, raises
+
 
 def test_generate_keypair():
     from planetmint_driver.crypto import CryptoKeypair, generate_keypair
@@ -11,3 +14,92 @@ def test_generate_keypair():
     assert isinstance(keypair, CryptoKeypair)
     assert isinstance(keypair.private_key, str)
     assert isinstance(keypair.public_key, str)
+
+
+def test_keyring(alice_privkey, alice_pubkey, bob_pubkey):
+    import pickle
+
+    from planetmint_cryptoconditions.crypto import Ed25519VerifyingKey
+
+    from planetmint_driver.crypto import Keyring
+
+    keyring = Keyring(alice_privkey)
+    assert len(keyring) == 1
+    assert alice_pubkey in keyring
+    assert bob_pubkey not in keyring
+    assert keyring.public_keys == [alice_pubkey]
+    assert list(keyring.private_keys()) == [alice_privkey]
+
+    signature = keyring.sign(alice_pubkey, b"message")
+    assert Ed25519VerifyingKey(alice_pubkey).verify(b"message", signature, encoding="bytes")
+
+    unpickled = pickle.loads(pickle.dumps(keyring))
+    assert unpickled.public_keys == [alice_pubkey]
+
+
+def test_keyring_from_keypairs():
+    from planetmint_driver.crypto import Keyring, generate_keypair
+
+    keypairs = [generate_keypair() for _ in range(3)]
+    keyring = Keyring.from_keypairs(keypairs)
+    assert keyring.public_keys == [keypair.public_key for keypair in keypairs]
+
+
+def test_keyring_invalid_private_key():
+    from planetmint_driver.crypto import Keyring
+    from planetmint_driver.exceptions import InvalidPrivateKey
+
+    with raises(InvalidPrivateKey):
+        Keyring(["not a key"])
+
+
+def test_generate_keypairs():
+    from planetmint_driver.crypto import CryptoKeypair, generate_keypair, generate_keypairs
+
+    keypairs = generate_keypairs(3)
+    assert len(keypairs) == 3
+    assert len(set(keypairs)) == 3
+    for keypair in keypairs:
+        assert isinstance(keypair, CryptoKeypair)
+        assert generate_keypair(base58.b58decode(keypair.private_key)) == keypair
+
+
+def test_derive_keypair():
+    from planetmint_driver.crypto import derive_keypair
+
+    # NOTE: test vector 1 of SLIP-0010 for Ed25519, chain m/0'
+    master_seed = bytes.fromhex("000102030405060708090a0b0c0d0e0f")
+    keypair = derive_keypair(master_seed, 0)
+    assert base58.b58decode(keypair.private_key).hex() == (
+        "68e0fe46dfb67e368c75379acec591dad19df3cde26e63b93a8e704f1dade7a3"
+    )
+    assert base58.b58decode(keypair.public_key).hex() == (
+        "8c8a13df77a28f3445213a0f432fde644acaa215fc72dcdf300d5efaa85d350c"
+    )
+    assert derive_keypair(master_seed, 1) != keypair
+    assert derive_keypair(bytes(16), 0) != keypair
+
+
+@mark.parametrize("master_seed,index", ((bytes(15), 0), (bytes(65), 0), (bytes(32), -1), (bytes(32), 2**31)))
+def test_derive_keypair_invalid(master_seed, index):
+    from planetmint_driver.crypto import derive_keypair
+
+    with raises(ValueError):
+        derive_keypair(master_seed, index)
+
+
+def test_key_chain():
+    from planetmint_driver.crypto import KeyChain, derive_keypair
+
+    master_seed = bytes(range(32))
+    chain = KeyChain(master_seed, cache_size=2)
+    first, second = derive_keypair(master_seed, 0), derive_keypair(master_seed, 1)
+    assert chain.keypairs([0, 1, 0]) == [first, second, first]
+    assert (chain.cache.hits, chain.cache.misses) == (1, 2)
+    chain.keypair(2)
+    # NOTE: 1 is the least recently used key pair
+    chain.keypair(1)
+    assert (chain.cache.hits, chain.cache.misses) == (1, 4)
+
+    keyring = chain.keyring(range(3))
+    assert keyring.public_keys == [keypair.public_key for keypair in chain.keypairs(range(3))]
@@ -0,0 +1,169 @@
+# Copyright Planetmint GmbH and Planetmint contributors
+# SPDX-License-Identifier: (Apache-2.0 AND CC-BY-4.0)
+# Code is Apache-2.0 and docs are CC-BY-4.0
+
+import asyncio
+import time
+
+from threading import Lock
+
+import pytest
+from ipld import marshal, multihash
+
+
+class FakeTransactions:
+    """Fake transactions endpoint committing after a delay, and failing
+    the transactions of ``failing``.
+    """
+
+    def __init__(self, failing=()):
+        self.failing = set(failing)
+        self.committed = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._lock = Lock()
+
+    def _enter(self):
+        with self._lock:
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+
+    def _exit(self, transaction):
+        with self._lock:
+            self.in_flight -= 1
+            if transaction["id"] in self.failing:
+                raise RuntimeError(transaction["id"])
+            self.committed.append(transaction["id"])
+            return {"id": transaction["id"]}
+
+    def send_commit(self, transaction, headers=None):
+        self._enter()
+        time.sleep(0.01)
+        return self._exit(transaction)
+
+
+class AsyncFakeTransactions(FakeTransactions):
+    async def send_commit(self, transaction, headers=None):
+        self._enter()
+        await asyncio.sleep(0.01)
+        return self._exit(transaction)
+
+
+class FakeDriver:
+    def __init__(self, transactions):
+        self.transactions = transactions
+
+
+@pytest.fixture
+def graph(alice_privkey, bob_privkey):
+    from planetmint_driver.dag import TransactionGraph
+
+    return TransactionGraph([alice_privkey, bob_privkey])
+
+
+def build_chains(graph, alice_pubkey, bob_pubkey, n_chains=3):
+    chains = []
+    for index in range(n_chains):
+        create = graph.create(signers=alice_pubkey, assets=[{"data": multihash(marshal({"index": index}))}])
+        to_bob = graph.transfer([(create, 0)], bob_pubkey)
+        to_alice = graph.transfer([(to_bob, 0)], alice_pubkey)
+        chains.append((create, to_bob, to_alice))
+    return chains
+
+
+def check_order(graph, committed):
+    position = {txid: index for index, txid in enumerate(committed)}
+    for transaction in graph:
+        for input_ in transaction["inputs"]:
+            if input_["fulfills"] is not None:
+                assert position[input_["fulfills"]["transaction_id"]] < position[transaction["id"]]
+
+
+def test_build_chain(graph, alice_pubkey, bob_pubkey):
+    from planetmint_driver.validation import validate_transaction
+
+    ((create, to_bob, to_alice),) = build_chains(graph, alice_pubkey, bob_pubkey, n_chains=1)
+    assert list(graph) == [create, to_bob, to_alice]
+    for transaction in graph:
+        validate_transaction(transaction)
+    assert to_bob["inputs"][0]["fulfills"] == {"output_index": 0, "transaction_id": create["id"]}
+    assert to_alice["inputs"][0]["owners_before"] == [bob_pubkey]
+    assert to_bob["assets"] == to_alice["assets"] == [{"id": create["id"]}]
+
+
+def test_transfer_double_spend(graph, alice_pubkey, bob_pubkey):
+    ((create, to_bob, _),) = build_chains(graph, alice_pubkey, bob_pubkey, n_chains=1)
+    with pytest.raises(ValueError):
+        graph.transfer([(create, 0)], bob_pubkey)
+    with pytest.raises(ValueError):
+        graph.transfer([(to_bob, 0), (to_bob, 0)], bob_pubkey)
+
+
+def test_failed_transfer_can_be_retried(alice_pubkey, alice_privkey, bob_pubkey, bob_privkey):
+    from planetmint_driver.dag import TransactionGraph
+    from planetmint_driver.exceptions import MissingPrivateKeyError
+
+    graph = TransactionGraph(alice_privkey)
+    create = graph.create(signers=alice_pubkey, recipients=bob_pubkey)
+    with pytest.raises(MissingPrivateKeyError):
+        graph.transfer([(create, 0)], alice_pubkey)
+    assert list(graph) == [create]
+
+    graph.keyring.add(bob_privkey)
+    transfer = graph.transfer([(create, 0)], alice_pubkey)
+    assert list(graph) == [create, transfer]
+
+
+def test_transfer_utxo(graph, alice_pubkey, bob_pubkey):
+    from planetmint_driver.utxo import UTXOIndex
+
+    create = graph.create(signers=alice_pubkey)
+    index = UTXOIndex([alice_pubkey])
+    index.apply_transaction(create)
+    transfer = graph.transfer(index.spendable(alice_pubkey), bob_pubkey)
+    assert transfer["inputs"][0]["fulfills"]["transaction_id"] == create["id"]
+
+
+def test_submit_in_dependency_order(graph, alice_pubkey, bob_pubkey):
+    build_chains(graph, alice_pubkey, bob_pubkey)
+    transactions = FakeTransactions()
+    results = graph.submit(FakeDriver(transactions), concurrency=4)
+    assert [result.transaction for result in results] == list(graph)
+    assert all(result.error is None for result in results)
+    assert sorted(transactions.committed) == sorted(transaction["id"] for transaction in graph)
+    check_order(graph, transactions.committed)
+    # NOTE: the independent chains are sent in parallel
+    assert transactions.max_in_flight == 3
+
+
+def test_submit_skips_descendants_of_failures(graph, alice_pubkey, bob_pubkey):
+    from planetmint_driver.exceptions import DependencyFailed
+
+    (first, second) = build_chains(graph, alice_pubkey, bob_pubkey, n_chains=2)
+    transactions = FakeTransactions(failing=[first[1]["id"]])
+    results = {result.transaction["id"]: result for result in graph.submit(FakeDriver(transactions))}
+    assert results[first[0]["id"]].response == {"id": first[0]["id"]}
+    assert isinstance(results[first[1]["id"]].error, RuntimeError)
+    error = results[first[2]["id"]].error
+    assert isinstance(error, DependencyFailed)
+    assert error.txid == first[1]["id"]
+    assert set(transactions.committed) == {first[0]["id"]} | {transaction["id"] for transaction in second}
+
+
+def test_async_submit(graph, alice_pubkey, bob_pubkey):
+    build_chains(graph, alice_pubkey, bob_pubkey)
+    transactions = AsyncFakeTransactions()
+    results = asyncio.run(graph.async_submit(FakeDriver(transactions), concurrency=2))
+    assert [result.response for result in results] == [{"id": transaction["id"]} for transaction in graph]
+    check_order(graph, transactions.committed)
+    assert transactions.max_in_flight == 2
+
+
+def test_submit_to_node(stub_node, graph, alice_pubkey, bob_pubkey):
+    from planetmint_driver import Planetmint
+
+    build_chains(graph, alice_pubkey, bob_pubkey, n_chains=1)
+    stub_node.add("POST", "/api/v1/transactions/", {}, status=202)
+    results = graph.submit(Planetmint(stub_node.url))
+    assert all(result.error is None for result in results)
+    assert stub_node.count("POST", "/api/v1/transactions/") == 3
@@ -0,0 +1,133 @@
+# Copyright Planetmint GmbH and Planetmint contributors
+# SPDX-License-Identifier: (Apache-2.0 AND CC-BY-4.0)
+# Code is Apache-2.0 and docs are CC-BY-4.0
+
+from threading import Timer
+
+import pytest
+
+
+def add_blocks(node, start, stop, delay=0):
+    for height in range(start, stop):
+        node.add("GET", "/api/v1/blocks/{}".format(height), {"height": height, "transactions": []}, delay=delay)
+
+
+def test_follow_yields_blocks_in_order(stub_node):
+    from planetmint_driver import Planetmint
+
+    add_blocks(stub_node, 1, 21)
+    # NOTE: a slow block must not be overtaken by the prefetched ones
+    stub_node.add("GET", "/api/v1/blocks/3", {"height": 3, "transactions": []}, delay=0.1)
+    blocks = list(Planetmint(stub_node.url).blocks.follow(1, stop=20, window=4))
+    assert [block["height"] for block in blocks] == list(range(1, 21))
+
+
+def test_follow_prefetches_in_parallel(stub_node):
+    import time
+
+    from planetmint_driver import Planetmint
+
+    add_blocks(stub_node, 1, 9, delay=0.05)
+    start = time.perf_counter()
+    blocks = list(Planetmint(stub_node.url).blocks.follow(1, stop=8, window=8))
+    assert len(blocks) == 8
+    assert time.perf_counter() - start < 8 * 0.05
+
+
+def test_follow_waits_at_the_tip(stub_node):
+    from planetmint_driver import Planetmint
+
+    add_blocks(stub_node, 1, 3)
+    Timer(0.1, add_blocks, (stub_node, 3, 5)).start()
+    follower = Planetmint(stub_node.url).blocks.follow(1, window=4, poll_interval=0.02)
+    iterator = iter(follower)
+    heights = [next(iterator)["height"] for _ in range(4)]
+    iterator.close()
+    assert heights == [1, 2, 3, 4]
+    # NOTE: at the tip only the next height is polled, the heights beyond
+    # it are only requested by the windows prefetched for heights 3 and 4
+    assert stub_node.count("GET", "/api/v1/blocks/3") > 2
+    assert stub_node.count("GET", "/api/v1/blocks/6") <= 2
+
+
+def test_follow_resumes_from_checkpoint(stub_node, tmp_path):
+    from planetmint_driver import Planetmint
+    from planetmint_driver.follow import FileCheckpoint
+
+    add_blocks(stub_node, 1, 11)
+    bdb = Planetmint(stub_node.url)
+    checkpoint = FileCheckpoint(tmp_path / "checkpoint")
+    assert checkpoint.load() is None
+
+    for block in bdb.blocks.follow(1, stop=10, checkpoint=checkpoint):
+        if block["height"] == 5:
+            break
+    # NOTE: block 5 was not fully processed, so it is yielded again
+    assert checkpoint.load() == 4
+    assert not (tmp_path / "checkpoint.tmp").exists()
+
+    follower = bdb.blocks.follow(1, stop=10, checkpoint=FileCheckpoint(tmp_path / "checkpoint"))
+    assert [block["height"] for block in follower] == list(range(5, 11))
+    assert checkpoint.load() == 10
+    assert follower.next_height() == 11
+
+
+def test_follow_raises_other_errors(stub_node):
+    from planetmint_driver import Planetmint
+    from planetmint_driver.exceptions import BadRequest
+
+    stub_node.add("GET", "/api/v1/blocks/1", {"message": "Bad"}, status=400)
+    with pytest.raises(BadRequest):
+        list(Planetmint(stub_node.url).blocks.follow(1, stop=1))
+
+
+def test_follow_invalid_window():
+    from planetmint_driver import Planetmint
+
+    with pytest.raises(ValueError):
+        Planetmint().blocks.follow(1, window=0)
+
+
+def test_async_follow(stub_node, tmp_path):
+    import asyncio
+
+    pytest.importorskip("aiohttp")
+    from planetmint_driver.aio import AsyncPlanetmint
+    from planetmint_driver.follow import AsyncBlockFollower, FileCheckpoint
+
+    add_blocks(stub_node, 1, 11)
+    # NOTE: a slow block must not be overtaken by the prefetched ones
+    stub_node.add("GET", "/api/v1/blocks/3", {"height": 3, "transactions": []}, delay=0.1)
+
+    async def main():
+        async with AsyncPlanetmint(stub_node.url) as bdb:
+            follower = bdb.blocks.follow(1, stop=10, window=4, checkpoint=FileCheckpoint(tmp_path / "checkpoint"))
+            assert isinstance(follower, AsyncBlockFollower)
+            with pytest.raises(TypeError):
+                iter(follower)
+            return [block["height"] async for block in follower]
+
+    assert asyncio.run(main()) == list(range(1, 11))
+    assert FileCheckpoint(tmp_path / "checkpoint").load() == 10
+
+
+def test_async_follow_waits_at_the_tip(stub_node):
+    import asyncio
+
+    pytest.importorskip("aiohttp")
+    from planetmint_driver.aio import AsyncPlanetmint
+
+    add_blocks(stub_node, 1, 3)
+    Timer(0.1, add_blocks, (stub_node, 3, 5)).start()
+
+    async def main():
+        async with AsyncPlanetmint(stub_node.url) as bdb:
+            heights = []
+            async for block in bdb.blocks.follow(1, window=4, poll_interval=0.02):
+                heights.append(block["height"])
+                if len(heights) == 4:
+                    break
+            return heights
+
+    assert asyncio.run(main()) == [1, 2, 3, 4]
+    assert stub_node.count("GET", "/api/v1/blocks/3") > 2
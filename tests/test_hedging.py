@@ -0,0 +1,131 @@
+# Copyright Planetmint GmbH and Planetmint contributors
+# SPDX-License-Identifier: (Apache-2.0 AND CC-BY-4.0)
+# Code is Apache-2.0 and docs are CC-BY-4.0
+
+import asyncio
+from time import time
+
+from pytest import importorskip, mark, raises
+
+from planetmint_driver.exceptions import NotFoundError
+from planetmint_driver.hedging import HedgingPolicy
+from planetmint_driver.transport import Transport
+from planetmint_driver.utils import normalize_nodes
+
+
+def test_policy_delay():
+    policy = HedgingPolicy(percentile=90, min_delay=0.01, max_delay=1, initial_delay=0.3, min_samples=10)
+    assert policy.delay == 0.3
+
+    for latency in range(1, 11):
+        policy.record(latency / 100)
+    assert policy.delay == 0.1
+
+    for _ in range(64):
+        policy.record(5)
+    assert policy.delay == 1
+
+    for _ in range(1000):
+        policy.record(0)
+    assert policy.delay == 0.01
+
+
+def test_policy_rejects_invalid_percentile():
+    with raises(ValueError):
+        HedgingPolicy(percentile=0)
+
+
+@mark.parametrize("path,status", (("/slow", 200), ("/missing", 404)))
+def test_hedged_get_is_answered_by_second_node(make_stub_node, path, status):
+    slow_node, fast_node = make_stub_node(), make_stub_node()
+    slow_node.add("GET", path, {"node": "slow"}, status=status, delay=1)
+    fast_node.add("GET", path, {"node": "fast"}, status=status)
+
+    policy = HedgingPolicy(initial_delay=0.05)
+    transport = Transport(*normalize_nodes(slow_node.url, fast_node.url), hedging=policy)
+
+    start = time()
+    if status == 200:
+        assert transport.forward_request("GET", path=path) == {"node": "fast"}
+    else:
+        with raises(NotFoundError):
+            transport.forward_request("GET", path=path)
+    assert time() - start < 0.8
+    assert fast_node.count("GET", path) == 1
+    transport.close()
+
+
+def test_fast_get_is_not_hedged(make_stub_node):
+    first_node, second_node = make_stub_node(), make_stub_node()
+    first_node.add("GET", "/fast", {"node": "first"})
+
+    policy = HedgingPolicy(initial_delay=1)
+    transport = Transport(*normalize_nodes(first_node.url, second_node.url), hedging=policy)
+
+    assert transport.forward_request("GET", path="/fast") == {"node": "first"}
+    assert second_node.requests == []
+    assert len(policy._samples) == 1
+    transport.close()
+
+
+def test_post_is_not_hedged(make_stub_node):
+    slow_node, fast_node = make_stub_node(), make_stub_node()
+    slow_node.add("POST", "/tx", {"node": "slow"}, delay=0.2)
+
+    transport = Transport(*normalize_nodes(slow_node.url, fast_node.url), hedging=HedgingPolicy(initial_delay=0.01))
+
+    assert transport.forward_request("POST", path="/tx", json={}) == {"node": "slow"}
+    assert fast_node.requests == []
+    transport.close()
+
+
+def test_async_hedged_get(make_stub_node):
+    importorskip("aiohttp")
+    from planetmint_driver.aio.transport import AsyncTransport
+
+    slow_node, fast_node = make_stub_node(), make_stub_node()
+    slow_node.add("GET", "/slow", {"node": "slow"}, delay=1)
+    fast_node.add("GET", "/slow", {"node": "fast"})
+
+    async def main():
+        transport = AsyncTransport(
+            *normalize_nodes(slow_node.url, fast_node.url),
+            hedging=HedgingPolicy(initial_delay=0.05),
+        )
+        try:
+            return await transport.forward_request("GET", path="/slow")
+        finally:
+            await transport.close()
+
+    start = time()
+    assert asyncio.run(main()) == {"node": "fast"}
+    assert time() - start < 0.8
+
+
+def test_saturated_hedging_runs_on_calling_thread(make_stub_node):
+    from threading import Thread
+
+    slow_node, fast_node = make_stub_node(), make_stub_node()
+    slow_node.add("GET", "/slow", {"node": "slow"}, delay=0.3)
+    fast_node.add("GET", "/slow", {"node": "fast"}, delay=0.3)
+
+    policy = HedgingPolicy(initial_delay=0.05, max_workers=1)
+    transport = Transport(*normalize_nodes(slow_node.url, fast_node.url), hedging=policy)
+
+    elapsed = []
+
+    def send():
+        start = time()
+        transport.forward_request("GET", path="/slow")
+        elapsed.append(time() - start)
+
+    threads = [Thread(target=send) for _ in range(2)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    # neither request waited for the busy thread, nor was hedged
+    assert len(elapsed) == 2
+    assert max(elapsed) < 0.5
+    assert fast_node.requests == []
+    transport.close()
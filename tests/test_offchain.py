@@ -15,6 +15,8 @@ from transactions.common.transaction import (
     TransactionLink,
 )
 
+from .conftest import hash_transaction
+
 
 @mark.parametrize(
     "operation,function,return_value",
@@ -249,3 +251,243 @@ def test_transaction_fulfill_with_signingning_delegation(
     )
 
     assert fulfilled_transaction == fulfilled_transaction_with_delegation
+
+
+def test_fulfill_transactions(alice_pubkey, alice_privkey, bob_pubkey):
+    from planetmint_driver.exceptions import MissingPrivateKeyError
+    from planetmint_driver.offchain import (
+        fulfill_transaction,
+        fulfill_transactions,
+        prepare_create_transaction,
+    )
+
+    transactions = [
+        prepare_create_transaction(signers=alice_pubkey, metadata=multihash(marshal({"index": index})))
+        for index in range(5)
+    ]
+    transactions.insert(2, prepare_create_transaction(signers=bob_pubkey))
+    results = fulfill_transactions(transactions, private_keys=[alice_privkey], max_workers=2, chunksize=2)
+
+    assert [result.transaction for result in results] == transactions
+    assert isinstance(results[2].error, MissingPrivateKeyError)
+    assert results[2].fulfilled is None
+    del results[2], transactions[2]
+    assert [result.fulfilled for result in results] == [
+        fulfill_transaction(transaction, private_keys=alice_privkey) for transaction in transactions
+    ]
+    assert all(result.error is None for result in results)
+
+
+def test_fulfill_transactions_empty(alice_privkey):
+    from planetmint_driver.offchain import fulfill_transactions
+
+    assert fulfill_transactions([], private_keys=alice_privkey) == []
+    with raises(ValueError):
+        fulfill_transactions([], private_keys=alice_privkey, chunksize=0)
+
+
+def test_fulfill_transaction_with_keyring(alice_pubkey, alice_privkey, bob_pubkey, bob_privkey):
+    from planetmint_driver.crypto import Keyring
+    from planetmint_driver.offchain import (
+        fulfill_transaction,
+        prepare_create_transaction,
+        prepare_transfer_transaction,
+    )
+
+    keyring = Keyring([alice_privkey, bob_privkey])
+    create = prepare_create_transaction(signers=alice_pubkey, recipients=[([alice_pubkey, bob_pubkey], 1)])
+    signed_create = fulfill_transaction(create, private_keys=keyring)
+    assert signed_create == fulfill_transaction(create, private_keys=alice_privkey)
+    # the fulfilled payload does not alias the prepared one
+    assert signed_create["outputs"] is not create["outputs"]
+    assert signed_create["outputs"][0] is not create["outputs"][0]
+
+    output = signed_create["outputs"][0]
+    transfer = prepare_transfer_transaction(
+        inputs={
+            "fulfillment": output["condition"]["details"],
+            "fulfills": {"output_index": 0, "transaction_id": signed_create["id"]},
+            "owners_before": output["public_keys"],
+        },
+        recipients=bob_pubkey,
+        assets=[signed_create["id"]],
+    )
+    # NOTE: the threshold condition of the output needs both signatures
+    assert fulfill_transaction(transfer, private_keys=keyring) == fulfill_transaction(
+        transfer, private_keys=[alice_privkey, bob_privkey]
+    )
+
+
+def test_fulfill_transaction_with_keyring_raises(alice_transaction, bob_privkey):
+    from planetmint_driver.crypto import Keyring
+    from planetmint_driver.exceptions import MissingPrivateKeyError
+    from planetmint_driver.offchain import fulfill_transaction
+
+    with raises(MissingPrivateKeyError):
+        fulfill_transaction(alice_transaction, private_keys=Keyring(bob_privkey))
+
+
+def test_prepared_transaction(alice_pubkey, alice_privkey, bob_pubkey):
+    from planetmint_driver.offchain import (
+        PreparedTransaction,
+        fulfill_transaction,
+        prepare_create_transaction,
+        prepare_transfer_transaction,
+    )
+
+    metadata = multihash(marshal({"msg": "Hello Planetmint!"}))
+    prepared = PreparedTransaction.create(signers=alice_pubkey, metadata=metadata)
+    assert not prepared.signed
+    assert prepared.to_dict() == prepare_create_transaction(signers=alice_pubkey, metadata=metadata)
+    assert prepared.sign(alice_privkey) is prepared
+    assert prepared.signed
+
+    create = fulfill_transaction(
+        prepare_create_transaction(signers=alice_pubkey, metadata=metadata), private_keys=alice_privkey
+    )
+    assert prepared.to_dict() == create
+    assert prepared.id == create["id"]
+    assert prepared.serialize() == rapidjson.dumps(create, ensure_ascii=False, sort_keys=True).encode()
+    assert prepared.serialize() is prepared.serialize()
+
+    output = create["outputs"][0]
+    input_ = {
+        "fulfillment": output["condition"]["details"],
+        "fulfills": {"output_index": 0, "transaction_id": create["id"]},
+        "owners_before": output["public_keys"],
+    }
+    transfer = PreparedTransaction.transfer(inputs=input_, recipients=bob_pubkey, assets=[create["id"]])
+    expected = fulfill_transaction(
+        prepare_transfer_transaction(inputs=input_, recipients=bob_pubkey, assets=[create["id"]]),
+        private_keys=alice_privkey,
+    )
+    assert transfer.sign([alice_privkey]).to_dict() == expected
+
+
+def test_prepared_transaction_validate(alice_pubkey, alice_privkey):
+    from planetmint_driver.exceptions import InvalidTransaction
+    from planetmint_driver.offchain import PreparedTransaction
+
+    prepared = PreparedTransaction.create(signers=alice_pubkey)
+    with raises(InvalidTransaction):
+        prepared.validate()
+    prepared.validate(id=False, signatures=False)
+    prepared.sign(alice_privkey).validate()
+
+
+def test_prepared_transaction_from_dict(alice_transaction, alice_privkey, bob_privkey):
+    from transactions.common.exceptions import SchemaValidationError
+
+    from planetmint_driver.exceptions import MissingPrivateKeyError
+    from planetmint_driver.offchain import PreparedTransaction, fulfill_transaction
+
+    prepared = PreparedTransaction.from_dict(alice_transaction)
+    with raises(MissingPrivateKeyError):
+        prepared.sign(bob_privkey)
+    assert prepared.sign(alice_privkey).to_dict() == fulfill_transaction(alice_transaction, private_keys=alice_privkey)
+
+    malformed = dict(alice_transaction, unknown=None)
+    with raises(SchemaValidationError):
+        PreparedTransaction.from_dict(malformed)
+    # NOTE: trusted payloads are neither validated again nor rebuilt, they
+    # are signed as given
+    trusted = PreparedTransaction.from_dict(malformed, trusted=True).sign(alice_privkey)
+    assert trusted.to_dict()["unknown"] is None
+    assert trusted.id == hash_transaction(dict(trusted.to_dict(), id=None))
+
+
+def test_create_template(alice_pubkey, alice_privkey, bob_pubkey):
+    from planetmint_driver.offchain import CreateTemplate, fulfill_transaction, prepare_create_transaction
+    from planetmint_driver.validation import validate_transaction
+
+    assets = [{"data": multihash(marshal({"serial": 1}))}]
+    recipients = [([alice_pubkey], 1), ([bob_pubkey], 2)]
+    template = CreateTemplate(signers=alice_pubkey, recipients=recipients, assets=assets)
+    for index in range(2):
+        metadata = multihash(marshal({"index": index}))
+        expected = prepare_create_transaction(
+            signers=alice_pubkey, recipients=recipients, assets=assets, metadata=metadata
+        )
+        assert template.prepare(metadata=metadata) == expected
+
+    other_assets = [{"data": multihash(marshal({"serial": 2}))}]
+    transaction = template.prepare(assets=other_assets)
+    assert transaction == prepare_create_transaction(signers=alice_pubkey, recipients=recipients, assets=other_assets)
+    validate_transaction(fulfill_transaction(transaction, private_keys=alice_privkey))
+
+    # NOTE: the prepared transactions are clones, not views of the template
+    transaction["outputs"][0]["amount"] = "5"
+    assert template.prepare()["outputs"][0]["amount"] == "1"
+
+
+def test_create_template_invalid_metadata(alice_pubkey):
+    from planetmint_driver.offchain import CreateTemplate
+
+    with raises(TypeError):
+        CreateTemplate(signers=alice_pubkey).prepare(metadata={"not": "a cid"})
+
+
+def test_fulfill_batch_with_signing_delegation(alice_pubkey, alice_privkey, bob_pubkey, bob_privkey):
+    import asyncio
+
+    from planetmint_driver.crypto import Keyring
+    from planetmint_driver.offchain import (
+        async_fulfill_batch_with_signing_delegation,
+        fulfill_batch_with_signing_delegation,
+        fulfill_transaction,
+        prepare_create_transaction,
+        prepare_transfer_transaction,
+    )
+
+    keyring = Keyring([alice_privkey, bob_privkey])
+    create = fulfill_transaction(
+        prepare_create_transaction(
+            signers=alice_pubkey, recipients=[([alice_pubkey, bob_pubkey], 1), ([bob_pubkey], 1)]
+        ),
+        private_keys=keyring,
+    )
+    transfer = prepare_transfer_transaction(
+        inputs=[
+            {
+                "fulfillment": output["condition"]["details"],
+                "fulfills": {"output_index": index, "transaction_id": create["id"]},
+                "owners_before": output["public_keys"],
+            }
+            for index, output in enumerate(create["outputs"])
+        ],
+        recipients=[([alice_pubkey], 2)],
+        assets=[create["id"]],
+    )
+    transactions = [
+        prepare_create_transaction(signers=alice_pubkey, metadata=multihash(marshal({"index": 0}))),
+        transfer,
+        prepare_create_transaction(signers=bob_pubkey),
+    ]
+    expected = [fulfill_transaction(transaction, private_keys=keyring) for transaction in transactions]
+    calls = []
+
+    def sign(requests):
+        calls.append(requests)
+        return [keyring.sign(request.public_key, request.message) for request in requests]
+
+    assert fulfill_batch_with_signing_delegation(transactions, sign) == expected
+    assert len(calls) == 1
+    # NOTE: the threshold input of the transfer needs both signatures
+    assert [(request.transaction_index, request.input_index) for request in calls[0]] == [
+        (0, 0),
+        (1, 0),
+        (1, 0),
+        (1, 1),
+        (2, 0),
+    ]
+    assert {request.public_key for request in calls[0][1:3]} == {alice_pubkey, bob_pubkey}
+
+    async def async_sign(requests):
+        await asyncio.sleep(0)
+        return sign(requests)
+
+    assert asyncio.run(async_fulfill_batch_with_signing_delegation(transactions, async_sign)) == expected
+    assert asyncio.run(async_fulfill_batch_with_signing_delegation(transactions, sign)) == expected
+
+    with raises(ValueError):
+        fulfill_batch_with_signing_delegation(transactions, lambda requests: sign(requests)[1:])
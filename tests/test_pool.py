@@ -36,7 +36,167 @@ def test_get_connection():
         connection = pool.get_connection()
         assert connection.node_url == 2
 
+    # each half-open connection is claimed for its probe once
     connections[2].backoff_time = datetime.utcnow()
+    assert [pool.get_connection().node_url for _ in range(3)] == [0, 1, 2]
     for _ in range(10):
         connection = pool.get_connection()
         assert connection.node_url == 0
+
+
+def test_latency_aware_picker():
+    from datetime import datetime, timedelta
+
+    from planetmint_driver.connection import Connection
+    from planetmint_driver.pool import LatencyAwarePicker, Pool
+
+    connections = [Connection(node_url=i) for i in range(3)]
+    pool = Pool(connections, picker_class=lambda: LatencyAwarePicker(exploration=0))
+
+    # unmeasured connections are tried first
+    assert pool.get_connection().node_url == 0
+    connections[0].record_request(0.3, success=True)
+    assert pool.get_connection().node_url == 1
+    connections[1].record_request(0.1, success=True)
+    assert pool.get_connection().node_url == 2
+    connections[2].record_request(0.2, success=True)
+
+    for _ in range(10):
+        assert pool.get_connection().node_url == 1
+
+    # errors inflate the score of the fastest connection
+    connections[1].record_request(0.1, success=False)
+    assert pool.get_connection().node_url == 2
+
+    # connections in backoff are skipped unless every connection is
+    connections[2].backoff_time = datetime.utcnow() + timedelta(seconds=60)
+    assert pool.get_connection().node_url == 0
+    for conn in connections:
+        conn.backoff_time = datetime.utcnow() + timedelta(seconds=60 - conn.node_url)
+    assert pool.get_connection().node_url == 2
+
+
+def test_latency_aware_picker_explores(monkeypatch):
+    from planetmint_driver import pool as pool_module
+    from planetmint_driver.connection import Connection
+    from planetmint_driver.pool import LatencyAwarePicker
+
+    connections = [Connection(node_url=i) for i in range(2)]
+    connections[0].record_request(0.1, success=True)
+    connections[1].record_request(5, success=True)
+    picker = LatencyAwarePicker(exploration=0.5)
+
+    monkeypatch.setattr(pool_module.random, "random", lambda: 0.9)
+    assert picker.pick(connections).node_url == 0
+    monkeypatch.setattr(pool_module.random, "random", lambda: 0.1)
+    monkeypatch.setattr(pool_module.random, "choice", lambda seq: seq[-1])
+    assert picker.pick(connections).node_url == 1
+
+
+def test_least_outstanding_picker():
+    from datetime import datetime, timedelta
+
+    from planetmint_driver.connection import Connection
+    from planetmint_driver.pool import LeastOutstandingPicker, Pool
+
+    connections = [Connection(node_url=i) for i in range(3)]
+    pool = Pool(connections, picker_class=LeastOutstandingPicker)
+    assert pool.get_connection().node_url == 0
+
+    connections[0].in_flight = 2
+    connections[1].in_flight = 1
+    connections[2].in_flight = 1
+    assert pool.get_connection().node_url == 1
+
+    # ties are broken by backoff time
+    connections[1].backoff_time = datetime.utcnow() - timedelta(seconds=1)
+    connections[2].backoff_time = datetime.utcnow() - timedelta(seconds=2)
+    assert pool.get_connection().node_url == 2
+
+    # connections still backing off are avoided
+    connections[2].backoff_time = datetime.utcnow() + timedelta(seconds=60)
+    connections[1].in_flight = 5
+    assert pool.get_connection().node_url == 0
+
+
+def test_get_connection_with_exclude():
+    from planetmint_driver.connection import Connection
+    from planetmint_driver.pool import Pool
+
+    connections = [Connection(node_url=i) for i in range(3)]
+    pool = Pool(connections)
+    assert pool.get_connection(exclude=(connections[0],)).node_url == 1
+    assert pool.get_connection(exclude=tuple(connections)).node_url == 0
+
+
+def test_get_connection_skips_open_breakers():
+    from datetime import datetime, timedelta
+
+    from planetmint_driver.connection import Connection
+    from planetmint_driver.pool import LeastOutstandingPicker, Pool
+
+    connections = [Connection(node_url=i) for i in range(3)]
+    pool = Pool(connections, picker_class=LeastOutstandingPicker)
+    connections[0].backoff_time = datetime.utcnow() + timedelta(seconds=60)
+    connections[1].in_flight = 3
+    connections[2].in_flight = 1
+    connections[2].backoff_time = datetime.utcnow() - timedelta(seconds=1)
+    assert pool.get_connection().node_url == 2
+
+    # the half-open connection is skipped while its probe is in flight
+    connections[2]._probing = True
+    assert pool.get_connection().node_url == 1
+
+    # all connections unavailable: the picker chooses among all of them
+    connections[1].backoff_time = datetime.utcnow() + timedelta(seconds=30)
+    assert pool.get_connection().node_url == 2
+
+
+def test_get_connection_claims_probe():
+    from datetime import datetime, timedelta
+    from threading import Barrier, Thread
+    from time import sleep
+
+    from requests.exceptions import ConnectionError
+    from responses import RequestsMock
+
+    from planetmint_driver.connection import OPEN, Connection
+    from planetmint_driver.pool import AbstractPicker, Pool
+
+    class FirstPicker(AbstractPicker):
+        def pick(self, connections):
+            return connections[0]
+
+    half_open, healthy = Connection(node_url="http://half-open"), Connection(node_url="http://healthy")
+    half_open.backoff_time = datetime.utcnow() - timedelta(seconds=1)
+    pool = Pool([half_open, healthy], picker_class=FirstPicker)
+
+    def fail(request):
+        sleep(0.2)
+        raise ConnectionError()
+
+    barrier = Barrier(8)
+
+    def send():
+        connection = pool.get_connection()
+        # every thread picks a connection before any request is sent
+        barrier.wait()
+        try:
+            connection.request("GET")
+        except ConnectionError:
+            pass
+
+    with RequestsMock() as requests_mock:
+        requests_mock.add_callback("GET", half_open.node_url, callback=fail)
+        requests_mock.add("GET", healthy.node_url, json={})
+        threads = [Thread(target=send) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        urls = [call.request.url.rstrip("/") for call in requests_mock.calls]
+
+    # exactly one request, the probe, reached the half-open node
+    assert urls.count(half_open.node_url) == 1
+    assert urls.count(healthy.node_url) == 7
+    assert half_open.state == OPEN
@@ -0,0 +1,99 @@
+# Copyright Planetmint GmbH and Planetmint contributors
+# SPDX-License-Identifier: (Apache-2.0 AND CC-BY-4.0)
+# Code is Apache-2.0 and docs are CC-BY-4.0
+
+import asyncio
+import time
+
+from concurrent.futures import ThreadPoolExecutor
+from threading import Event
+
+from pytest import importorskip, raises
+
+from planetmint_driver.singleflight import AsyncSingleFlight, SingleFlight
+
+
+def test_single_flight_shares_result():
+    single_flight = SingleFlight()
+    calls = []
+    release = Event()
+
+    def func():
+        calls.append(1)
+        release.wait(5)
+        return {"id": "abc"}
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        futures = [executor.submit(single_flight.do, "key", func) for _ in range(8)]
+        time.sleep(0.1)
+        release.set()
+        results = [future.result() for future in futures]
+
+    assert len(calls) == 1
+    assert all(result is results[0] for result in results)
+    # the key is forgotten once the call completed
+    assert single_flight.do("key", lambda: "again") == "again"
+
+
+def test_single_flight_shares_exception():
+    single_flight = SingleFlight()
+    release = Event()
+
+    def func():
+        release.wait(5)
+        raise ValueError("boom")
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        futures = [executor.submit(single_flight.do, "key", func) for _ in range(4)]
+        time.sleep(0.1)
+        release.set()
+        for future in futures:
+            with raises(ValueError):
+                future.result()
+    assert single_flight._calls == {}
+
+
+def test_async_single_flight():
+    single_flight = AsyncSingleFlight()
+    calls = []
+
+    async def func():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return len(calls)
+
+    async def main():
+        return await asyncio.gather(*(single_flight.do("key", func) for _ in range(10)))
+
+    assert asyncio.run(main()) == [1] * 10
+    assert single_flight._calls == {}
+
+
+def test_transport_coalesces_identical_gets(stub_node):
+    from planetmint_driver import Planetmint
+
+    stub_node.add("GET", "/api/v1/transactions/abc", {"id": "abc"}, delay=0.3)
+    stub_node.add("GET", "/api/v1/transactions/def", {"id": "def"}, delay=0.3)
+    bdb = Planetmint(stub_node.url, coalesce=True)
+
+    with ThreadPoolExecutor(max_workers=10) as executor:
+        txids = ["abc"] * 8 + ["def"] * 2
+        results = list(executor.map(bdb.transactions.retrieve, txids))
+
+    assert [tx["id"] for tx in results] == txids
+    assert stub_node.count("GET", "/api/v1/transactions/abc") == 1
+    assert stub_node.count("GET", "/api/v1/transactions/def") == 1
+
+
+def test_async_transport_coalesces_identical_gets(stub_node):
+    importorskip("aiohttp")
+    from planetmint_driver.aio import AsyncPlanetmint
+
+    stub_node.add("GET", "/api/v1/assets//cid", [{"data": "cid"}], delay=0.2)
+
+    async def main():
+        async with AsyncPlanetmint(stub_node.url, coalesce=True) as bdb:
+            return await asyncio.gather(*(bdb.assets.get(cid="cid") for _ in range(10)))
+
+    assert asyncio.run(main()) == [[{"data": "cid"}]] * 10
+    assert stub_node.count("GET", "/api/v1/assets//cid") == 1
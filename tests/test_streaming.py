@@ -0,0 +1,148 @@
+# Copyright Planetmint GmbH and Planetmint contributors
+# SPDX-License-Identifier: (Apache-2.0 AND CC-BY-4.0)
+# Code is Apache-2.0 and docs are CC-BY-4.0
+
+import asyncio
+import json
+
+import pytest
+
+ITEMS = [
+    {"id": "a", "nested": {"list": [1, 2, [3]], "empty": {}}},
+    'string with ] } , and \\" escapes é',
+    12.5,
+    None,
+    True,
+    [],
+    {"message": "{[\\\\]}"},
+]
+
+
+def chunked(data, size):
+    return [data[i : i + size] for i in range(0, len(data), size)]
+
+
+@pytest.mark.parametrize("size", [1, 2, 7, 4096])
+def test_iter_json_array(size):
+    from planetmint_driver.streaming import iter_json_array
+
+    data = json.dumps(ITEMS, ensure_ascii=False).encode()
+    assert list(iter_json_array(chunked(data, size), json.loads)) == ITEMS
+
+
+@pytest.mark.parametrize("size", [1, 5, 4096])
+def test_iter_json_array_under_key(size):
+    from planetmint_driver.streaming import iter_json_array
+
+    block = {"height": 3, "other": ["x", {"transactions": [0]}], "transactions": ITEMS, "after": [4]}
+    data = json.dumps(block).encode()
+    assert list(iter_json_array(chunked(data, size), json.loads, key="transactions")) == ITEMS
+
+
+def test_parser_yields_items_as_soon_as_complete():
+    from planetmint_driver.streaming import JSONArrayParser
+
+    parser = JSONArrayParser(json.loads)
+    assert parser.feed(b' [ {"a": 1} ') == []
+    assert parser.feed(b', {"a"') == [{"a": 1}]
+    assert parser.feed(b": 2}]\n") == [{"a": 2}]
+    assert parser.done
+    parser.close()
+
+
+def test_parser_only_buffers_the_current_item():
+    from planetmint_driver.streaming import JSONArrayParser
+
+    parser = JSONArrayParser(json.loads)
+    parser.feed(b"[")
+    for i in range(1000):
+        parser.feed(json.dumps({"i": i}).encode() + b",")
+    assert len(parser._buffer) < 20
+
+
+@pytest.mark.parametrize("data", [b"[]", b" [ ] ", b"[\n]"])
+def test_iter_json_array_empty(data):
+    from planetmint_driver.streaming import iter_json_array
+
+    assert list(iter_json_array([data], json.loads)) == []
+
+
+@pytest.mark.parametrize(
+    "data,key",
+    [
+        (b'{"a": 1}', None),
+        (b"[1, 2]", "transactions"),
+        (b"[1, 2", None),
+        (b'{"transactions": [1', "transactions"),
+        (b"[1] [2]", None),
+        (b"[1, {]", None),
+    ],
+)
+def test_iter_json_array_malformed(data, key):
+    from planetmint_driver.streaming import iter_json_array
+
+    with pytest.raises(ValueError):
+        list(iter_json_array(chunked(data, 3), json.loads, key=key))
+
+
+def test_driver_iter_get(stub_node):
+    from planetmint_driver import Planetmint
+
+    outputs = [{"transaction_id": str(i), "output_index": 0} for i in range(500)]
+    stub_node.add("GET", "/api/v1/outputs/", lambda query, body: outputs if query["spent"] == ["False"] else [])
+    stub_node.add("GET", "/api/v1/metadata/", lambda query, body: [query["search"][0]])
+    stub_node.add("GET", "/api/v1/transactions/", lambda query, body: query["asset_ids"])
+    stub_node.add("GET", "/api/v1/blocks/7", {"height": 7, "transactions": [{"id": "a"}, {"id": "b"}]})
+
+    bdb = Planetmint(stub_node.url)
+    assert list(bdb.outputs.iter_get("pk", spent=False)) == outputs
+    assert list(bdb.outputs.iter_get("pk", spent=True)) == []
+    assert list(bdb.metadata.iter_get(search="abc")) == ["abc"]
+    assert list(bdb.transactions.iter_get(asset_ids=["a", "b"])) == ["a", "b"]
+    assert list(bdb.blocks.iter_transactions("7")) == [{"id": "a"}, {"id": "b"}]
+
+
+def test_driver_iter_get_http_error(stub_node):
+    from planetmint_driver import Planetmint
+    from planetmint_driver.exceptions import NotFoundError
+
+    bdb = Planetmint(stub_node.url)
+    with pytest.raises(NotFoundError) as exc:
+        next(bdb.outputs.iter_get("pk"))
+    assert exc.value.info == {"message": "Not found"}
+
+
+def test_stream_request_retries_connection_errors(stub_node):
+    from planetmint_driver.transport import Transport
+
+    stub_node.add("GET", "/outputs", [1, 2, 3])
+    transport = Transport(
+        {"endpoint": "http://127.0.0.1:1", "headers": {}}, {"endpoint": stub_node.url, "headers": {}}, timeout=5
+    )
+    assert list(transport.stream_request("GET", path="/outputs")) == [1, 2, 3]
+    dead, alive = transport.connection_pool.connections
+    assert dead.backoff_time is not None
+    assert alive.in_flight == 0
+
+
+def test_async_driver_iter_get(stub_node):
+    pytest.importorskip("aiohttp")
+    from planetmint_driver.aio import AsyncPlanetmint
+    from planetmint_driver.exceptions import NotFoundError
+
+    outputs = [{"transaction_id": str(i), "output_index": 0} for i in range(500)]
+    stub_node.add("GET", "/api/v1/outputs/", outputs)
+    stub_node.add("GET", "/api/v1/blocks/7", {"height": 7, "transactions": [{"id": "a"}]})
+
+    async def main():
+        async with AsyncPlanetmint(stub_node.url) as bdb:
+            streamed = [output async for output in bdb.outputs.iter_get("pk")]
+            transactions = [tx async for tx in bdb.blocks.iter_transactions("7")]
+            with pytest.raises(NotFoundError):
+                async for _ in bdb.metadata.iter_get(search="abc"):
+                    pass
+            return streamed, transactions
+
+    streamed, transactions = asyncio.run(main())
+    assert streamed == outputs
+    assert transactions == [{"id": "a"}]
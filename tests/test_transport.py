@@ -2,6 +2,8 @@
 # SPDX-License-Identifier: (Apache-2.0 AND CC-BY-4.0)
 # Code is Apache-2.0 and docs are CC-BY-4.0
 
+import time
+
 import pytest
 
 from unittest.mock import patch
@@ -86,3 +88,52 @@ def test_timeout_during_request(request_mock, time_mock):
     request_kwargs = request_mock.call_args_list[0][1]
     assert "first_node" in request_kwargs["url"]
     assert request_kwargs["timeout"] == 100
+
+
+def test_concurrent_requests_share_one_transport(stub_node):
+    from concurrent.futures import ThreadPoolExecutor
+
+    stub_node.add("GET", "/ping", lambda query, body: {"n": int(query["n"][0])})
+    transport = Transport(*normalize_nodes("http://127.0.0.1:1", stub_node.url), timeout=30)
+
+    def call(n):
+        return transport.forward_request("GET", path="/ping", params={"n": n})["n"]
+
+    with ThreadPoolExecutor(max_workers=16) as executor:
+        results = list(executor.map(call, range(400)))
+
+    assert results == list(range(400))
+    assert stub_node.count("GET", "/ping") == 400
+    dead, alive = transport.connection_pool.connections
+    assert dead.in_flight == alive.in_flight == 0
+    assert dead.backoff_time is not None
+    assert alive.backoff_time is None
+    assert len(alive._sessions) <= 16
+    transport.close()
+
+
+def test_open_node_is_skipped_instead_of_slept_on(stub_node):
+    from datetime import datetime, timedelta
+
+    from planetmint_driver.pool import LatencyAwarePicker
+
+    stub_node.add("GET", "/ping", {})
+    transport = Transport(
+        *normalize_nodes("http://127.0.0.1:1", stub_node.url),
+        timeout=30,
+        picker_class=lambda: LatencyAwarePicker(exploration=0),
+    )
+    dead, alive = transport.connection_pool.connections
+
+    start = time.time()
+    for _ in range(20):
+        transport.forward_request("GET", path="/ping")
+    # the dead node was only hit once, and its backoff was never slept on
+    assert dead._retries == 1
+    assert time.time() - start < dead.get_backoff_timedelta() + 1
+
+    # once the backoff has passed, the (unmeasured) dead node is probed
+    dead.backoff_time = datetime.utcnow() - timedelta(seconds=1)
+    transport.forward_request("GET", path="/ping")
+    assert dead._retries == 2
+    assert stub_node.count("GET", "/ping") == 21
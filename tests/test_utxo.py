@@ -0,0 +1,92 @@
+# Copyright Planetmint GmbH and Planetmint contributors
+# SPDX-License-Identifier: (Apache-2.0 AND CC-BY-4.0)
+# Code is Apache-2.0 and docs are CC-BY-4.0
+
+from ipld import marshal, multihash
+from pytest import fixture
+
+
+@fixture
+def create_transaction(alice_pubkey, alice_privkey, bob_pubkey):
+    from planetmint_driver.offchain import fulfill_transaction, prepare_create_transaction
+
+    transaction = prepare_create_transaction(
+        signers=[alice_pubkey],
+        recipients=[([alice_pubkey], 10), ([bob_pubkey], 5), ([alice_pubkey], 3)],
+        assets=[{"data": multihash(marshal({"msg": "utxo"}))}],
+    )
+    return fulfill_transaction(transaction, private_keys=alice_privkey)
+
+
+def transfer(index, public_key, private_key, asset_id, recipients):
+    from planetmint_driver.offchain import fulfill_transaction, prepare_transfer_transaction
+
+    utxos = index.spendable(public_key, asset_id)
+    transaction = prepare_transfer_transaction(
+        inputs=[utxo.input for utxo in utxos], recipients=recipients, assets=[asset_id]
+    )
+    return fulfill_transaction(transaction, private_keys=private_key)
+
+
+def test_apply_transactions(create_transaction, alice_pubkey, alice_privkey, bob_pubkey, carol_pubkey):
+    from planetmint_driver.utxo import UTXOIndex
+
+    asset_id = create_transaction["id"]
+    index = UTXOIndex([alice_pubkey, bob_pubkey])
+    index.apply_transaction(create_transaction)
+    assert len(index) == 3
+    assert [utxo.amount for utxo in index.spendable(alice_pubkey)] == [10, 3]
+    assert index.balance(bob_pubkey, asset_id) == 5
+    assert index.spendable(carol_pubkey) == []
+
+    # NOTE: the inputs of the index are accepted by the transactions library
+    transfer_transaction = transfer(
+        index, alice_pubkey, alice_privkey, asset_id, [([carol_pubkey], 4), ([alice_pubkey], 9)]
+    )
+    index.apply_block({"height": 2, "transactions": [transfer_transaction]})
+    assert (asset_id, 0) not in index
+    assert (transfer_transaction["id"], 1) in index
+    assert [(utxo.asset_id, utxo.amount) for utxo in index.spendable(alice_pubkey)] == [(asset_id, 9)]
+    assert index.balance(bob_pubkey, asset_id) == 5
+    assert len(index) == 2
+
+
+def test_shared_outputs(create_transaction, alice_pubkey, bob_pubkey):
+    from planetmint_driver.utxo import UTXOIndex
+
+    create_transaction = dict(create_transaction)
+    create_transaction["outputs"] = [dict(create_transaction["outputs"][0], public_keys=[alice_pubkey, bob_pubkey])]
+    index = UTXOIndex([alice_pubkey, bob_pubkey])
+    index.apply_transaction(create_transaction)
+    assert index.spendable(alice_pubkey) == index.spendable(bob_pubkey)
+    index.apply_transaction(
+        {
+            "id": "t",
+            "operation": "TRANSFER",
+            "assets": [{"id": "x"}],
+            "inputs": [{"fulfills": {"transaction_id": create_transaction["id"], "output_index": 0}}],
+            "outputs": [],
+        }
+    )
+    assert index.spendable(alice_pubkey) == index.spendable(bob_pubkey) == []
+    assert len(index) == 0
+
+
+def test_seed(stub_node, create_transaction, alice_pubkey, bob_pubkey):
+    from planetmint_driver import Planetmint
+    from planetmint_driver.utxo import UTXOIndex
+
+    txid = create_transaction["id"]
+    outputs = {
+        alice_pubkey: [{"transaction_id": txid, "output_index": 2}],
+        bob_pubkey: [{"transaction_id": txid, "output_index": 1}],
+    }
+    stub_node.add("GET", "/api/v1/outputs/", lambda query, body: outputs[query["public_key"][0]])
+    stub_node.add("GET", "/api/v1/transactions/" + txid, create_transaction)
+
+    index = UTXOIndex([alice_pubkey, bob_pubkey])
+    index.seed(Planetmint(stub_node.url))
+    # NOTE: output 0 is spent according to the node, so it is not indexed
+    assert [utxo.output_index for utxo in index.spendable(alice_pubkey, txid)] == [2]
+    assert [utxo.output_index for utxo in index.spendable(bob_pubkey, txid)] == [1]
+    assert stub_node.count("GET", "/api/v1/transactions/" + txid) == 1
@@ -0,0 +1,114 @@
+# Copyright Planetmint GmbH and Planetmint contributors
+# SPDX-License-Identifier: (Apache-2.0 AND CC-BY-4.0)
+# Code is Apache-2.0 and docs are CC-BY-4.0
+
+from hashlib import sha3_256
+
+import pytest
+from ipld import marshal, multihash
+
+
+@pytest.fixture
+def signed_create(alice_pubkey, alice_privkey):
+    from planetmint_driver.offchain import fulfill_transaction, prepare_create_transaction
+
+    transaction = prepare_create_transaction(signers=alice_pubkey, metadata=multihash(marshal({"msg": "hello"})))
+    return fulfill_transaction(transaction, private_keys=alice_privkey)
+
+
+@pytest.fixture
+def signed_transfer(signed_create, alice_privkey, bob_pubkey):
+    from planetmint_driver.offchain import fulfill_transaction, prepare_transfer_transaction
+
+    output = signed_create["outputs"][0]
+    transaction = prepare_transfer_transaction(
+        inputs={
+            "fulfillment": output["condition"]["details"],
+            "fulfills": {"output_index": 0, "transaction_id": signed_create["id"]},
+            "owners_before": output["public_keys"],
+        },
+        recipients=bob_pubkey,
+        assets=[signed_create["id"]],
+    )
+    return fulfill_transaction(transaction, private_keys=alice_privkey)
+
+
+def set_id(transaction):
+    from transactions.common.utils import serialize
+
+    transaction["id"] = sha3_256(serialize(dict(transaction, id=None)).encode()).hexdigest()
+    return transaction
+
+
+def test_valid_transactions(signed_create, signed_transfer):
+    from planetmint_driver.validation import _schemas, validate_transaction
+
+    validate_transaction(signed_create)
+    validate_transaction(signed_transfer)
+    validate_transaction(signed_create)
+    assert _schemas.cache_info().hits >= 1
+
+
+def test_invalid_schema(signed_create):
+    from planetmint_driver.exceptions import InvalidTransaction
+    from planetmint_driver.validation import validate_schema
+
+    with pytest.raises(InvalidTransaction, match="unknown"):
+        validate_schema(dict(signed_create, unknown=1))
+    with pytest.raises(InvalidTransaction, match="Unsupported"):
+        validate_schema(dict(signed_create, version="1.0"))
+    with pytest.raises(InvalidTransaction):
+        validate_schema({})
+
+
+def test_invalid_id(signed_create):
+    from planetmint_driver.exceptions import InvalidTransaction
+    from planetmint_driver.validation import validate_id
+
+    with pytest.raises(InvalidTransaction, match="hash"):
+        validate_id(dict(signed_create, metadata=multihash(marshal({"msg": "tampered"}))))
+
+
+def test_invalid_signatures(alice_transaction, signed_create, signed_transfer, bob_pubkey):
+    from planetmint_driver.exceptions import InvalidTransaction
+    from planetmint_driver.validation import validate_signatures
+
+    with pytest.raises(InvalidTransaction, match="not fulfilled"):
+        validate_signatures(alice_transaction)
+
+    tampered = set_id(dict(signed_create, metadata=multihash(marshal({"msg": "tampered"}))))
+    with pytest.raises(InvalidTransaction, match="invalid signature"):
+        validate_signatures(tampered)
+
+    # NOTE: the transfer signed by alice, claimed to be spent by bob
+    input_ = dict(signed_transfer["inputs"][0], owners_before=[bob_pubkey])
+    with pytest.raises(InvalidTransaction, match="owner"):
+        validate_signatures(set_id(dict(signed_transfer, inputs=[input_])))
+
+
+def test_driver_validates_before_sending(stub_node, signed_create):
+    from planetmint_driver import Planetmint
+    from planetmint_driver.exceptions import InvalidTransaction
+
+    path = "/api/v1/transactions/"
+    stub_node.add("POST", path, signed_create, status=202)
+    bdb = Planetmint(stub_node.url, validate_transactions=True)
+    with pytest.raises(InvalidTransaction):
+        bdb.transactions.send_async(dict(signed_create, metadata=None))
+    assert stub_node.count("POST", path) == 0
+    assert bdb.transactions.send_async(signed_create) == signed_create
+    assert stub_node.count("POST", path) == 1
+
+    # NOTE: validation is opt-in
+    Planetmint(stub_node.url).transactions.send_async(dict(signed_create, metadata=None))
+    assert stub_node.count("POST", path) == 2
+
+
+def test_invalid_condition_uri(signed_create):
+    from planetmint_driver.exceptions import InvalidTransaction
+    from planetmint_driver.validation import validate_schema
+
+    output = signed_create["outputs"][0]
+    condition = dict(output["condition"], uri=output["condition"]["uri"].replace("ni:///", "ni://"))
+    with pytest.raises(InvalidTransaction, match="Output 0"):
+        validate_schema(dict(signed_create, outputs=[dict(output, condition=condition)]))